@@ -0,0 +1,81 @@
+"""
+Micro-benchmark of the compiled `servicebus_pkl` decoder against the
+reflective `pkl.Parser(namespace=globals())` used by the generated
+`servicebus.load_pkl`.
+
+Usage:
+
+    python benchmarks/bench_pkl_decoder.py --queues 5000 --topics 500
+"""
+
+import modulepath_fixer  # noqa: F401
+import argparse
+import statistics
+import time
+
+import msgpack
+import pkl
+
+import configs.generated.servicebus_pkl as psb
+import configs.generated.servicebus_pkl_decoder as psb_decoder
+from topology import encode_pkl, generate_topology
+
+
+def _time(function, data: bytes, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(data)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--namespaces", type=int, default=2)
+    parser.add_argument("--topics", type=int, default=250)
+    parser.add_argument("--subscriptions", type=int, default=8)
+    parser.add_argument("--rules", type=int, default=1)
+    parser.add_argument("--queues", type=int, default=2500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    topology = psb.servicebus(
+        namespaces=generate_topology(
+            namespaces=args.namespaces,
+            topics=args.topics,
+            subscriptions=args.subscriptions,
+            rules=args.rules,
+            queues=args.queues,
+        )
+    )
+    data = msgpack.packb(encode_pkl(topology))
+    entities = args.namespaces * (
+        1
+        + args.queues
+        + args.topics * (1 + args.subscriptions * (1 + args.rules))
+    )
+
+    reflective = pkl.Parser(namespace=vars(psb))
+    decoders = {
+        "reflective": lambda raw: reflective.parse(
+            msgpack.unpackb(raw, strict_map_key=False)
+        ),
+        "compiled": psb_decoder.loads,
+    }
+    assert decoders["compiled"](data) == decoders["reflective"](data)
+
+    print(f"{entities} entities, {len(data) / 1024:.0f} KiB evaluator output")
+    medians = {}
+    for name, decode in decoders.items():
+        samples = _time(decode, data, args.repeat)
+        medians[name] = statistics.median(samples)
+        print(
+            f"{name:>10}: median {medians[name] * 1000:8.1f} ms, "
+            f"min {min(samples) * 1000:8.1f} ms"
+        )
+    print(f"speedup: {medians['reflective'] / medians['compiled']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
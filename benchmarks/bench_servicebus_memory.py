@@ -0,0 +1,80 @@
+"""
+tracemalloc benchmark of the in-memory footprint of decoded Service Bus
+topologies, comparing the regular `servicebus_pkl` dataclasses with the
+compact (frozen, slotted, interned and shared) bindings.
+
+Each size is the number of queues and, separately, of subscriptions (spread
+over topics of 10 subscriptions each).
+
+Usage:
+
+    python benchmarks/bench_servicebus_memory.py --sizes 1000 10000 50000
+"""
+
+import modulepath_fixer  # noqa: F401
+import argparse
+import gc
+import tracemalloc
+
+import msgpack
+
+import configs.generated.servicebus_pkl as psb
+import configs.generated.servicebus_pkl_compact as psb_compact
+import configs.generated.servicebus_pkl_decoder as psb_decoder
+from topology import encode_pkl, generate_topology
+
+SUBSCRIPTIONS_PER_TOPIC = 10
+
+
+def _measure(loads, data: bytes) -> tuple[int, int]:
+    """
+    Returns the retained and peak traced memory of decoding `data`.
+    """
+    gc.collect()
+    tracemalloc.start()
+    topology = loads(data)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del topology
+    return retained, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 50000]
+    )
+    args = parser.parse_args()
+
+    decoders = {
+        "dataclass": psb_decoder.loads,
+        "compact": psb_compact.loads,
+    }
+    print(
+        f"{'size':>7} {'bindings':>10} {'retained MiB':>13} "
+        f"{'peak MiB':>9} {'bytes/entity':>13}"
+    )
+    for size in args.sizes:
+        topology = psb.servicebus(
+            namespaces=generate_topology(
+                namespaces=1,
+                topics=max(size // SUBSCRIPTIONS_PER_TOPIC, 1),
+                subscriptions=SUBSCRIPTIONS_PER_TOPIC,
+                rules=0,
+                queues=size,
+            )
+        )
+        data = msgpack.packb(encode_pkl(topology))
+        del topology
+        entities = 2 * size
+        for name, loads in decoders.items():
+            psb_compact.clear_shared()
+            retained, peak = _measure(loads, data)
+            print(
+                f"{size:>7} {name:>10} {retained / 2**20:>13.1f} "
+                f"{peak / 2**20:>9.1f} {retained / entities:>13.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
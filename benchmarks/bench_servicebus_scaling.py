@@ -0,0 +1,305 @@
+"""
+Scaling benchmark of the `ServiceBus` component on Pulumi runtime mocks.
+
+Every scenario builds a synthetic topology of N namespaces x M topics x K
+subscriptions x R rules plus Q queues per namespace (and authorization
+rules on every namespace, topic and queue), runs the component against
+`pulumi.runtime.set_mocks` in a fresh interpreter and records:
+
+- program wall time, until every registration and invoke has completed
+- resource registrations and registrations per second
+- invoke count (authorization rule keys)
+- peak RSS of the interpreter
+
+Nothing leaves the machine. Results are written as JSON; pass a previous
+results file as `--compare` to print the change per scenario.
+
+Usage:
+
+    python benchmarks/bench_servicebus_scaling.py \
+        --scenario 1x10x10x1x10 --scenario 1x50x20x1x100 \
+        --output results.json --compare baseline.json
+"""
+
+import modulepath_fixer  # noqa: F401
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_SCENARIOS = ["1x10x10x1x10", "1x25x10x1x50", "1x50x20x1x100"]
+
+
+@dataclass
+class Scenario:
+    """
+    Topology size of a benchmark run, parsed from `NxMxKxRxQ`.
+
+    Args:
+        namespaces (int): N, namespaces.
+        topics (int): M, topics per namespace.
+        subscriptions (int): K, subscriptions per topic.
+        rules (int): R, rules per subscription.
+        queues (int): Q, queues per namespace.
+    """
+
+    namespaces: int
+    topics: int
+    subscriptions: int
+    rules: int
+    queues: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "Scenario":
+        parts = spec.lower().split("x")
+        if len(parts) != 5 or not all(part.isdigit() for part in parts):
+            raise argparse.ArgumentTypeError(
+                f"Expected NxMxKxRxQ, e.g. 1x10x10x1x10, got {spec}"
+            )
+        return cls(*map(int, parts))
+
+    def __str__(self) -> str:
+        return "x".join(str(value) for value in asdict(self).values())
+
+
+@dataclass
+class Result:
+    """
+    Measurements of one scenario.
+    """
+
+    scenario: str
+    deployment_mode: str
+    authorizations: int
+    entities: int
+    registrations: int
+    invokes: int
+    wall_seconds: float
+    registrations_per_second: float
+    peak_rss_mib: float
+
+
+def _run(
+    scenario: Scenario,
+    authorizations: int,
+    deployment_mode: str,
+    secrets: Optional[str],
+    validate: bool,
+) -> Result:
+    """
+    Runs one scenario. Called in a fresh interpreter so that mocks, Pulumi
+    settings and peak RSS are not shared between scenarios.
+    """
+    import pulumi
+
+    from topology import generate_topology
+
+    counts = {"registrations": 0, "invokes": 0}
+
+    class Mocks(pulumi.runtime.Mocks):
+        def new_resource(self, args: pulumi.runtime.MockResourceArgs):
+            counts["registrations"] += 1
+            return f"{args.name}_id", dict(args.inputs, name=args.name)
+
+        def call(self, args: pulumi.runtime.MockCallArgs):
+            counts["invokes"] += 1
+            return {
+                "primaryConnectionString": "Endpoint=sb://primary",
+                "secondaryConnectionString": "Endpoint=sb://secondary",
+            }
+
+    pulumi.runtime.set_mocks(
+        Mocks(), project="bench", stack="bench", preview=False
+    )
+
+    # Imported after set_mocks, as a program would be.
+    from modules.messaging import ServiceBus
+    from utils.module_dataclasses import ServiceBusArgs
+
+    namespaces = generate_topology(
+        namespaces=scenario.namespaces,
+        topics=scenario.topics,
+        subscriptions=scenario.subscriptions,
+        rules=scenario.rules,
+        queues=scenario.queues,
+        authorizations=authorizations,
+    )
+
+    def program():
+        sbs = ServiceBus(
+            name="bench",
+            args=ServiceBusArgs(
+                location="centralus",
+                pkl_configs=namespaces,
+                resource_group_name="bench-rg",
+                tags={},
+                validate=validate,
+                deployment_mode=deployment_mode,
+            ),
+        )
+        if secrets is None:
+            return sbs.urn
+        return pulumi.Output.all(
+            sbs.urn, sbs.servicebus_secrets.secrets.select(secrets)
+        )
+
+    started = time.perf_counter()
+    pulumi.runtime.test(program)()
+    wall = time.perf_counter() - started
+
+    per_namespace = (
+        1
+        + scenario.queues
+        + scenario.topics * (1 + scenario.subscriptions * (1 + scenario.rules))
+        + authorizations * (1 + scenario.queues + scenario.topics)
+    )
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return Result(
+        scenario=str(scenario),
+        deployment_mode=deployment_mode,
+        authorizations=authorizations,
+        entities=scenario.namespaces * per_namespace,
+        registrations=counts["registrations"],
+        invokes=counts["invokes"],
+        wall_seconds=round(wall, 4),
+        registrations_per_second=round(counts["registrations"] / wall, 1),
+        # kilobytes on Linux, bytes on macOS
+        peak_rss_mib=round(
+            peak_rss / (2**20 if sys.platform == "darwin" else 2**10), 1
+        ),
+    )
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(results: list[dict], baseline_file: str) -> None:
+    baseline = json.loads(Path(baseline_file).read_text())
+    previous = {
+        (r["scenario"], r["deployment_mode"], r["authorizations"]): r
+        for r in baseline["results"]
+    }
+    print(f"\nvs {baseline_file} ({baseline.get('revision')}):")
+    for result in results:
+        key = (
+            result["scenario"],
+            result["deployment_mode"],
+            result["authorizations"],
+        )
+        if key not in previous:
+            continue
+        old = previous[key]
+        print(
+            f"{result['scenario']:>16} {result['deployment_mode']:>9} "
+            f"wall {result['wall_seconds'] / old['wall_seconds']:>5.2f}x  "
+            f"rss {result['peak_rss_mib'] / old['peak_rss_mib']:>5.2f}x  "
+            f"invokes {old['invokes']} -> {result['invokes']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n\n")[0]
+    )
+    parser.add_argument(
+        "--scenario",
+        type=Scenario.parse,
+        action="append",
+        help=f"NxMxKxRxQ, repeatable. Defaults to {DEFAULT_SCENARIOS}",
+    )
+    parser.add_argument(
+        "--authorizations",
+        type=int,
+        default=1,
+        help="Authorization rules per namespace, topic and queue",
+    )
+    parser.add_argument(
+        "--deployment-mode",
+        choices=["resources", "template"],
+        action="append",
+        help="ServiceBus deployment mode(s), defaults to resources",
+    )
+    parser.add_argument(
+        "--secrets",
+        default="ConnectionStringSecondary",
+        help="Read the connection strings whose name contains this, as "
+        "uber-demo does; '' reads all",
+    )
+    parser.add_argument(
+        "--no-secrets",
+        action="store_true",
+        help="Read no connection strings",
+    )
+    parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Skip the component's pre-flight validation",
+    )
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--compare", help="Previous results JSON")
+    args = parser.parse_args()
+
+    scenarios = args.scenario or [
+        Scenario.parse(spec) for spec in DEFAULT_SCENARIOS
+    ]
+    modes = args.deployment_mode or ["resources"]
+
+    print(
+        f"{'scenario':>16} {'mode':>9} {'entities':>9} {'registered':>10} "
+        f"{'invokes':>8} {'wall s':>8} {'reg/s':>8} {'rss MiB':>8}"
+    )
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for mode in modes:
+        for scenario in scenarios:
+            with context.Pool(1) as pool:
+                result = pool.apply(
+                    _run,
+                    (
+                        scenario,
+                        args.authorizations,
+                        mode,
+                        None if args.no_secrets else args.secrets,
+                        not args.no_validate,
+                    ),
+                )
+            print(
+                f"{result.scenario:>16} {mode:>9} {result.entities:>9} "
+                f"{result.registrations:>10} {result.invokes:>8} "
+                f"{result.wall_seconds:>8.2f} "
+                f"{result.registrations_per_second:>8.0f} "
+                f"{result.peak_rss_mib:>8.1f}"
+            )
+            results.append(asdict(result))
+
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Synthetic Service Bus topologies for the benchmarks.
+
+Topologies are built as the generated `servicebus_pkl` dataclasses and can be
+encoded into the same msgpack structure the Pkl evaluator returns, so
+decoders can be measured without a Pkl binary.
+"""
+
+import modulepath_fixer  # noqa: F401
+import dataclasses
+import string
+from typing import Any
+
+import configs.generated.servicebus_pkl as psb
+
+SCHEMA_URI = "file:///configs/schema/servicebus-schema.pkl"
+
+
+# Every name the schema forbids ("sub", "queue", "topic", "auth",
+# "namespace", ...) contains a `u` or a `p`, so names spelled without them
+# never trip its contains constraints.
+_ALPHABET = string.ascii_lowercase.replace("u", "").replace("p", "")
+
+
+def alpha(index: int) -> str:
+    """
+    Spells `index` with lowercase letters only, as the schema's
+    `LowerCaseConstraint` rejects digits.
+    """
+    letters = ""
+    while True:
+        index, remainder = divmod(index, len(_ALPHABET))
+        letters = _ALPHABET[remainder] + letters
+        if index == 0:
+            return letters
+        index -= 1
+
+
+def _options(clazz: type, **overrides) -> Any:
+    values = {field.name: None for field in dataclasses.fields(clazz)}
+    values.update(status="Active", **overrides)
+    return clazz(**values)
+
+
+def _authorizations(count: int, prefix: str) -> list[psb.AuthorizationRule]:
+    return [
+        psb.AuthorizationRule(
+            name=f"{prefix}-{alpha(i)}",
+            listen=True,
+            send=True,
+            manage=False,
+            rights=["Send", "Listen"],
+        )
+        for i in range(count)
+    ]
+
+
+def _rules(count: int, prefix: str) -> list[psb.SubscriptionRule]:
+    return [
+        psb.SubscriptionRule(
+            action=None,
+            correlationFilter=None,
+            filterType="SqlFilter",
+            rule_name=f"filter-{prefix}-{alpha(i)}",
+            sqlFilter=psb.RuleSqlFilter(
+                compatibilityLevel=None,
+                requiresPreprocessing=None,
+                sqlExpression=f"Shard = '{alpha(i)}'",
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def generate_topology(
+    namespaces: int = 1,
+    topics: int = 1,
+    subscriptions: int = 1,
+    rules: int = 0,
+    queues: int = 1,
+    authorizations: int = 1,
+    sku: str = "Standard",
+) -> list[psb.Namespace]:
+    """
+    Builds N namespaces x M topics x K subscriptions x R rules, plus queues
+    and authorization rules on every namespace, topic and queue.
+
+    Every entity gets a topology-wide unique name, which keeps paths in
+    reports apart; `ServiceBus` scopes its resource names by namespace and
+    topic and names colliding secrets after the rule's path, so the
+    topology would pass `utils.servicebus_validation` with repeated names
+    too.
+
+    Args:
+        namespaces (int): Namespaces to generate.
+        topics (int): Topics per namespace.
+        subscriptions (int): Subscriptions per topic.
+        rules (int): SQL filter rules per subscription.
+        queues (int): Queues per namespace.
+        authorizations (int): Authorization rules per namespace, topic and
+            queue.
+        sku (str): Sku name of every namespace.
+
+    Returns:
+        list[psb.Namespace]: The synthetic topology.
+    """
+    return [
+        psb.Namespace(
+            namePrefix=f"bench-{alpha(n)}",
+            options=psb.NamespaceOptions(
+                alternateName=None,
+                publicNetworkAccess="Enabled",
+                sku=psb.Sku(name=sku, tier=sku, capacity=None),
+                zoneRedundant=None,
+                autoscale=None,
+                premiumMessagingPartitions=None,
+            ),
+            authorizations=_authorizations(authorizations, f"root-{alpha(n)}"),
+            queues=[
+                psb.Queue(
+                    name=f"work-{alpha(n)}-{alpha(q)}",
+                    options=_options(psb.QueueOptions, maxDeliveryCount=10),
+                    authorizations=_authorizations(
+                        authorizations, f"worker-{alpha(n)}-{alpha(q)}"
+                    ),
+                    loadHints=None,
+                )
+                for q in range(queues)
+            ],
+            topics=[
+                psb.Topic(
+                    name=f"events-{alpha(n)}-{alpha(t)}",
+                    options=_options(psb.TopicOptions),
+                    authorizations=_authorizations(
+                        authorizations, f"sender-{alpha(n)}-{alpha(t)}"
+                    ),
+                    subscriptions=[
+                        psb.Subscription(
+                            name=f"reader-{alpha(n)}-{alpha(t)}-{alpha(s)}",
+                            options=_options(psb.SubscriptionOptions),
+                            rules=_rules(
+                                rules, f"{alpha(n)}-{alpha(t)}-{alpha(s)}"
+                            ),
+                        )
+                        for s in range(subscriptions)
+                    ],
+                    loadHints=None,
+                )
+                for t in range(topics)
+            ],
+        )
+        for n in range(namespaces)
+    ]
+
+
+def encode_pkl(value: Any) -> Any:
+    """
+    Encodes generated bindings into the msgpack structure produced by the
+    Pkl evaluator (typed objects, listings and mappings).
+    """
+    if dataclasses.is_dataclass(value):
+        return [
+            0x1,
+            type(value)._registered_identifier,
+            SCHEMA_URI,
+            [
+                [0x10, field.name, encode_pkl(getattr(value, field.name))]
+                for field in dataclasses.fields(value)
+            ],
+        ]
+    if isinstance(value, list):
+        return [0x5, [encode_pkl(item) for item in value]]
+    if isinstance(value, dict):
+        return [0x3, {k: encode_pkl(v) for k, v in value.items()}]
+    return value
@@ -0,0 +1,114 @@
+# Code generated from Pkl module `cosmos`. DO NOT EDIT.
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Literal, Optional, Set, Union
+
+import pkl
+
+
+IndexingMode = Literal["consistent", "none"]
+PartitionKind = Literal["Hash", "MultiHash"]
+SortOrder = Literal["ascending", "descending"]
+SpatialType = Literal["Point", "LineString", "Polygon", "MultiPolygon"]
+
+ResourceName = str
+
+PropertyPath = str
+
+IndexPath = str
+
+
+@dataclass
+class Throughput:
+    manual: Optional[int]
+
+    autoscaleMax: Optional[int]
+
+    _registered_identifier = "cosmos#Throughput"
+
+
+@dataclass
+class PartitionKey:
+    paths: List[PropertyPath]
+
+    kind: PartitionKind
+
+    _registered_identifier = "cosmos#PartitionKey"
+
+
+@dataclass
+class CompositePath:
+    path: PropertyPath
+
+    order: SortOrder
+
+    _registered_identifier = "cosmos#CompositePath"
+
+
+@dataclass
+class SpatialIndex:
+    path: IndexPath
+
+    types: List[SpatialType]
+
+    _registered_identifier = "cosmos#SpatialIndex"
+
+
+@dataclass
+class IndexingPolicy:
+    indexingMode: IndexingMode
+
+    automatic: bool
+
+    includedPaths: List[IndexPath]
+
+    excludedPaths: List[IndexPath]
+
+    compositeIndexes: Optional[List[List[CompositePath]]]
+
+    spatialIndexes: Optional[List[SpatialIndex]]
+
+    _registered_identifier = "cosmos#IndexingPolicy"
+
+
+@dataclass
+class Container:
+    name: ResourceName
+
+    partitionKey: PartitionKey
+
+    indexingPolicy: IndexingPolicy
+
+    uniqueKeys: Optional[List[List[PropertyPath]]]
+
+    defaultTtl: Optional[int]
+
+    throughput: Optional[Throughput]
+
+    _registered_identifier = "cosmos#Container"
+
+
+@dataclass
+class Database:
+    name: ResourceName
+
+    throughput: Optional[Throughput]
+
+    containers: List[Container]
+
+    _registered_identifier = "cosmos#Database"
+
+
+@dataclass
+class cosmos:
+    databases: List[Database]
+
+    _registered_identifier = "cosmos"
+
+    @classmethod
+    def load_pkl(cls, source):
+        # Load the Pkl module at the given source and evaluate it into `cosmos.Module`.
+        # - Parameter source: The source of the Pkl module.
+        config = pkl.load(source, parser=pkl.Parser(namespace=globals()))
+        return config
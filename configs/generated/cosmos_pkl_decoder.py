@@ -0,0 +1,127 @@
+# Code generated by scripts/python/gen_pkl_decoder.py from `configs.generated.cosmos_pkl`.
+# DO NOT EDIT.
+from __future__ import annotations
+
+import msgpack
+import pkl
+
+from configs.generated.cosmos_pkl import (
+    CompositePath,
+    Container,
+    Database,
+    IndexingPolicy,
+    PartitionKey,
+    SpatialIndex,
+    Throughput,
+    cosmos,
+)
+
+
+def decode_Throughput(obj) -> Throughput:
+    m = {name: value for _, name, value in obj[3]}
+    return Throughput(
+        manual=m.get("manual"),
+        autoscaleMax=m.get("autoscaleMax"),
+    )
+
+
+def decode_PartitionKey(obj) -> PartitionKey:
+    m = {name: value for _, name, value in obj[3]}
+    return PartitionKey(
+        paths=m["paths"][1],
+        kind=m["kind"],
+    )
+
+
+def decode_CompositePath(obj) -> CompositePath:
+    m = {name: value for _, name, value in obj[3]}
+    return CompositePath(
+        path=m["path"],
+        order=m["order"],
+    )
+
+
+def decode_SpatialIndex(obj) -> SpatialIndex:
+    m = {name: value for _, name, value in obj[3]}
+    return SpatialIndex(
+        path=m["path"],
+        types=m["types"][1],
+    )
+
+
+def decode_IndexingPolicy(obj) -> IndexingPolicy:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("compositeIndexes")
+    compositeIndexes = None if v is None else [[decode_CompositePath(e) for e in e[1]] for e in v[1]]
+    v = m.get("spatialIndexes")
+    spatialIndexes = None if v is None else [decode_SpatialIndex(e) for e in v[1]]
+    return IndexingPolicy(
+        indexingMode=m["indexingMode"],
+        automatic=m["automatic"],
+        includedPaths=m["includedPaths"][1],
+        excludedPaths=m["excludedPaths"][1],
+        compositeIndexes=compositeIndexes,
+        spatialIndexes=spatialIndexes,
+    )
+
+
+def decode_Container(obj) -> Container:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("uniqueKeys")
+    uniqueKeys = None if v is None else [e[1] for e in v[1]]
+    v = m.get("throughput")
+    throughput = None if v is None else decode_Throughput(v)
+    return Container(
+        name=m["name"],
+        partitionKey=decode_PartitionKey(m["partitionKey"]),
+        indexingPolicy=decode_IndexingPolicy(m["indexingPolicy"]),
+        uniqueKeys=uniqueKeys,
+        defaultTtl=m.get("defaultTtl"),
+        throughput=throughput,
+    )
+
+
+def decode_Database(obj) -> Database:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("throughput")
+    throughput = None if v is None else decode_Throughput(v)
+    return Database(
+        name=m["name"],
+        throughput=throughput,
+        containers=[decode_Container(e) for e in m["containers"][1]],
+    )
+
+
+def decode_cosmos(obj) -> cosmos:
+    m = {name: value for _, name, value in obj[3]}
+    return cosmos(
+        databases=[decode_Database(e) for e in m["databases"][1]],
+    )
+
+
+def decode(obj) -> cosmos:
+    """
+    Builds the `cosmos` bindings from the evaluator's decoded msgpack
+    output.
+    """
+    return decode_cosmos(obj)
+
+
+def loads(data: bytes) -> cosmos:
+    """
+    Builds the `cosmos` bindings from the evaluator's binary output.
+    """
+    return decode_cosmos(msgpack.unpackb(data, strict_map_key=False))
+
+
+class _CompiledParser(pkl.Parser):
+    def parse(self, obj):
+        return decode_cosmos(obj)
+
+
+def load_pkl(source) -> cosmos:
+    """
+    Evaluates the Pkl module at `source` into `cosmos` using the compiled
+    decoder.
+    """
+    return pkl.load(source, parser=_CompiledParser())
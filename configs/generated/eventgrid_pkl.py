@@ -0,0 +1,137 @@
+# Code generated from Pkl module `eventgrid`. DO NOT EDIT.
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Literal, Optional, Set, Union
+
+import pkl
+
+
+DestinationType = Literal["ServiceBusQueue", "ServiceBusTopic", "StorageQueue", "AzureFunction"]
+EventDeliverySchema = Literal["EventGridSchema", "CloudEventSchemaV1_0"]
+StorageEventType = Literal["Microsoft.Storage.BlobCreated", "Microsoft.Storage.BlobDeleted", "Microsoft.Storage.BlobRenamed", "Microsoft.Storage.BlobTierChanged", "Microsoft.Storage.AsyncOperationInitiated", "Microsoft.Storage.DirectoryCreated", "Microsoft.Storage.DirectoryDeleted", "Microsoft.Storage.DirectoryRenamed", "Microsoft.Storage.LifecyclePolicyCompleted"]
+AdvancedFilterOperator = Literal["NumberIn", "NumberNotIn", "NumberLessThan", "NumberGreaterThan", "NumberLessThanOrEquals", "NumberGreaterThanOrEquals", "NumberInRange", "NumberNotInRange", "BoolEquals", "StringIn", "StringNotIn", "StringBeginsWith", "StringNotBeginsWith", "StringEndsWith", "StringNotEndsWith", "StringContains", "StringNotContains", "IsNullOrUndefined", "IsNotNull"]
+
+NameConstraint = str
+
+SystemTopicName = NameConstraint
+
+SubscriptionName = NameConstraint
+
+
+@dataclass
+class AdvancedFilter:
+    operatorType: AdvancedFilterOperator
+
+    key: str
+
+    stringValues: Optional[List[str]]
+
+    numberValues: Optional[List[float]]
+
+    numberRanges: Optional[List[List[float]]]
+
+    numberValue: Optional[float]
+
+    boolValue: Optional[bool]
+
+    _registered_identifier = "eventgrid#AdvancedFilter"
+
+
+@dataclass
+class Filter:
+    includedEventTypes: Optional[List[StorageEventType]]
+
+    subjectBeginsWith: Optional[str]
+
+    subjectEndsWith: Optional[str]
+
+    isSubjectCaseSensitive: bool
+
+    enableAdvancedFilteringOnArrays: bool
+
+    advancedFilters: Optional[List[AdvancedFilter]]
+
+    _registered_identifier = "eventgrid#Filter"
+
+
+@dataclass
+class Batching:
+    maxEventsPerBatch: int
+
+    preferredBatchSizeInKilobytes: int
+
+    _registered_identifier = "eventgrid#Batching"
+
+
+@dataclass
+class Destination:
+    type: DestinationType
+
+    name: str
+
+    namespace: Optional[str]
+
+    queueMessageTimeToLiveInSeconds: Optional[int]
+
+    batching: Optional[Batching]
+
+    _registered_identifier = "eventgrid#Destination"
+
+
+@dataclass
+class RetryPolicy:
+    maxDeliveryAttempts: int
+
+    eventTimeToLiveInMinutes: int
+
+    _registered_identifier = "eventgrid#RetryPolicy"
+
+
+@dataclass
+class DeadLetter:
+    container: str
+
+    _registered_identifier = "eventgrid#DeadLetter"
+
+
+@dataclass
+class Subscription:
+    name: SubscriptionName
+
+    destination: Destination
+
+    filter: Optional[Filter]
+
+    retryPolicy: Optional[RetryPolicy]
+
+    deadLetter: Optional[DeadLetter]
+
+    eventDeliverySchema: EventDeliverySchema
+
+    _registered_identifier = "eventgrid#Subscription"
+
+
+@dataclass
+class SystemTopic:
+    name: SystemTopicName
+
+    shard: int
+
+    subscriptions: List[Subscription]
+
+    _registered_identifier = "eventgrid#SystemTopic"
+
+
+@dataclass
+class eventgrid:
+    systemTopics: List[SystemTopic]
+
+    _registered_identifier = "eventgrid"
+
+    @classmethod
+    def load_pkl(cls, source):
+        # Load the Pkl module at the given source and evaluate it into `eventgrid.Module`.
+        # - Parameter source: The source of the Pkl module.
+        config = pkl.load(source, parser=pkl.Parser(namespace=globals()))
+        return config
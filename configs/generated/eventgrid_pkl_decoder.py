@@ -0,0 +1,151 @@
+# Code generated by scripts/python/gen_pkl_decoder.py from `configs.generated.eventgrid_pkl`.
+# DO NOT EDIT.
+from __future__ import annotations
+
+import msgpack
+import pkl
+
+from configs.generated.eventgrid_pkl import (
+    AdvancedFilter,
+    Batching,
+    DeadLetter,
+    Destination,
+    Filter,
+    RetryPolicy,
+    Subscription,
+    SystemTopic,
+    eventgrid,
+)
+
+
+def decode_AdvancedFilter(obj) -> AdvancedFilter:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("stringValues")
+    stringValues = None if v is None else v[1]
+    v = m.get("numberValues")
+    numberValues = None if v is None else v[1]
+    v = m.get("numberRanges")
+    numberRanges = None if v is None else [e[1] for e in v[1]]
+    return AdvancedFilter(
+        operatorType=m["operatorType"],
+        key=m["key"],
+        stringValues=stringValues,
+        numberValues=numberValues,
+        numberRanges=numberRanges,
+        numberValue=m.get("numberValue"),
+        boolValue=m.get("boolValue"),
+    )
+
+
+def decode_Filter(obj) -> Filter:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("includedEventTypes")
+    includedEventTypes = None if v is None else v[1]
+    v = m.get("advancedFilters")
+    advancedFilters = None if v is None else [decode_AdvancedFilter(e) for e in v[1]]
+    return Filter(
+        includedEventTypes=includedEventTypes,
+        subjectBeginsWith=m.get("subjectBeginsWith"),
+        subjectEndsWith=m.get("subjectEndsWith"),
+        isSubjectCaseSensitive=m["isSubjectCaseSensitive"],
+        enableAdvancedFilteringOnArrays=m["enableAdvancedFilteringOnArrays"],
+        advancedFilters=advancedFilters,
+    )
+
+
+def decode_Batching(obj) -> Batching:
+    m = {name: value for _, name, value in obj[3]}
+    return Batching(
+        maxEventsPerBatch=m["maxEventsPerBatch"],
+        preferredBatchSizeInKilobytes=m["preferredBatchSizeInKilobytes"],
+    )
+
+
+def decode_Destination(obj) -> Destination:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("batching")
+    batching = None if v is None else decode_Batching(v)
+    return Destination(
+        type=m["type"],
+        name=m["name"],
+        namespace=m.get("namespace"),
+        queueMessageTimeToLiveInSeconds=m.get("queueMessageTimeToLiveInSeconds"),
+        batching=batching,
+    )
+
+
+def decode_RetryPolicy(obj) -> RetryPolicy:
+    m = {name: value for _, name, value in obj[3]}
+    return RetryPolicy(
+        maxDeliveryAttempts=m["maxDeliveryAttempts"],
+        eventTimeToLiveInMinutes=m["eventTimeToLiveInMinutes"],
+    )
+
+
+def decode_DeadLetter(obj) -> DeadLetter:
+    m = {name: value for _, name, value in obj[3]}
+    return DeadLetter(
+        container=m["container"],
+    )
+
+
+def decode_Subscription(obj) -> Subscription:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("filter")
+    filter = None if v is None else decode_Filter(v)
+    v = m.get("retryPolicy")
+    retryPolicy = None if v is None else decode_RetryPolicy(v)
+    v = m.get("deadLetter")
+    deadLetter = None if v is None else decode_DeadLetter(v)
+    return Subscription(
+        name=m["name"],
+        destination=decode_Destination(m["destination"]),
+        filter=filter,
+        retryPolicy=retryPolicy,
+        deadLetter=deadLetter,
+        eventDeliverySchema=m["eventDeliverySchema"],
+    )
+
+
+def decode_SystemTopic(obj) -> SystemTopic:
+    m = {name: value for _, name, value in obj[3]}
+    return SystemTopic(
+        name=m["name"],
+        shard=m["shard"],
+        subscriptions=[decode_Subscription(e) for e in m["subscriptions"][1]],
+    )
+
+
+def decode_eventgrid(obj) -> eventgrid:
+    m = {name: value for _, name, value in obj[3]}
+    return eventgrid(
+        systemTopics=[decode_SystemTopic(e) for e in m["systemTopics"][1]],
+    )
+
+
+def decode(obj) -> eventgrid:
+    """
+    Builds the `eventgrid` bindings from the evaluator's decoded msgpack
+    output.
+    """
+    return decode_eventgrid(obj)
+
+
+def loads(data: bytes) -> eventgrid:
+    """
+    Builds the `eventgrid` bindings from the evaluator's binary output.
+    """
+    return decode_eventgrid(msgpack.unpackb(data, strict_map_key=False))
+
+
+class _CompiledParser(pkl.Parser):
+    def parse(self, obj):
+        return decode_eventgrid(obj)
+
+
+def load_pkl(source) -> eventgrid:
+    """
+    Evaluates the Pkl module at `source` into `eventgrid` using the compiled
+    decoder.
+    """
+    return pkl.load(source, parser=_CompiledParser())
@@ -12,6 +12,12 @@ PublicNetworkAccess = Literal["Enabled", "Disabled", "SecuredByPerimeter"]
 SkuName = Literal["Basic", "Standard", "Premium"]
 Status = Literal["Active", "Creating", "Deleting", "Disabled", "Restoring", "ReceiveDisabled", "Renaming", "SendDisabled", "Unknown"]
 
+PremiumCapacity = int
+
+PremiumMessagingPartitions = int
+
+Percent = int
+
 LowerCaseConstraint = str
 
 AuthNameContainsContraint = LowerCaseConstraint
@@ -171,6 +177,8 @@ class Topic:
 
     subscriptions: List[Subscription]
 
+    loadHints: Optional[LoadHints]
+
     _registered_identifier = "servicebus#Topic"
 
 
@@ -219,9 +227,22 @@ class Queue:
 
     authorizations: Optional[List[AuthorizationRule]]
 
+    loadHints: Optional[LoadHints]
+
     _registered_identifier = "servicebus#Queue"
 
 
+@dataclass
+class LoadHints:
+    messagesPerSecond: float
+
+    averageMessageSizeInKilobytes: float
+
+    fanOut: Optional[int]
+
+    _registered_identifier = "servicebus#LoadHints"
+
+
 @dataclass
 class AuthorizationRule:
     name: AuthName
@@ -248,6 +269,29 @@ class Sku:
     _registered_identifier = "servicebus#Sku"
 
 
+@dataclass
+class Autoscale:
+    minimumCapacity: PremiumCapacity
+
+    maximumCapacity: PremiumCapacity
+
+    defaultCapacity: PremiumCapacity
+
+    scaleOutCpuPercent: Percent
+
+    scaleInCpuPercent: Percent
+
+    scaleOutMemoryPercent: Optional[Percent]
+
+    scaleInMemoryPercent: Optional[Percent]
+
+    timeWindow: str
+
+    cooldown: str
+
+    _registered_identifier = "servicebus#Autoscale"
+
+
 @dataclass
 class NamespaceOptions:
     alternateName: Optional[str]
@@ -258,6 +302,10 @@ class NamespaceOptions:
 
     zoneRedundant: Optional[bool]
 
+    autoscale: Optional[Autoscale]
+
+    premiumMessagingPartitions: Optional[PremiumMessagingPartitions]
+
     _registered_identifier = "servicebus#NamespaceOptions"
 
 
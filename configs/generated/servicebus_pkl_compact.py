@@ -0,0 +1,665 @@
+# Code generated by scripts/python/gen_pkl_decoder.py --compact from
+# `configs.generated.servicebus_pkl`. DO NOT EDIT.
+from __future__ import annotations
+
+from dataclasses import dataclass
+from sys import intern
+from typing import Dict, Optional, Tuple
+
+import msgpack
+import pkl
+
+from configs.generated.servicebus_pkl import (
+    AuthName,
+    FilterType,
+    NamespaceName,
+    Percent,
+    PremiumCapacity,
+    PremiumMessagingPartitions,
+    PublicNetworkAccess,
+    QueueName,
+    SkuName,
+    Status,
+    SubscriptionName,
+    TopicName,
+)
+
+
+_shared_tuples: dict = {}
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return None if value is None else intern(value)
+
+
+def _tuple(values: tuple) -> tuple:
+    return _shared_tuples.setdefault(values, values)
+
+
+@dataclass(frozen=True, slots=True)
+class RuleSqlFilter:
+    compatibilityLevel: Optional[int]
+
+    requiresPreprocessing: Optional[bool]
+
+    sqlExpression: Optional[str]
+
+    _registered_identifier = "servicebus#RuleSqlFilter"
+
+
+@dataclass(frozen=True, slots=True)
+class RuleCorrelationFilter:
+    contentType: Optional[str]
+
+    correlationId: Optional[str]
+
+    label: Optional[str]
+
+    messageId: Optional[str]
+
+    properties: Optional[Dict[str, str]]
+
+    replyTo: Optional[str]
+
+    replyToSessionId: Optional[str]
+
+    requiresPreprocessing: Optional[bool]
+
+    sessionId: Optional[str]
+
+    to: Optional[str]
+
+    _registered_identifier = "servicebus#RuleCorrelationFilter"
+
+
+@dataclass(frozen=True, slots=True)
+class RuleAction:
+    compatibilityLevel: Optional[int]
+
+    requiresPreprocessing: Optional[bool]
+
+    sqlExpression: Optional[str]
+
+    _registered_identifier = "servicebus#RuleAction"
+
+
+@dataclass(frozen=True, slots=True)
+class SubscriptionRule:
+    action: Optional[RuleAction]
+
+    correlationFilter: Optional[RuleCorrelationFilter]
+
+    filterType: Optional[FilterType]
+
+    rule_name: str
+
+    sqlFilter: Optional[RuleSqlFilter]
+
+    _registered_identifier = "servicebus#SubscriptionRule"
+
+
+@dataclass(frozen=True, slots=True)
+class SubscriptionOptions:
+    autoDeleteOnIdle: Optional[str]
+
+    deadLetteringOnFilterEvaluationExceptions: Optional[bool]
+
+    deadLetteringOnMessageExpiration: Optional[bool]
+
+    defaultMessageTtl: Optional[str]
+
+    duplicateDetectionHistoryTimeWindow: Optional[str]
+
+    enabledBatchOperations: Optional[bool]
+
+    forwardDeadLetteredMessagesTo: Optional[str]
+
+    forwardTo: Optional[str]
+
+    isClientAffine: Optional[bool]
+
+    lockDuration: Optional[str]
+
+    maxDeliveryCount: Optional[int]
+
+    requiresSession: Optional[bool]
+
+    status: Status
+
+    _registered_identifier = "servicebus#SubscriptionOptions"
+
+
+@dataclass(frozen=True, slots=True)
+class Subscription:
+    name: SubscriptionName
+
+    options: SubscriptionOptions
+
+    rules: Tuple[SubscriptionRule, ...]
+
+    _registered_identifier = "servicebus#Subscription"
+
+
+@dataclass(frozen=True, slots=True)
+class TopicOptions:
+    autoDeleteOnIdle: Optional[str]
+
+    defaultMessageTtl: Optional[str]
+
+    duplicateDetectionHistoryTimeWindow: Optional[str]
+
+    enableBatchedOperations: Optional[bool]
+
+    enableExpress: Optional[bool]
+
+    enablePartitioning: Optional[bool]
+
+    maxMessageSizeInKilobytes: Optional[float]
+
+    maxSizeInMegabytes: Optional[int]
+
+    requiresDuplicateDetection: Optional[bool]
+
+    status: Status
+
+    supportOrdering: Optional[bool]
+
+    _registered_identifier = "servicebus#TopicOptions"
+
+
+@dataclass(frozen=True, slots=True)
+class Topic:
+    name: TopicName
+
+    options: TopicOptions
+
+    authorizations: Optional[Tuple[AuthorizationRule, ...]]
+
+    subscriptions: Tuple[Subscription, ...]
+
+    loadHints: Optional[LoadHints]
+
+    _registered_identifier = "servicebus#Topic"
+
+
+@dataclass(frozen=True, slots=True)
+class QueueOptions:
+    autoDeleteOnIdle: Optional[str]
+
+    deadLetteringOnMessageExpiration: Optional[bool]
+
+    defaultMessageTtl: Optional[str]
+
+    duplicateDetectionHistoryTimeWindow: Optional[str]
+
+    enableBatchedOperations: Optional[bool]
+
+    enableExpress: Optional[bool]
+
+    enablePartitioning: Optional[bool]
+
+    forwardDeadLetteredMessagesTo: Optional[str]
+
+    forwardTo: Optional[str]
+
+    lockDuration: Optional[str]
+
+    maxDeliveryCount: Optional[int]
+
+    maxMessageSizeInKilobytes: Optional[float]
+
+    maxSizeInMegabytes: Optional[int]
+
+    requiresDuplicateDetection: Optional[bool]
+
+    requiresSession: Optional[bool]
+
+    status: Status
+
+    _registered_identifier = "servicebus#QueueOptions"
+
+
+@dataclass(frozen=True, slots=True)
+class Queue:
+    name: QueueName
+
+    options: QueueOptions
+
+    authorizations: Optional[Tuple[AuthorizationRule, ...]]
+
+    loadHints: Optional[LoadHints]
+
+    _registered_identifier = "servicebus#Queue"
+
+
+@dataclass(frozen=True, slots=True)
+class LoadHints:
+    messagesPerSecond: float
+
+    averageMessageSizeInKilobytes: float
+
+    fanOut: Optional[int]
+
+    _registered_identifier = "servicebus#LoadHints"
+
+
+@dataclass(frozen=True, slots=True)
+class AuthorizationRule:
+    name: AuthName
+
+    rights: Tuple[str, ...]
+
+    _registered_identifier = "servicebus#AuthorizationRule"
+
+    @property
+    def listen(self) -> bool:
+        return "Listen" in self.rights
+
+    @property
+    def send(self) -> bool:
+        return "Send" in self.rights
+
+    @property
+    def manage(self) -> bool:
+        return "Manage" in self.rights
+
+
+@dataclass(frozen=True, slots=True)
+class Sku:
+    name: SkuName
+
+    tier: str
+
+    capacity: Optional[int]
+
+    _registered_identifier = "servicebus#Sku"
+
+
+@dataclass(frozen=True, slots=True)
+class Autoscale:
+    minimumCapacity: PremiumCapacity
+
+    maximumCapacity: PremiumCapacity
+
+    defaultCapacity: PremiumCapacity
+
+    scaleOutCpuPercent: Percent
+
+    scaleInCpuPercent: Percent
+
+    scaleOutMemoryPercent: Optional[Percent]
+
+    scaleInMemoryPercent: Optional[Percent]
+
+    timeWindow: str
+
+    cooldown: str
+
+    _registered_identifier = "servicebus#Autoscale"
+
+
+@dataclass(frozen=True, slots=True)
+class NamespaceOptions:
+    alternateName: Optional[str]
+
+    publicNetworkAccess: PublicNetworkAccess
+
+    sku: Sku
+
+    zoneRedundant: Optional[bool]
+
+    autoscale: Optional[Autoscale]
+
+    premiumMessagingPartitions: Optional[PremiumMessagingPartitions]
+
+    _registered_identifier = "servicebus#NamespaceOptions"
+
+
+@dataclass(frozen=True, slots=True)
+class Namespace:
+    namePrefix: NamespaceName
+
+    options: NamespaceOptions
+
+    authorizations: Optional[Tuple[AuthorizationRule, ...]]
+
+    queues: Optional[Tuple[Queue, ...]]
+
+    topics: Optional[Tuple[Topic, ...]]
+
+    _registered_identifier = "servicebus#Namespace"
+
+
+@dataclass(frozen=True, slots=True)
+class servicebus:
+    namespaces: Tuple[Namespace, ...]
+
+    _registered_identifier = "servicebus"
+
+
+_shared_RuleSqlFilter: dict = {}
+_shared_RuleAction: dict = {}
+_shared_SubscriptionOptions: dict = {}
+_shared_TopicOptions: dict = {}
+_shared_QueueOptions: dict = {}
+_shared_LoadHints: dict = {}
+_shared_AuthorizationRule: dict = {}
+_shared_Sku: dict = {}
+_shared_Autoscale: dict = {}
+_shared_NamespaceOptions: dict = {}
+
+
+def decode_RuleSqlFilter(obj) -> RuleSqlFilter:
+    m = {name: value for _, name, value in obj[3]}
+    values = (
+        m.get("compatibilityLevel"),
+        m.get("requiresPreprocessing"),
+        _intern(m.get("sqlExpression")),
+    )
+    shared = _shared_RuleSqlFilter.get(values)
+    if shared is None:
+        shared = _shared_RuleSqlFilter[values] = RuleSqlFilter(*values)
+    return shared
+
+
+def decode_RuleCorrelationFilter(obj) -> RuleCorrelationFilter:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("properties")
+    properties = None if v is None else {k: intern(e) for k, e in v[1].items()}
+    return RuleCorrelationFilter(
+        contentType=_intern(m.get("contentType")),
+        correlationId=_intern(m.get("correlationId")),
+        label=_intern(m.get("label")),
+        messageId=_intern(m.get("messageId")),
+        properties=properties,
+        replyTo=_intern(m.get("replyTo")),
+        replyToSessionId=_intern(m.get("replyToSessionId")),
+        requiresPreprocessing=m.get("requiresPreprocessing"),
+        sessionId=_intern(m.get("sessionId")),
+        to=_intern(m.get("to")),
+    )
+
+
+def decode_RuleAction(obj) -> RuleAction:
+    m = {name: value for _, name, value in obj[3]}
+    values = (
+        m.get("compatibilityLevel"),
+        m.get("requiresPreprocessing"),
+        _intern(m.get("sqlExpression")),
+    )
+    shared = _shared_RuleAction.get(values)
+    if shared is None:
+        shared = _shared_RuleAction[values] = RuleAction(*values)
+    return shared
+
+
+def decode_SubscriptionRule(obj) -> SubscriptionRule:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("action")
+    action = None if v is None else decode_RuleAction(v)
+    v = m.get("correlationFilter")
+    correlationFilter = None if v is None else decode_RuleCorrelationFilter(v)
+    v = m.get("sqlFilter")
+    sqlFilter = None if v is None else decode_RuleSqlFilter(v)
+    return SubscriptionRule(
+        action=action,
+        correlationFilter=correlationFilter,
+        filterType=_intern(m.get("filterType")),
+        rule_name=intern(m["rule_name"]),
+        sqlFilter=sqlFilter,
+    )
+
+
+def decode_SubscriptionOptions(obj) -> SubscriptionOptions:
+    m = {name: value for _, name, value in obj[3]}
+    values = (
+        _intern(m.get("autoDeleteOnIdle")),
+        m.get("deadLetteringOnFilterEvaluationExceptions"),
+        m.get("deadLetteringOnMessageExpiration"),
+        _intern(m.get("defaultMessageTtl")),
+        _intern(m.get("duplicateDetectionHistoryTimeWindow")),
+        m.get("enabledBatchOperations"),
+        _intern(m.get("forwardDeadLetteredMessagesTo")),
+        _intern(m.get("forwardTo")),
+        m.get("isClientAffine"),
+        _intern(m.get("lockDuration")),
+        m.get("maxDeliveryCount"),
+        m.get("requiresSession"),
+        intern(m["status"]),
+    )
+    shared = _shared_SubscriptionOptions.get(values)
+    if shared is None:
+        shared = _shared_SubscriptionOptions[values] = SubscriptionOptions(*values)
+    return shared
+
+
+def decode_Subscription(obj) -> Subscription:
+    m = {name: value for _, name, value in obj[3]}
+    return Subscription(
+        name=intern(m["name"]),
+        options=decode_SubscriptionOptions(m["options"]),
+        rules=tuple([decode_SubscriptionRule(e) for e in m["rules"][1]]),
+    )
+
+
+def decode_TopicOptions(obj) -> TopicOptions:
+    m = {name: value for _, name, value in obj[3]}
+    values = (
+        _intern(m.get("autoDeleteOnIdle")),
+        _intern(m.get("defaultMessageTtl")),
+        _intern(m.get("duplicateDetectionHistoryTimeWindow")),
+        m.get("enableBatchedOperations"),
+        m.get("enableExpress"),
+        m.get("enablePartitioning"),
+        m.get("maxMessageSizeInKilobytes"),
+        m.get("maxSizeInMegabytes"),
+        m.get("requiresDuplicateDetection"),
+        intern(m["status"]),
+        m.get("supportOrdering"),
+    )
+    shared = _shared_TopicOptions.get(values)
+    if shared is None:
+        shared = _shared_TopicOptions[values] = TopicOptions(*values)
+    return shared
+
+
+def decode_Topic(obj) -> Topic:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("authorizations")
+    authorizations = None if v is None else tuple([decode_AuthorizationRule(e) for e in v[1]])
+    v = m.get("loadHints")
+    loadHints = None if v is None else decode_LoadHints(v)
+    return Topic(
+        name=intern(m["name"]),
+        options=decode_TopicOptions(m["options"]),
+        authorizations=authorizations,
+        subscriptions=tuple([decode_Subscription(e) for e in m["subscriptions"][1]]),
+        loadHints=loadHints,
+    )
+
+
+def decode_QueueOptions(obj) -> QueueOptions:
+    m = {name: value for _, name, value in obj[3]}
+    values = (
+        _intern(m.get("autoDeleteOnIdle")),
+        m.get("deadLetteringOnMessageExpiration"),
+        _intern(m.get("defaultMessageTtl")),
+        _intern(m.get("duplicateDetectionHistoryTimeWindow")),
+        m.get("enableBatchedOperations"),
+        m.get("enableExpress"),
+        m.get("enablePartitioning"),
+        _intern(m.get("forwardDeadLetteredMessagesTo")),
+        _intern(m.get("forwardTo")),
+        _intern(m.get("lockDuration")),
+        m.get("maxDeliveryCount"),
+        m.get("maxMessageSizeInKilobytes"),
+        m.get("maxSizeInMegabytes"),
+        m.get("requiresDuplicateDetection"),
+        m.get("requiresSession"),
+        intern(m["status"]),
+    )
+    shared = _shared_QueueOptions.get(values)
+    if shared is None:
+        shared = _shared_QueueOptions[values] = QueueOptions(*values)
+    return shared
+
+
+def decode_Queue(obj) -> Queue:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("authorizations")
+    authorizations = None if v is None else tuple([decode_AuthorizationRule(e) for e in v[1]])
+    v = m.get("loadHints")
+    loadHints = None if v is None else decode_LoadHints(v)
+    return Queue(
+        name=intern(m["name"]),
+        options=decode_QueueOptions(m["options"]),
+        authorizations=authorizations,
+        loadHints=loadHints,
+    )
+
+
+def decode_LoadHints(obj) -> LoadHints:
+    m = {name: value for _, name, value in obj[3]}
+    values = (
+        m["messagesPerSecond"],
+        m["averageMessageSizeInKilobytes"],
+        m.get("fanOut"),
+    )
+    shared = _shared_LoadHints.get(values)
+    if shared is None:
+        shared = _shared_LoadHints[values] = LoadHints(*values)
+    return shared
+
+
+def decode_AuthorizationRule(obj) -> AuthorizationRule:
+    m = {name: value for _, name, value in obj[3]}
+    values = (
+        intern(m["name"]),
+        _tuple(tuple(map(intern, m["rights"][1]))),
+    )
+    shared = _shared_AuthorizationRule.get(values)
+    if shared is None:
+        shared = _shared_AuthorizationRule[values] = AuthorizationRule(*values)
+    return shared
+
+
+def decode_Sku(obj) -> Sku:
+    m = {name: value for _, name, value in obj[3]}
+    values = (
+        intern(m["name"]),
+        intern(m["tier"]),
+        m.get("capacity"),
+    )
+    shared = _shared_Sku.get(values)
+    if shared is None:
+        shared = _shared_Sku[values] = Sku(*values)
+    return shared
+
+
+def decode_Autoscale(obj) -> Autoscale:
+    m = {name: value for _, name, value in obj[3]}
+    values = (
+        m["minimumCapacity"],
+        m["maximumCapacity"],
+        m["defaultCapacity"],
+        m["scaleOutCpuPercent"],
+        m["scaleInCpuPercent"],
+        m.get("scaleOutMemoryPercent"),
+        m.get("scaleInMemoryPercent"),
+        intern(m["timeWindow"]),
+        intern(m["cooldown"]),
+    )
+    shared = _shared_Autoscale.get(values)
+    if shared is None:
+        shared = _shared_Autoscale[values] = Autoscale(*values)
+    return shared
+
+
+def decode_NamespaceOptions(obj) -> NamespaceOptions:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("autoscale")
+    autoscale = None if v is None else decode_Autoscale(v)
+    values = (
+        _intern(m.get("alternateName")),
+        intern(m["publicNetworkAccess"]),
+        decode_Sku(m["sku"]),
+        m.get("zoneRedundant"),
+        autoscale,
+        m.get("premiumMessagingPartitions"),
+    )
+    shared = _shared_NamespaceOptions.get(values)
+    if shared is None:
+        shared = _shared_NamespaceOptions[values] = NamespaceOptions(*values)
+    return shared
+
+
+def decode_Namespace(obj) -> Namespace:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("authorizations")
+    authorizations = None if v is None else tuple([decode_AuthorizationRule(e) for e in v[1]])
+    v = m.get("queues")
+    queues = None if v is None else tuple([decode_Queue(e) for e in v[1]])
+    v = m.get("topics")
+    topics = None if v is None else tuple([decode_Topic(e) for e in v[1]])
+    return Namespace(
+        namePrefix=intern(m["namePrefix"]),
+        options=decode_NamespaceOptions(m["options"]),
+        authorizations=authorizations,
+        queues=queues,
+        topics=topics,
+    )
+
+
+def decode_servicebus(obj) -> servicebus:
+    m = {name: value for _, name, value in obj[3]}
+    return servicebus(
+        namespaces=tuple([decode_Namespace(e) for e in m["namespaces"][1]]),
+    )
+
+
+def clear_shared() -> None:
+    """
+    Releases the instances shared between decoded `servicebus` configs.
+    """
+    for shared in (
+        _shared_tuples,
+        _shared_RuleSqlFilter,
+        _shared_RuleAction,
+        _shared_SubscriptionOptions,
+        _shared_TopicOptions,
+        _shared_QueueOptions,
+        _shared_LoadHints,
+        _shared_AuthorizationRule,
+        _shared_Sku,
+        _shared_Autoscale,
+        _shared_NamespaceOptions,
+    ):
+        shared.clear()
+
+
+def decode(obj) -> servicebus:
+    """
+    Builds the `servicebus` bindings from the evaluator's decoded msgpack
+    output.
+    """
+    return decode_servicebus(obj)
+
+
+def loads(data: bytes) -> servicebus:
+    """
+    Builds the `servicebus` bindings from the evaluator's binary output.
+    """
+    return decode_servicebus(msgpack.unpackb(data, strict_map_key=False))
+
+
+class _CompiledParser(pkl.Parser):
+    def parse(self, obj):
+        return decode_servicebus(obj)
+
+
+def load_pkl(source) -> servicebus:
+    """
+    Evaluates the Pkl module at `source` into `servicebus` using the compiled
+    decoder.
+    """
+    return pkl.load(source, parser=_CompiledParser())
@@ -0,0 +1,285 @@
+# Code generated by scripts/python/gen_pkl_decoder.py from `configs.generated.servicebus_pkl`.
+# DO NOT EDIT.
+from __future__ import annotations
+
+import msgpack
+import pkl
+
+from configs.generated.servicebus_pkl import (
+    AuthorizationRule,
+    Autoscale,
+    LoadHints,
+    Namespace,
+    NamespaceOptions,
+    Queue,
+    QueueOptions,
+    RuleAction,
+    RuleCorrelationFilter,
+    RuleSqlFilter,
+    Sku,
+    Subscription,
+    SubscriptionOptions,
+    SubscriptionRule,
+    Topic,
+    TopicOptions,
+    servicebus,
+)
+
+
+def decode_RuleSqlFilter(obj) -> RuleSqlFilter:
+    m = {name: value for _, name, value in obj[3]}
+    return RuleSqlFilter(
+        compatibilityLevel=m.get("compatibilityLevel"),
+        requiresPreprocessing=m.get("requiresPreprocessing"),
+        sqlExpression=m.get("sqlExpression"),
+    )
+
+
+def decode_RuleCorrelationFilter(obj) -> RuleCorrelationFilter:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("properties")
+    properties = None if v is None else v[1]
+    return RuleCorrelationFilter(
+        contentType=m.get("contentType"),
+        correlationId=m.get("correlationId"),
+        label=m.get("label"),
+        messageId=m.get("messageId"),
+        properties=properties,
+        replyTo=m.get("replyTo"),
+        replyToSessionId=m.get("replyToSessionId"),
+        requiresPreprocessing=m.get("requiresPreprocessing"),
+        sessionId=m.get("sessionId"),
+        to=m.get("to"),
+    )
+
+
+def decode_RuleAction(obj) -> RuleAction:
+    m = {name: value for _, name, value in obj[3]}
+    return RuleAction(
+        compatibilityLevel=m.get("compatibilityLevel"),
+        requiresPreprocessing=m.get("requiresPreprocessing"),
+        sqlExpression=m.get("sqlExpression"),
+    )
+
+
+def decode_SubscriptionRule(obj) -> SubscriptionRule:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("action")
+    action = None if v is None else decode_RuleAction(v)
+    v = m.get("correlationFilter")
+    correlationFilter = None if v is None else decode_RuleCorrelationFilter(v)
+    v = m.get("sqlFilter")
+    sqlFilter = None if v is None else decode_RuleSqlFilter(v)
+    return SubscriptionRule(
+        action=action,
+        correlationFilter=correlationFilter,
+        filterType=m.get("filterType"),
+        rule_name=m["rule_name"],
+        sqlFilter=sqlFilter,
+    )
+
+
+def decode_SubscriptionOptions(obj) -> SubscriptionOptions:
+    m = {name: value for _, name, value in obj[3]}
+    return SubscriptionOptions(
+        autoDeleteOnIdle=m.get("autoDeleteOnIdle"),
+        deadLetteringOnFilterEvaluationExceptions=m.get("deadLetteringOnFilterEvaluationExceptions"),
+        deadLetteringOnMessageExpiration=m.get("deadLetteringOnMessageExpiration"),
+        defaultMessageTtl=m.get("defaultMessageTtl"),
+        duplicateDetectionHistoryTimeWindow=m.get("duplicateDetectionHistoryTimeWindow"),
+        enabledBatchOperations=m.get("enabledBatchOperations"),
+        forwardDeadLetteredMessagesTo=m.get("forwardDeadLetteredMessagesTo"),
+        forwardTo=m.get("forwardTo"),
+        isClientAffine=m.get("isClientAffine"),
+        lockDuration=m.get("lockDuration"),
+        maxDeliveryCount=m.get("maxDeliveryCount"),
+        requiresSession=m.get("requiresSession"),
+        status=m["status"],
+    )
+
+
+def decode_Subscription(obj) -> Subscription:
+    m = {name: value for _, name, value in obj[3]}
+    return Subscription(
+        name=m["name"],
+        options=decode_SubscriptionOptions(m["options"]),
+        rules=[decode_SubscriptionRule(e) for e in m["rules"][1]],
+    )
+
+
+def decode_TopicOptions(obj) -> TopicOptions:
+    m = {name: value for _, name, value in obj[3]}
+    return TopicOptions(
+        autoDeleteOnIdle=m.get("autoDeleteOnIdle"),
+        defaultMessageTtl=m.get("defaultMessageTtl"),
+        duplicateDetectionHistoryTimeWindow=m.get("duplicateDetectionHistoryTimeWindow"),
+        enableBatchedOperations=m.get("enableBatchedOperations"),
+        enableExpress=m.get("enableExpress"),
+        enablePartitioning=m.get("enablePartitioning"),
+        maxMessageSizeInKilobytes=m.get("maxMessageSizeInKilobytes"),
+        maxSizeInMegabytes=m.get("maxSizeInMegabytes"),
+        requiresDuplicateDetection=m.get("requiresDuplicateDetection"),
+        status=m["status"],
+        supportOrdering=m.get("supportOrdering"),
+    )
+
+
+def decode_Topic(obj) -> Topic:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("authorizations")
+    authorizations = None if v is None else [decode_AuthorizationRule(e) for e in v[1]]
+    v = m.get("loadHints")
+    loadHints = None if v is None else decode_LoadHints(v)
+    return Topic(
+        name=m["name"],
+        options=decode_TopicOptions(m["options"]),
+        authorizations=authorizations,
+        subscriptions=[decode_Subscription(e) for e in m["subscriptions"][1]],
+        loadHints=loadHints,
+    )
+
+
+def decode_QueueOptions(obj) -> QueueOptions:
+    m = {name: value for _, name, value in obj[3]}
+    return QueueOptions(
+        autoDeleteOnIdle=m.get("autoDeleteOnIdle"),
+        deadLetteringOnMessageExpiration=m.get("deadLetteringOnMessageExpiration"),
+        defaultMessageTtl=m.get("defaultMessageTtl"),
+        duplicateDetectionHistoryTimeWindow=m.get("duplicateDetectionHistoryTimeWindow"),
+        enableBatchedOperations=m.get("enableBatchedOperations"),
+        enableExpress=m.get("enableExpress"),
+        enablePartitioning=m.get("enablePartitioning"),
+        forwardDeadLetteredMessagesTo=m.get("forwardDeadLetteredMessagesTo"),
+        forwardTo=m.get("forwardTo"),
+        lockDuration=m.get("lockDuration"),
+        maxDeliveryCount=m.get("maxDeliveryCount"),
+        maxMessageSizeInKilobytes=m.get("maxMessageSizeInKilobytes"),
+        maxSizeInMegabytes=m.get("maxSizeInMegabytes"),
+        requiresDuplicateDetection=m.get("requiresDuplicateDetection"),
+        requiresSession=m.get("requiresSession"),
+        status=m["status"],
+    )
+
+
+def decode_Queue(obj) -> Queue:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("authorizations")
+    authorizations = None if v is None else [decode_AuthorizationRule(e) for e in v[1]]
+    v = m.get("loadHints")
+    loadHints = None if v is None else decode_LoadHints(v)
+    return Queue(
+        name=m["name"],
+        options=decode_QueueOptions(m["options"]),
+        authorizations=authorizations,
+        loadHints=loadHints,
+    )
+
+
+def decode_LoadHints(obj) -> LoadHints:
+    m = {name: value for _, name, value in obj[3]}
+    return LoadHints(
+        messagesPerSecond=m["messagesPerSecond"],
+        averageMessageSizeInKilobytes=m["averageMessageSizeInKilobytes"],
+        fanOut=m.get("fanOut"),
+    )
+
+
+def decode_AuthorizationRule(obj) -> AuthorizationRule:
+    m = {name: value for _, name, value in obj[3]}
+    return AuthorizationRule(
+        name=m["name"],
+        listen=m["listen"],
+        send=m["send"],
+        manage=m["manage"],
+        rights=m["rights"][1],
+    )
+
+
+def decode_Sku(obj) -> Sku:
+    m = {name: value for _, name, value in obj[3]}
+    return Sku(
+        name=m["name"],
+        tier=m["tier"],
+        capacity=m.get("capacity"),
+    )
+
+
+def decode_Autoscale(obj) -> Autoscale:
+    m = {name: value for _, name, value in obj[3]}
+    return Autoscale(
+        minimumCapacity=m["minimumCapacity"],
+        maximumCapacity=m["maximumCapacity"],
+        defaultCapacity=m["defaultCapacity"],
+        scaleOutCpuPercent=m["scaleOutCpuPercent"],
+        scaleInCpuPercent=m["scaleInCpuPercent"],
+        scaleOutMemoryPercent=m.get("scaleOutMemoryPercent"),
+        scaleInMemoryPercent=m.get("scaleInMemoryPercent"),
+        timeWindow=m["timeWindow"],
+        cooldown=m["cooldown"],
+    )
+
+
+def decode_NamespaceOptions(obj) -> NamespaceOptions:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("autoscale")
+    autoscale = None if v is None else decode_Autoscale(v)
+    return NamespaceOptions(
+        alternateName=m.get("alternateName"),
+        publicNetworkAccess=m["publicNetworkAccess"],
+        sku=decode_Sku(m["sku"]),
+        zoneRedundant=m.get("zoneRedundant"),
+        autoscale=autoscale,
+        premiumMessagingPartitions=m.get("premiumMessagingPartitions"),
+    )
+
+
+def decode_Namespace(obj) -> Namespace:
+    m = {name: value for _, name, value in obj[3]}
+    v = m.get("authorizations")
+    authorizations = None if v is None else [decode_AuthorizationRule(e) for e in v[1]]
+    v = m.get("queues")
+    queues = None if v is None else [decode_Queue(e) for e in v[1]]
+    v = m.get("topics")
+    topics = None if v is None else [decode_Topic(e) for e in v[1]]
+    return Namespace(
+        namePrefix=m["namePrefix"],
+        options=decode_NamespaceOptions(m["options"]),
+        authorizations=authorizations,
+        queues=queues,
+        topics=topics,
+    )
+
+
+def decode_servicebus(obj) -> servicebus:
+    m = {name: value for _, name, value in obj[3]}
+    return servicebus(
+        namespaces=[decode_Namespace(e) for e in m["namespaces"][1]],
+    )
+
+
+def decode(obj) -> servicebus:
+    """
+    Builds the `servicebus` bindings from the evaluator's decoded msgpack
+    output.
+    """
+    return decode_servicebus(obj)
+
+
+def loads(data: bytes) -> servicebus:
+    """
+    Builds the `servicebus` bindings from the evaluator's binary output.
+    """
+    return decode_servicebus(msgpack.unpackb(data, strict_map_key=False))
+
+
+class _CompiledParser(pkl.Parser):
+    def parse(self, obj):
+        return decode_servicebus(obj)
+
+
+def load_pkl(source) -> servicebus:
+    """
+    Evaluates the Pkl module at `source` into `servicebus` using the compiled
+    decoder.
+    """
+    return pkl.load(source, parser=_CompiledParser())
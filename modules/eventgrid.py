@@ -0,0 +1,236 @@
+from typing import Optional
+
+import pulumi_azure_native.eventgrid as eventgrid
+from pulumi import ComponentResource, Input, Output, ResourceOptions
+
+import configs.generated.eventgrid_pkl as peg
+from utils.eventgrid_validation import FILTER_VALUE_MEMBERS, check_eventgrid
+from utils.module_dataclasses import EventGridArgs
+
+STORAGE_TOPIC_TYPE = "Microsoft.Storage.StorageAccounts"
+
+
+class EventGridRouting(ComponentResource):
+    def __init__(
+        self,
+        name: str,
+        args: EventGridArgs,
+        opts: Optional[ResourceOptions] = None,
+    ) -> None:
+        """
+        Routes the events of the StorageChain accounts to Service Bus
+        queues and topics, storage queues or functions, based on Pkl
+        configuration files (`configs/schema/eventgrid-schema.pkl`).
+
+        Every Pkl system topic becomes an `eventgrid.SystemTopic` over its
+        shard's storage account, and each of its subscriptions an
+        `eventgrid.SystemTopicEventSubscription` named
+        `<topic>/<subscription>`, with its filters, retry policy, batching
+        and dead letter container.
+
+        Args:
+            name (str): The name of the Pulumi component.
+            args (EventGridArgs): The routing configuration.
+            opts (Optional[ResourceOptions], optional): The resource options
+                for the component. Defaults to None.
+
+        Attributes:
+            system_topics (dict[str, eventgrid.SystemTopic]): The system
+                topics by name.
+            event_subscriptions (dict[str,
+                eventgrid.SystemTopicEventSubscription]): The event
+                subscriptions by `<topic>/<subscription>`.
+
+        Raises:
+            ValueError: If `args.validate` is set and a destination, filter
+                or dead letter container does not check out.
+        """
+        chain = args.storage_chain
+        if args.validate:
+            # Fail before anything is registered rather than mid-deployment.
+            check_eventgrid(
+                args.pkl_configs,
+                servicebus_namespaces=(
+                    args.servicebus.pkl_configs if args.servicebus else ()
+                ),
+                storage_containers=chain.storage_blob_containers,
+                storage_queues=chain.storage_queues,
+                shard_count=len(chain.storage_accounts),
+                function_app=args.function_app_id is not None,
+            )
+
+        super().__init__(
+            "flash1212:eventgrid:EventGridRouting", name, None, opts
+        )
+
+        self.system_topics: dict[str, eventgrid.SystemTopic] = {}
+        self.event_subscriptions: dict[
+            str, eventgrid.SystemTopicEventSubscription
+        ] = {}
+        self.__args = args
+        # Service Bus destinations are addressed by id, not by resource.
+        depends_on = [args.servicebus] if args.servicebus else []
+
+        for topic in args.pkl_configs:
+            account = chain.storage_accounts[topic.shard]
+            system_topic = eventgrid.SystemTopic(
+                resource_name=topic.name,
+                location=args.location,
+                resource_group_name=args.resource_group_name,
+                source=account.id,
+                system_topic_name=topic.name,
+                topic_type=STORAGE_TOPIC_TYPE,
+                tags=args.tags,
+                opts=ResourceOptions(parent=self),
+            )
+            self.system_topics[topic.name] = system_topic
+            for subscription in topic.subscriptions:
+                key = f"{topic.name}/{subscription.name}"
+                self.event_subscriptions[key] = (
+                    eventgrid.SystemTopicEventSubscription(
+                        resource_name=key,
+                        dead_letter_destination=self.__dead_letter(
+                            subscription.deadLetter
+                        ),
+                        destination=self.__destination(
+                            subscription.destination
+                        ),
+                        event_delivery_schema=subscription.eventDeliverySchema,
+                        event_subscription_name=subscription.name,
+                        filter=self.__filter(subscription.filter),
+                        resource_group_name=args.resource_group_name,
+                        retry_policy=self.__retry_policy(
+                            subscription.retryPolicy
+                        ),
+                        system_topic_name=system_topic.name,
+                        opts=ResourceOptions(
+                            parent=system_topic, depends_on=depends_on
+                        ),
+                    )
+                )
+
+        self.register_outputs({})
+
+    def __destination(self, destination: peg.Destination) -> Input:
+        """
+        Private method to build the event subscription destination.
+        """
+        args = self.__args
+        if destination.type == "StorageQueue":
+            route = args.storage_chain.storage_routes[
+                f"queue/{destination.name}"
+            ]
+            return eventgrid.StorageQueueEventSubscriptionDestinationArgs(
+                endpoint_type="StorageQueue",
+                queue_message_time_to_live_in_seconds=(
+                    destination.queueMessageTimeToLiveInSeconds
+                ),
+                queue_name=args.storage_chain.storage_queues[
+                    destination.name
+                ].name,
+                resource_id=args.storage_chain.storage_accounts[route.shard].id,
+            )
+        if destination.type == "AzureFunction":
+            batching = destination.batching
+            return eventgrid.AzureFunctionEventSubscriptionDestinationArgs(
+                endpoint_type="AzureFunction",
+                max_events_per_batch=(
+                    batching.maxEventsPerBatch if batching else None
+                ),
+                preferred_batch_size_in_kilobytes=(
+                    batching.preferredBatchSizeInKilobytes if batching else None
+                ),
+                resource_id=Output.concat(
+                    args.function_app_id, "/functions/", destination.name
+                ),
+            )
+        queue = destination.type == "ServiceBusQueue"
+        resource_id = Output.concat(
+            "/subscriptions/",
+            args.subscription_id,
+            "/resourceGroups/",
+            args.resource_group_name,
+            "/providers/Microsoft.ServiceBus/namespaces/",
+            destination.namespace,
+            "/queues/" if queue else "/topics/",
+            destination.name,
+        )
+        if queue:
+            return eventgrid.ServiceBusQueueEventSubscriptionDestinationArgs(
+                endpoint_type="ServiceBusQueue", resource_id=resource_id
+            )
+        return eventgrid.ServiceBusTopicEventSubscriptionDestinationArgs(
+            endpoint_type="ServiceBusTopic", resource_id=resource_id
+        )
+
+    def __dead_letter(
+        self, dead_letter: Optional[peg.DeadLetter]
+    ) -> Optional[eventgrid.StorageBlobDeadLetterDestinationArgs]:
+        """
+        Private method to build the dead letter destination, the container's
+        storage account.
+        """
+        if dead_letter is None:
+            return None
+        chain = self.__args.storage_chain
+        route = chain.storage_routes[f"blob/{dead_letter.container}"]
+        return eventgrid.StorageBlobDeadLetterDestinationArgs(
+            blob_container_name=chain.storage_blob_containers[
+                dead_letter.container
+            ].name,
+            endpoint_type="StorageBlob",
+            resource_id=chain.storage_accounts[route.shard].id,
+        )
+
+    @staticmethod
+    def __filter(
+        filter: Optional[peg.Filter],
+    ) -> Optional[eventgrid.EventSubscriptionFilterArgs]:
+        """
+        Private method to build the event subscription filter; every
+        advanced filter becomes the `<operatorType>AdvancedFilterArgs` of
+        its operator.
+        """
+        if filter is None:
+            return None
+        advanced_filters = []
+        for advanced in filter.advancedFilters or ():
+            member = FILTER_VALUE_MEMBERS[advanced.operatorType]
+            value = {}
+            if member in ("numberValue", "boolValue"):
+                value["value"] = getattr(advanced, member)
+            elif member is not None:
+                value["values"] = getattr(advanced, member)
+            advanced_filters.append(
+                getattr(
+                    eventgrid, f"{advanced.operatorType}AdvancedFilterArgs"
+                )(
+                    key=advanced.key,
+                    operator_type=advanced.operatorType,
+                    **value,
+                )
+            )
+        return eventgrid.EventSubscriptionFilterArgs(
+            advanced_filters=advanced_filters or None,
+            enable_advanced_filtering_on_arrays=(
+                filter.enableAdvancedFilteringOnArrays
+            ),
+            included_event_types=filter.includedEventTypes,
+            is_subject_case_sensitive=filter.isSubjectCaseSensitive,
+            subject_begins_with=filter.subjectBeginsWith,
+            subject_ends_with=filter.subjectEndsWith,
+        )
+
+    @staticmethod
+    def __retry_policy(
+        retry_policy: Optional[peg.RetryPolicy],
+    ) -> Optional[eventgrid.RetryPolicyArgs]:
+        """
+        Private method to build the retry policy.
+        """
+        if retry_policy is None:
+            return None
+        return eventgrid.RetryPolicyArgs(
+            event_time_to_live_in_minutes=retry_policy.eventTimeToLiveInMinutes,
+            max_delivery_attempts=retry_policy.maxDeliveryAttempts,
+        )
@@ -1,14 +1,113 @@
-from typing import Optional
+import functools
+from collections import Counter
+from typing import Callable, Optional
 
+import pulumi_azure_native.monitor as monitor
+import pulumi_azure_native.resources as resources
 import pulumi_azure_native.servicebus as asb
 from pulumi import (
+    Alias,
     ComponentResource,
+    InvokeOutputOptions,
     Output,
     ResourceOptions,
+    create_urn,
+    log,
 )
 
 import configs.generated.servicebus_pkl as psb
-from utils.module_dataclasses import SecretsObject, ServiceBusArgs
+from utils.arg_mapping import QUEUE_ARGS, SUBSCRIPTION_ARGS, TOPIC_ARGS
+from utils.module_dataclasses import (
+    LazySecrets,
+    SecretIndexKey,
+    SecretsObject,
+    ServiceBusArgs,
+)
+from utils.servicebus_autoscale import (
+    METRIC_NAMESPACE,
+    SCALE_TYPE,
+    TIME_GRAIN,
+    scale_rules,
+)
+from utils.servicebus_capacity import capacity_findings, check_capacity
+from utils.servicebus_filters import FilterRewrite, rewrite_sql_filter
+from utils.servicebus_template import ArmAuthorization, compile_namespace
+from utils.servicebus_validation import (
+    authorization_secret_names,
+    check_servicebus,
+)
+
+_NAMESPACE_TYPE = "azure-native:servicebus:Namespace"
+_QUEUE_TYPE = "azure-native:servicebus:Queue"
+_TOPIC_TYPE = "azure-native:servicebus:Topic"
+_SUBSCRIPTION_TYPE = "azure-native:servicebus:Subscription"
+
+
+def _scoped(*names: str) -> str:
+    """
+    Joins the names leading to an entity into its Pulumi resource name,
+    e.g. `orders-ns/events/reader-sub`. Service Bus names cannot contain
+    `/`, so scoped names never collide.
+    """
+    return "/".join(names)
+
+
+def _legacy_name_counts(
+    namespaces: list[psb.Namespace],
+) -> Counter[tuple[str, str]]:
+    """
+    Counts the flat resource names used before namespaces and topics became
+    child components, by kind.
+    """
+    counts: Counter[tuple[str, str]] = Counter()
+    for namespace in namespaces:
+        counts[("namespace", namespace.namePrefix)] += 1
+        for auth in namespace.authorizations or ():
+            counts[("namespace-auth", f"{auth.name}-auth")] += 1
+        for queue in namespace.queues or ():
+            counts[("queue", f"{queue.name}-queue")] += 1
+            for auth in queue.authorizations or ():
+                counts[("queue-auth", f"{auth.name}-auth")] += 1
+        for topic in namespace.topics or ():
+            counts[("topic", f"{topic.name}-topic")] += 1
+            for auth in topic.authorizations or ():
+                counts[("topic-auth", f"{auth.name}-auth")] += 1
+            for subscription in topic.subscriptions or ():
+                counts[("subscription", f"{subscription.name}-sub")] += 1
+                for rule in subscription.rules or ():
+                    counts[("rule", f"{rule.rule_name}-rule")] += 1
+    return counts
+
+
+class ServiceBusNamespace(ComponentResource):
+    def __init__(
+        self, name: str, opts: Optional[ResourceOptions] = None
+    ) -> None:
+        """
+        Groups the resources of one Service Bus namespace, so that
+        `pulumi up --target <urn> --target-dependents` covers the whole
+        namespace. Created by `ServiceBus`.
+
+        Args:
+            name (str): The namespace name.
+            opts (Optional[ResourceOptions], optional): The resource options.
+        """
+        super().__init__("caregility:sbs:Namespace", name, None, opts)
+
+
+class ServiceBusTopic(ComponentResource):
+    def __init__(
+        self, name: str, opts: Optional[ResourceOptions] = None
+    ) -> None:
+        """
+        Groups a Service Bus topic with its subscriptions, rules and
+        authorization rules. Created by `ServiceBus`.
+
+        Args:
+            name (str): The scoped topic name, `<namespace>/<topic>`.
+            opts (Optional[ResourceOptions], optional): The resource options.
+        """
+        super().__init__("caregility:sbs:Topic", name, None, opts)
 
 
 class ServiceBus(ComponentResource):
@@ -27,14 +126,36 @@ class ServiceBus(ComponentResource):
                 Namespace.
             opts (Optional[ResourceOptions], optional): The resource options for
                 the component. Defaults to None.
+        Every namespace becomes a `caregility:sbs:Namespace` and every
+        topic a `caregility:sbs:Topic` child component, and resource names
+        are scoped by hierarchy (`<namespace>/<queue>-queue`,
+        `<namespace>/<topic>/<subscription>-sub`, ...), so identically named
+        entities in different namespaces or topics do not collide.
+
         Attributes:
-            servicebus_secrets (SecretsObject): List of Service Bus
-                connection strings.
+            servicebus_secrets (SecretsObject): Service Bus connection
+                strings in a LazySecrets mapping; the keys of an
+                authorization rule are only listed once one of its
+                secrets is read.
             resource_group_name (str): The name of the resource group.
             tags (dict): Tags associated with the Service Bus.
+            pkl_configs (list[psb.Namespace]): The deployed topology.
+            filter_rewrites (list[FilterRewrite]): The subscription rules
+                created with a correlation filter in place of their SQL
+                filter, if `args.rewrite_sql_filters` is set.
         Returns:
             None
+        Raises:
+            ValueError: If `args.validate` is set and the Pkl configs violate
+                the schema or Azure constraints, or if `args.capacity_planning`
+                is "enforce" and a namespace does not fit its estimated load.
         """
+        if args.validate:
+            # Fail before anything is registered rather than mid-deployment.
+            check_servicebus(args.pkl_configs)
+        if args.capacity_planning == "enforce":
+            check_capacity(args.pkl_configs)
+
         super().__init__(
             "caregility:sbs:ServiceBus",
             name,
@@ -45,35 +166,78 @@ class ServiceBus(ComponentResource):
         )
 
         self.servicebus_secrets = SecretsObject(
-            secrets={},
+            secrets=LazySecrets(),
             origin="automation",
             purpose="servicebus_namespace_secrets",
         )
+        if args.capacity_planning == "warn":
+            for finding in capacity_findings(args.pkl_configs):
+                log.warn(f"Capacity: {finding}", resource=self)
         self.resource_group_name = args.resource_group_name
         self.tags = args.tags
-        conn_str_suffix = "ConnectionString"
+        self.pkl_configs = args.pkl_configs
+        self.filter_rewrites: list[FilterRewrite] = []
+        self.__rewrite_sql_filters = args.rewrite_sql_filters
+
+        self.__legacy_names = (
+            _legacy_name_counts(args.pkl_configs)
+            if args.legacy_aliases and args.deployment_mode == "resources"
+            else None
+        )
+        # Rules keep their unscoped secret names unless those collide.
+        self.__secret_names = authorization_secret_names(args.pkl_configs)
 
         for namespace in args.pkl_configs:
+            ns = namespace.namePrefix
+            ns_component = ServiceBusNamespace(
+                ns, opts=ResourceOptions(parent=self)
+            )
+            if args.deployment_mode == "template":
+                self.__deploy_template(namespace, args, parent=ns_component)
+                ns_component.register_outputs({})
+                continue
+
+            autoscale = namespace.options.autoscale
+            ignore_changes = ["privateEndpointConnections"]
+            if autoscale:
+                # Autoscale owns the messaging units once deployed.
+                ignore_changes.append("sku.capacity")
             svc_bus = asb.Namespace(
-                resource_name=namespace.namePrefix,
+                resource_name=ns,
                 args=asb.NamespaceArgs(
                     alternate_name=namespace.options.alternateName,
                     location=args.location,
-                    namespace_name=namespace.namePrefix,
+                    namespace_name=ns,
+                    premium_messaging_partitions=namespace.options.premiumMessagingPartitions,
                     public_network_access=namespace.options.publicNetworkAccess,
                     resource_group_name=self.resource_group_name,
                     sku=asb.SBSkuArgs(
                         name=asb.SkuName(namespace.options.sku.name),
                         tier=asb.SkuTier(namespace.options.sku.tier),
+                        capacity=autoscale.defaultCapacity
+                        if autoscale
+                        else namespace.options.sku.capacity,
                     ),
                     tags=args.tags,
                     zone_redundant=namespace.options.zoneRedundant,
                 ),
                 opts=ResourceOptions(
-                    parent=self,
-                    ignore_changes=["privateEndpointConnections"],
+                    parent=ns_component,
+                    ignore_changes=ignore_changes,
+                    aliases=self.__aliases("namespace", ns, self),
                 ),
             )
+            if autoscale:
+                self.__create_autoscale_setting(
+                    autoscale=autoscale,
+                    namespace=svc_bus,
+                    location=args.location,
+                    tags=args.tags,
+                    parent=ns_component,
+                    resource_name=_scoped(ns, "autoscale"),
+                    autoscale_setting_name=f"{ns}-autoscale",
+                )
+            legacy_ns = self.__legacy_urn(ns, _NAMESPACE_TYPE, self)
             if namespace.authorizations:
                 for auth in namespace.authorizations:
                     self.__create_authorization_rule(
@@ -81,12 +245,34 @@ class ServiceBus(ComponentResource):
                         namespace_name=svc_bus.name,
                         rights=auth.rights,
                         parent=svc_bus,
-                        secret_name=f"{auth.name.capitalize()}Namespace{conn_str_suffix}",
+                        secret_name=self.__secret_names[
+                            ("Namespace", ns, None, auth.name)
+                        ],
+                        index_key=(ns, None, auth.name),
+                        resource_name=_scoped(ns, f"{auth.name}-auth"),
+                        aliases=self.__aliases(
+                            "namespace-auth", f"{auth.name}-auth", legacy_ns
+                        ),
                     )
 
             if namespace.topics:
                 for topic in namespace.topics:
-                    tp = self.__create_topic(topic=topic, parent=svc_bus)
+                    topic_component = ServiceBusTopic(
+                        _scoped(ns, topic.name),
+                        opts=ResourceOptions(parent=ns_component),
+                    )
+                    tp = self.__create_topic(
+                        topic=topic,
+                        namespace=svc_bus,
+                        parent=topic_component,
+                        resource_name=_scoped(ns, f"{topic.name}-topic"),
+                        aliases=self.__aliases(
+                            "topic", f"{topic.name}-topic", legacy_ns
+                        ),
+                    )
+                    legacy_tp = self.__legacy_urn(
+                        f"{topic.name}-topic", _TOPIC_TYPE, legacy_ns
+                    )
                     if topic.authorizations:
                         for auth in topic.authorizations:
                             self.__create_authorization_rule(
@@ -94,7 +280,16 @@ class ServiceBus(ComponentResource):
                                 namespace_name=svc_bus.name,
                                 rights=auth.rights,
                                 parent=tp,
-                                secret_name=f"{auth.name.capitalize()}Topic{conn_str_suffix}",
+                                secret_name=self.__secret_names[
+                                    ("Topic", ns, topic.name, auth.name)
+                                ],
+                                index_key=(ns, topic.name, auth.name),
+                                resource_name=_scoped(
+                                    ns, topic.name, f"{auth.name}-auth"
+                                ),
+                                aliases=self.__aliases(
+                                    "topic-auth", f"{auth.name}-auth", legacy_tp
+                                ),
                             )
                     if topic.subscriptions:
                         for subscription in topic.subscriptions:
@@ -102,6 +297,19 @@ class ServiceBus(ComponentResource):
                                 namespace=svc_bus,
                                 subscription=subscription,
                                 parent=tp,
+                                resource_name=_scoped(
+                                    ns, topic.name, f"{subscription.name}-sub"
+                                ),
+                                aliases=self.__aliases(
+                                    "subscription",
+                                    f"{subscription.name}-sub",
+                                    legacy_tp,
+                                ),
+                            )
+                            legacy_sub = self.__legacy_urn(
+                                f"{subscription.name}-sub",
+                                _SUBSCRIPTION_TYPE,
+                                legacy_tp,
                             )
                             if subscription.rules:
                                 for rule in subscription.rules:
@@ -111,11 +319,33 @@ class ServiceBus(ComponentResource):
                                         parent=sub,
                                         subscription_name=sub.name,
                                         topic_name=tp.name,
+                                        resource_name=_scoped(
+                                            ns,
+                                            topic.name,
+                                            subscription.name,
+                                            f"{rule.rule_name}-rule",
+                                        ),
+                                        aliases=self.__aliases(
+                                            "rule",
+                                            f"{rule.rule_name}-rule",
+                                            legacy_sub,
+                                        ),
                                     )
+                    topic_component.register_outputs({})
 
             if namespace.queues:
                 for queue in namespace.queues:
-                    sbq = self.__create_queue(queue=queue, parent=svc_bus)
+                    sbq = self.__create_queue(
+                        queue=queue,
+                        parent=svc_bus,
+                        resource_name=_scoped(ns, f"{queue.name}-queue"),
+                        aliases=self.__aliases(
+                            "queue", f"{queue.name}-queue", legacy_ns
+                        ),
+                    )
+                    legacy_q = self.__legacy_urn(
+                        f"{queue.name}-queue", _QUEUE_TYPE, legacy_ns
+                    )
                     if queue.authorizations:
                         for auth in queue.authorizations:
                             self.__create_authorization_rule(
@@ -123,13 +353,141 @@ class ServiceBus(ComponentResource):
                                 namespace_name=svc_bus.name,
                                 rights=auth.rights,
                                 parent=sbq,
-                                secret_name=f"{auth.name.capitalize()}Queue{conn_str_suffix}",
+                                secret_name=self.__secret_names[
+                                    ("Queue", ns, queue.name, auth.name)
+                                ],
+                                index_key=(ns, queue.name, auth.name),
+                                resource_name=_scoped(
+                                    ns, queue.name, f"{auth.name}-auth"
+                                ),
+                                aliases=self.__aliases(
+                                    "queue-auth", f"{auth.name}-auth", legacy_q
+                                ),
                             )
+            ns_component.register_outputs({})
 
+        # Schema fields azure-native has no argument for are not deployed.
+        for mapper in (QUEUE_ARGS, TOPIC_ARGS, SUBSCRIPTION_ARGS):
+            for source_class in mapper.seen():
+                for name in mapper.unmapped(source_class):
+                    log.warn(
+                        f"{source_class.__name__}.{name} has no "
+                        f"{mapper.args_class.__name__} argument and is not "
+                        "deployed",
+                        resource=self,
+                    )
         self.register_outputs({})
 
+    def __aliases(
+        self,
+        kind: str,
+        legacy_name: str,
+        legacy_parent: Optional[ComponentResource | Output[str]],
+    ) -> Optional[list[Alias]]:
+        """
+        Private method returning the alias to the flat, unscoped name and
+        parent a resource had before namespaces and topics became child
+        components, so existing stacks update in place. Names that were not
+        unique in the flat layout could never have been deployed and get no
+        alias.
+        """
+        if self.__legacy_names is None or legacy_parent is None:
+            return None
+        if self.__legacy_names[(kind, legacy_name)] > 1:
+            return None
+        return [Alias(name=legacy_name, parent=legacy_parent)]
+
+    def __legacy_urn(
+        self,
+        legacy_name: str,
+        type_: str,
+        legacy_parent: Optional[ComponentResource | Output[str]],
+    ) -> Optional[Output[str]]:
+        """
+        Private method returning the URN a resource had in the flat layout,
+        the parent of its children's aliases.
+        """
+        if self.__legacy_names is None or legacy_parent is None:
+            return None
+        return create_urn(legacy_name, type_, parent=legacy_parent)
+
+    def __create_autoscale_setting(
+        self,
+        autoscale: psb.Autoscale,
+        namespace: asb.Namespace,
+        location: str,
+        tags: dict[str, str],
+        parent: ComponentResource,
+        resource_name: str,
+        autoscale_setting_name: str,
+    ) -> monitor.AutoscaleSetting:
+        """
+        Private method to create the Azure Monitor autoscale setting scaling
+        a Premium namespace's messaging units on CPU and memory usage.
+
+        Args:
+            autoscale (psb.Autoscale): The Pkl autoscale config.
+            namespace (Namespace): The namespace resource.
+            location (str): The location of the autoscale setting.
+            tags (dict[str, str]): Tags of the autoscale setting.
+            parent (ServiceBusNamespace): The parent namespace component.
+            resource_name (str): The scoped Pulumi resource name.
+            autoscale_setting_name (str): The Azure name of the setting.
+
+        Returns:
+            AutoscaleSetting: The autoscale setting.
+        """
+        rules = [
+            monitor.ScaleRuleArgs(
+                metric_trigger=monitor.MetricTriggerArgs(
+                    metric_name=rule.metric_name,
+                    metric_namespace=METRIC_NAMESPACE,
+                    metric_resource_uri=namespace.id,
+                    operator=monitor.ComparisonOperationType(rule.operator),
+                    statistic=monitor.MetricStatisticType.AVERAGE,
+                    threshold=rule.threshold,
+                    time_aggregation=monitor.TimeAggregationType.AVERAGE,
+                    time_grain=TIME_GRAIN,
+                    time_window=rule.time_window,
+                ),
+                scale_action=monitor.ScaleActionArgs(
+                    cooldown=rule.cooldown,
+                    direction=monitor.ScaleDirection(rule.direction),
+                    type=monitor.ScaleType(SCALE_TYPE),
+                    value="1",
+                ),
+            )
+            for rule in scale_rules(autoscale)
+        ]
+        return monitor.AutoscaleSetting(
+            resource_name,
+            autoscale_setting_name=autoscale_setting_name,
+            enabled=True,
+            location=location,
+            profiles=[
+                monitor.AutoscaleProfileArgs(
+                    name="messaging-units",
+                    capacity=monitor.ScaleCapacityArgs(
+                        default=str(autoscale.defaultCapacity),
+                        maximum=str(autoscale.maximumCapacity),
+                        minimum=str(autoscale.minimumCapacity),
+                    ),
+                    rules=rules,
+                )
+            ],
+            resource_group_name=self.resource_group_name,
+            tags=tags,
+            target_resource_uri=namespace.id,
+            opts=ResourceOptions(parent=parent),
+        )
+
     def __create_topic(
-        self, topic: psb.Topic, parent: asb.Namespace
+        self,
+        topic: psb.Topic,
+        namespace: asb.Namespace,
+        parent: ComponentResource,
+        resource_name: str,
+        aliases: Optional[list[Alias]],
     ) -> asb.Topic:
         """
         Private method to create a new Azure Service Bus Topic from
@@ -137,33 +495,31 @@ class ServiceBus(ComponentResource):
 
         Args:
             topic (pkl_sbs.Topic): The Pkl configuration for the topic.
-            parent (Namespace): The parent namespace resource.
+            namespace (Namespace): The namespace resource.
+            parent (ServiceBusTopic): The parent topic component.
+            resource_name (str): The scoped Pulumi resource name.
+            aliases (Optional[list[Alias]]): Aliases of the resource.
 
         Returns:
             Topic: The Azure Service Bus Topic resource.
         """
         return asb.Topic(
-            f"{topic.name}-topic",
+            resource_name,
             asb.TopicArgs(
-                namespace_name=parent.name,
+                namespace_name=namespace.name,
                 resource_group_name=self.resource_group_name,
                 topic_name=topic.name,
-                auto_delete_on_idle=topic.options.autoDeleteOnIdle,
-                default_message_time_to_live=topic.options.defaultMessageTtl,
-                duplicate_detection_history_time_window=topic.options.duplicateDetectionHistoryTimeWindow,
-                enable_batched_operations=topic.options.enableBatchedOperations,
-                enable_express=topic.options.enableExpress,
-                enable_partitioning=topic.options.enablePartitioning,
-                max_size_in_megabytes=topic.options.maxSizeInMegabytes,
-                requires_duplicate_detection=topic.options.requiresDuplicateDetection,
-                status=asb.EntityStatus(topic.options.status),
-                support_ordering=topic.options.supportOrdering,
+                **TOPIC_ARGS.kwargs(topic.options),
             ),
-            opts=ResourceOptions(parent=parent),
+            opts=ResourceOptions(parent=parent, aliases=aliases),
         )
 
     def __create_queue(
-        self, queue: psb.Queue, parent: asb.Namespace
+        self,
+        queue: psb.Queue,
+        parent: asb.Namespace,
+        resource_name: str,
+        aliases: Optional[list[Alias]],
     ) -> asb.Queue:
         """
         Private method to create a new Azure Service Bus Queue from
@@ -172,34 +528,21 @@ class ServiceBus(ComponentResource):
         Args:
             queue (pkl_sbs.Queue): The Pkl configuration for the queue.
             parent (Namespace): The parent namespace resource.
+            resource_name (str): The scoped Pulumi resource name.
+            aliases (Optional[list[Alias]]): Aliases of the resource.
 
         Returns:
             Queue: The Azure Service Bus Queue resource.
         """
         return asb.Queue(
-            f"{queue.name}-queue",
+            resource_name,
             asb.QueueArgs(
                 namespace_name=parent.name,
                 resource_group_name=self.resource_group_name,
                 queue_name=queue.name,
-                auto_delete_on_idle=queue.options.autoDeleteOnIdle,
-                dead_lettering_on_message_expiration=queue.options.deadLetteringOnMessageExpiration,
-                default_message_time_to_live=queue.options.defaultMessageTtl,
-                duplicate_detection_history_time_window=queue.options.duplicateDetectionHistoryTimeWindow,
-                enable_batched_operations=queue.options.enableBatchedOperations,
-                enable_express=queue.options.enableExpress,
-                enable_partitioning=queue.options.enablePartitioning,
-                forward_dead_lettered_messages_to=queue.options.forwardDeadLetteredMessagesTo,
-                forward_to=queue.options.forwardTo,
-                lock_duration=queue.options.lockDuration,
-                max_delivery_count=queue.options.maxDeliveryCount,
-                max_message_size_in_kilobytes=queue.options.maxMessageSizeInKilobytes,
-                max_size_in_megabytes=queue.options.maxSizeInMegabytes,
-                requires_duplicate_detection=queue.options.requiresDuplicateDetection,
-                requires_session=queue.options.requiresSession,
-                status=asb.EntityStatus(queue.options.status),
+                **QUEUE_ARGS.kwargs(queue.options),
             ),
-            opts=ResourceOptions(parent=parent),
+            opts=ResourceOptions(parent=parent, aliases=aliases),
         )
 
     def __create_subscription(
@@ -207,6 +550,8 @@ class ServiceBus(ComponentResource):
         namespace: asb.Namespace,
         subscription: psb.Subscription,
         parent: asb.Topic,
+        resource_name: str,
+        aliases: Optional[list[Alias]],
     ) -> asb.Subscription:
         """
         Private method to create a new Azure Service Bus Subscription from
@@ -218,33 +563,23 @@ class ServiceBus(ComponentResource):
             subscription (pkl_sbs.Subscription): The Pkl configuration for
                 the subscription.
             parent (Topic): The parent topic resource.
+            resource_name (str): The scoped Pulumi resource name.
+            aliases (Optional[list[Alias]]): Aliases of the resource.
 
         Returns:
             Subscription: The Azure Service Bus Subscription
             resource.
         """
         return asb.Subscription(
-            f"{subscription.name}-sub",
+            resource_name,
             asb.SubscriptionArgs(
                 namespace_name=namespace.name,
                 resource_group_name=self.resource_group_name,
                 subscription_name=subscription.name,
                 topic_name=parent.name,
-                auto_delete_on_idle=subscription.options.autoDeleteOnIdle,
-                dead_lettering_on_filter_evaluation_exceptions=subscription.options.deadLetteringOnFilterEvaluationExceptions,
-                dead_lettering_on_message_expiration=subscription.options.deadLetteringOnMessageExpiration,
-                default_message_time_to_live=subscription.options.defaultMessageTtl,
-                duplicate_detection_history_time_window=subscription.options.duplicateDetectionHistoryTimeWindow,
-                enable_batched_operations=subscription.options.enabledBatchOperations,
-                forward_dead_lettered_messages_to=subscription.options.forwardDeadLetteredMessagesTo,
-                forward_to=subscription.options.forwardTo,
-                is_client_affine=subscription.options.isClientAffine,
-                lock_duration=subscription.options.lockDuration,
-                max_delivery_count=subscription.options.maxDeliveryCount,
-                requires_session=subscription.options.requiresSession,
-                status=asb.EntityStatus(subscription.options.status),
+                **SUBSCRIPTION_ARGS.kwargs(subscription.options),
             ),
-            opts=ResourceOptions(parent=parent),
+            opts=ResourceOptions(parent=parent, aliases=aliases),
         )
 
     def __create_subscription_rule(
@@ -254,7 +589,26 @@ class ServiceBus(ComponentResource):
         parent: asb.Subscription,
         subscription_name: Output[str],
         topic_name: Output[str],
+        resource_name: str,
+        aliases: Optional[list[Alias]],
     ):
+        filter_type = rule.filterType
+        correlation_filter = rule.correlationFilter
+        sql_filter = rule.sqlFilter
+        if self.__rewrite_sql_filters:
+            rewritten = rewrite_sql_filter(rule)
+            if rewritten is not None:
+                rewrite = FilterRewrite(
+                    path=resource_name.removesuffix("-rule"),
+                    sql_expression=sql_filter.sqlExpression,
+                    correlation_filter=rewritten,
+                )
+                self.filter_rewrites.append(rewrite)
+                log.info(f"Rewrote {rewrite}", resource=self)
+                filter_type = "CorrelationFilter"
+                correlation_filter = rewritten
+                sql_filter = None
+
         action_args = None
         if rule.action:
             action_args = asb.ActionArgs(
@@ -263,39 +617,39 @@ class ServiceBus(ComponentResource):
                 sql_expression=rule.action.sqlExpression,
             )
         correlation_filter_args = None
-        if rule.correlationFilter:
+        if correlation_filter:
             correlation_filter_args = asb.CorrelationFilterArgs(
-                correlation_id=rule.correlationFilter.correlationId,
-                content_type=rule.correlationFilter.contentType,
-                label=rule.correlationFilter.label,
-                message_id=rule.correlationFilter.messageId,
-                properties=rule.correlationFilter.properties,
-                reply_to=rule.correlationFilter.replyTo,
-                reply_to_session_id=rule.correlationFilter.replyToSessionId,
-                requires_preprocessing=rule.correlationFilter.requiresPreprocessing,
-                session_id=rule.correlationFilter.sessionId,
-                to=rule.correlationFilter.to,
+                correlation_id=correlation_filter.correlationId,
+                content_type=correlation_filter.contentType,
+                label=correlation_filter.label,
+                message_id=correlation_filter.messageId,
+                properties=correlation_filter.properties,
+                reply_to=correlation_filter.replyTo,
+                reply_to_session_id=correlation_filter.replyToSessionId,
+                requires_preprocessing=correlation_filter.requiresPreprocessing,
+                session_id=correlation_filter.sessionId,
+                to=correlation_filter.to,
             )
         sql_filter_args = None
-        if rule.sqlFilter:
+        if sql_filter:
             sql_filter_args = asb.SqlFilterArgs(
-                compatibility_level=rule.sqlFilter.compatibilityLevel,
-                requires_preprocessing=rule.sqlFilter.requiresPreprocessing,
-                sql_expression=rule.sqlFilter.sqlExpression,
+                compatibility_level=sql_filter.compatibilityLevel,
+                requires_preprocessing=sql_filter.requiresPreprocessing,
+                sql_expression=sql_filter.sqlExpression,
             )
 
         return asb.Rule(
-            f"{rule.rule_name}-rule",
+            resource_name,
             namespace_name=namespace_name,
             resource_group_name=self.resource_group_name,
             subscription_name=subscription_name,
             topic_name=topic_name,
             action=action_args,
             correlation_filter=correlation_filter_args,
-            filter_type=asb.FilterType(rule.filterType),
+            filter_type=asb.FilterType(filter_type),
             rule_name=rule.rule_name,
             sql_filter=sql_filter_args,
-            opts=ResourceOptions(parent=parent),
+            opts=ResourceOptions(parent=parent, aliases=aliases),
         )
 
     def __create_authorization_rule(
@@ -305,6 +659,9 @@ class ServiceBus(ComponentResource):
         parent: asb.Queue | asb.Topic | asb.Namespace,
         rights: list[str],
         secret_name: str,
+        index_key: SecretIndexKey,
+        resource_name: str,
+        aliases: Optional[list[Alias]],
     ) -> None:
         """
         Private method to create a new Azure Service Bus Authorization Rule
@@ -318,6 +675,10 @@ class ServiceBus(ComponentResource):
                 resource.
             rights (list[str]): The rights for the authorization rule.
             secret_name (str): The name of the secret.
+            index_key (SecretIndexKey): The (namespace, entity, rule) the
+                secrets are indexed by.
+            resource_name (str): The scoped Pulumi resource name.
+            aliases (Optional[list[Alias]]): Aliases of the resource.
 
         Returns:
             TopicAuthorizationRule |
@@ -326,7 +687,7 @@ class ServiceBus(ComponentResource):
         """
         if isinstance(parent, asb.Queue):
             rule = asb.QueueAuthorizationRule(
-                f"{name}-auth",
+                resource_name,
                 asb.QueueAuthorizationRuleArgs(
                     namespace_name=namespace_name,
                     resource_group_name=self.resource_group_name,
@@ -334,18 +695,19 @@ class ServiceBus(ComponentResource):
                     authorization_rule_name=name,
                     rights=[asb.AccessRights(right) for right in rights],
                 ),
-                opts=ResourceOptions(parent=parent),
+                opts=ResourceOptions(parent=parent, aliases=aliases),
             )
 
-            keys = asb.list_queue_keys_output(
-                authorization_rule_name=rule.name,
-                namespace_name=namespace_name,
-                queue_name=parent.name,
-                resource_group_name=self.resource_group_name,
-            )
+            def list_keys():
+                return asb.list_queue_keys_output(
+                    authorization_rule_name=rule.name,
+                    namespace_name=namespace_name,
+                    queue_name=parent.name,
+                    resource_group_name=self.resource_group_name,
+                )
         elif isinstance(parent, asb.Topic):
             rule = asb.TopicAuthorizationRule(
-                f"{name}-auth",
+                resource_name,
                 asb.TopicAuthorizationRuleArgs(
                     namespace_name=namespace_name,
                     resource_group_name=self.resource_group_name,
@@ -353,40 +715,152 @@ class ServiceBus(ComponentResource):
                     authorization_rule_name=name,
                     rights=[asb.AccessRights(right) for right in rights],
                 ),
-                opts=ResourceOptions(parent=parent),
-            )
-            keys = asb.list_topic_keys_output(
-                authorization_rule_name=rule.name,
-                topic_name=parent.name,
-                namespace_name=namespace_name,
-                resource_group_name=self.resource_group_name,
+                opts=ResourceOptions(parent=parent, aliases=aliases),
             )
+
+            def list_keys():
+                return asb.list_topic_keys_output(
+                    authorization_rule_name=rule.name,
+                    topic_name=parent.name,
+                    namespace_name=namespace_name,
+                    resource_group_name=self.resource_group_name,
+                )
         elif isinstance(parent, asb.Namespace):
             rule = asb.NamespaceAuthorizationRule(
-                f"{name}-auth",
+                resource_name,
                 asb.NamespaceAuthorizationRuleArgs(
                     namespace_name=namespace_name,
                     resource_group_name=self.resource_group_name,
                     authorization_rule_name=name,
                     rights=[asb.AccessRights(right) for right in rights],
                 ),
-                opts=ResourceOptions(parent=parent),
-            )
-            keys = asb.list_namespace_keys_output(
-                authorization_rule_name=rule.name,
-                namespace_name=namespace_name,
-                resource_group_name=self.resource_group_name,
+                opts=ResourceOptions(parent=parent, aliases=aliases),
             )
 
-        primary_connection_string = Output.secret(
-            keys.apply(lambda k: k.primary_connection_string)
-        )
-        secondary_connection_string = Output.secret(
-            keys.apply(lambda k: k.secondary_connection_string)
+            def list_keys():
+                return asb.list_namespace_keys_output(
+                    authorization_rule_name=rule.name,
+                    namespace_name=namespace_name,
+                    resource_group_name=self.resource_group_name,
+                )
+
+        self.__defer_connection_strings(list_keys, secret_name, index_key)
+
+    def __defer_connection_strings(
+        self,
+        list_keys: Callable[[], Output],
+        secret_name: str,
+        index_key: SecretIndexKey,
+    ) -> None:
+        """
+        Private method to register an authorization rule's primary and
+        secondary connection strings in `servicebus_secrets`.
+
+        Args:
+            list_keys (Callable[[], Output]): Invokes the rule's list keys
+                function.
+            secret_name (str): The name of the secret.
+            index_key (SecretIndexKey): The (namespace, entity, rule) the
+                secrets are indexed by.
+        """
+        # One invoke per rule, run when the first of its secrets is read.
+        keys = functools.cache(list_keys)
+        self.servicebus_secrets.secrets.defer(
+            f"{secret_name}Primary",
+            lambda: Output.secret(
+                keys().apply(lambda k: k.primary_connection_string)
+            ),
+            index_key=index_key,
         )
-        self.servicebus_secrets.secrets.update(
-            {
-                f"{secret_name}Primary": primary_connection_string,
-                f"{secret_name}Secondary": secondary_connection_string,
-            }
+        self.servicebus_secrets.secrets.defer(
+            f"{secret_name}Secondary",
+            lambda: Output.secret(
+                keys().apply(lambda k: k.secondary_connection_string)
+            ),
+            index_key=index_key,
         )
+
+    def __deploy_template(
+        self,
+        namespace: psb.Namespace,
+        args: ServiceBusArgs,
+        parent: ServiceBusNamespace,
+    ) -> None:
+        """
+        Private method to deploy a namespace and its whole topology as ARM
+        template deployments, applied server side in as few requests as
+        ARM's template size limit allows. The templates are deployed one
+        after the other, parents first.
+
+        The deployments are incremental: a complete deployment would delete
+        everything else in the resource group, including the namespace's
+        other templates. Entities removed from the config therefore stay in
+        Azure; `plan_targets` reports them as orphans.
+
+        Args:
+            namespace (psb.Namespace): The Pkl configuration for the
+                namespace.
+            args (ServiceBusArgs): The component arguments.
+            parent (ServiceBusNamespace): The namespace component.
+        """
+        deployment = None
+        for index, arm_template in enumerate(
+            compile_namespace(namespace, args.location, args.tags)
+        ):
+            deployment = resources.Deployment(
+                _scoped(namespace.namePrefix, f"deployment-{index}"),
+                resources.DeploymentArgs(
+                    resource_group_name=self.resource_group_name,
+                    properties=resources.DeploymentPropertiesArgs(
+                        mode=resources.DeploymentMode.INCREMENTAL,
+                        template=arm_template.template,
+                    ),
+                ),
+                opts=ResourceOptions(
+                    parent=parent,
+                    depends_on=[deployment] if deployment else None,
+                ),
+            )
+            for auth in arm_template.authorizations:
+                self.__defer_connection_strings(
+                    list_keys=self.__template_list_keys(auth, deployment),
+                    secret_name=self.__secret_names[
+                        (auth.scope, auth.namespace, auth.entity, auth.name)
+                    ],
+                    index_key=(auth.namespace, auth.entity, auth.name),
+                )
+
+    def __template_list_keys(
+        self, auth: ArmAuthorization, deployment: resources.Deployment
+    ) -> Callable[[], Output]:
+        """
+        Private method returning the list keys invoke of an authorization
+        rule deployed by `deployment`.
+        """
+        opts = InvokeOutputOptions(depends_on=[deployment])
+
+        def list_keys():
+            if auth.scope == "Queue":
+                return asb.list_queue_keys_output(
+                    authorization_rule_name=auth.name,
+                    namespace_name=auth.namespace,
+                    queue_name=auth.entity,
+                    resource_group_name=self.resource_group_name,
+                    opts=opts,
+                )
+            if auth.scope == "Topic":
+                return asb.list_topic_keys_output(
+                    authorization_rule_name=auth.name,
+                    namespace_name=auth.namespace,
+                    topic_name=auth.entity,
+                    resource_group_name=self.resource_group_name,
+                    opts=opts,
+                )
+            return asb.list_namespace_keys_output(
+                authorization_rule_name=auth.name,
+                namespace_name=auth.namespace,
+                resource_group_name=self.resource_group_name,
+                opts=opts,
+            )
+
+        return list_keys
@@ -1,10 +1,33 @@
-from typing import Optional
+from datetime import timedelta
+from typing import Any, Optional
 
 from attr import dataclass, field
-from pulumi import ComponentResource, InvokeOptions, Output, ResourceOptions
+from pulumi import (
+    Alias,
+    ComponentResource,
+    Input,
+    Output,
+    Resource,
+    ResourceOptions,
+)
 from pulumi_azure_native import cosmosdb, storage
 
+import configs.generated.cosmos_pkl as pcs
+from utils.cosmos_validation import check_cosmos, check_cosmos_account
 from utils.module_dataclasses import SecretsObject
+from utils.storage_sas import (
+    SAS_LIFETIME,
+    SAS_TIME_BUCKET,
+    blob_service_sas,
+    sas_window,
+)
+from utils.storage_sharding import (
+    MAX_ACCOUNT_NAME_LENGTH,
+    assign_shards,
+    connection_name,
+    shard_name,
+)
+from utils.storage_validation import check_storage_account
 
 
 @dataclass
@@ -18,6 +41,10 @@ class CosmosDBArgs:
     resource_group_name: Output[str]
     cosmos_account_args: CosmosComponentArgs
     tags: dict = field(factory=dict)
+    databases: list[pcs.Database] = field(factory=list)
+    validate: bool = True
+    profile: Optional["CosmosProfile"] = None
+    regions: list[str] = field(factory=list)
 
 
 @dataclass
@@ -35,6 +62,17 @@ class StorageArgs:
     storage_blob_properties_args: Optional[StorageComponentArgs] = None
     storage_container_sas_args: Optional[list[StorageComponentArgs]] = None
     storage_queue_args: Optional[list[StorageComponentArgs]] = None
+    sas_time_bucket: timedelta = SAS_TIME_BUCKET
+    sas_lifetime: timedelta = SAS_LIFETIME
+    shard_count: int = 1
+    shard_pins: dict[str, int] = field(factory=dict)
+
+
+@dataclass
+class StorageRoute:
+    shard: int
+    connection: str
+    endpoint: Output[str]
 
 
 class StorageAccountDefaults:
@@ -65,6 +103,267 @@ class StorageAccountDefaults:
     sku: storage.SkuArgs = storage.SkuArgs(name=storage.SkuName.STANDARD_LRS)
 
 
+@dataclass(frozen=True)
+class StorageProfile:
+    """
+    A named storage account configuration and the blob service properties
+    that go with it.
+
+    Attributes:
+        description (str): What the profile is for.
+        account_args (dict): `storage.StorageAccount` arguments, without
+            location and resource group.
+        blob_properties_args (Optional[dict]): `storage.BlobServiceProperties`
+            arguments, without account and resource group; None if the
+            account has no blob service.
+    """
+
+    description: str
+    account_args: dict
+    blob_properties_args: Optional[dict] = None
+
+
+def storage_account_defaults() -> dict:
+    """
+    The `StorageAccountDefaults` properties as `storage.StorageAccount`
+    arguments.
+    """
+    return {
+        k: v
+        for k, v in vars(StorageAccountDefaults).items()
+        if not k.startswith("__") and not callable(v)
+    }
+
+
+def _soft_delete(days: int) -> dict:
+    return {
+        "delete_retention_policy": storage.DeleteRetentionPolicyArgs(
+            enabled=True, days=days
+        ),
+        "container_delete_retention_policy": (
+            storage.DeleteRetentionPolicyArgs(enabled=True, days=days)
+        ),
+    }
+
+
+def _premium(
+    kind: storage.Kind, sku: storage.SkuName, **account_args: Any
+) -> dict:
+    # Premium accounts have no access tier.
+    defaults = storage_account_defaults()
+    del defaults["access_tier"]
+    return {
+        **defaults,
+        "kind": kind,
+        "sku": storage.SkuArgs(name=sku),
+        **account_args,
+    }
+
+
+STORAGE_PROFILES: dict[str, StorageProfile] = {
+    "standard": StorageProfile(
+        description="General purpose v2, Standard_LRS, Hot tier",
+        account_args=storage_account_defaults(),
+        blob_properties_args=_soft_delete(7),
+    ),
+    "premium_block_blob": StorageProfile(
+        description="Premium block blobs (SSD, low latency), Premium_LRS",
+        account_args=_premium(
+            storage.Kind.BLOCK_BLOB_STORAGE, storage.SkuName.PREMIUM_LRS
+        ),
+        blob_properties_args=_soft_delete(7),
+    ),
+    "premium_block_blob_zrs": StorageProfile(
+        description="Premium block blobs (SSD, low latency), Premium_ZRS",
+        account_args=_premium(
+            storage.Kind.BLOCK_BLOB_STORAGE, storage.SkuName.PREMIUM_ZRS
+        ),
+        blob_properties_args=_soft_delete(7),
+    ),
+    "analytics": StorageProfile(
+        description="Hierarchical namespace (Data Lake Storage) for analytics",
+        account_args={**storage_account_defaults(), "is_hns_enabled": True},
+        # No versioning or change feed with a hierarchical namespace.
+        blob_properties_args=_soft_delete(7),
+    ),
+    "premium_files": StorageProfile(
+        description="Premium file shares (SSD), Premium_LRS, no blob service",
+        account_args=_premium(
+            storage.Kind.FILE_STORAGE, storage.SkuName.PREMIUM_LRS
+        ),
+    ),
+    "large_file_shares": StorageProfile(
+        description="General purpose v2 with 100 TiB standard file shares",
+        account_args={
+            **storage_account_defaults(),
+            "large_file_shares_state": storage.LargeFileSharesState.ENABLED,
+        },
+        blob_properties_args=_soft_delete(7),
+    ),
+}
+
+
+def storage_profile(name: str) -> StorageProfile:
+    """
+    Look up a storage profile by name.
+
+    Args:
+        name (str): A key of `STORAGE_PROFILES`.
+
+    Returns:
+        StorageProfile: The profile.
+
+    Raises:
+        ValueError: If there is no such profile.
+    """
+    if name not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown storage profile '{name}', expected one of "
+            f"{sorted(STORAGE_PROFILES)}"
+        )
+    return STORAGE_PROFILES[name]
+
+
+@dataclass(frozen=True)
+class CosmosProfile:
+    """
+    A named Cosmos DB account configuration: its regions, consistency and
+    capabilities.
+
+    Attributes:
+        description (str): What the profile is for.
+        consistency_policy (cosmosdb.ConsistencyPolicyArgs): The default
+            consistency level and its staleness bounds.
+        serverless (bool): Whether the account is serverless, in a single
+            region.
+        multi_region_writes (bool): Whether every region accepts writes.
+        zone_redundant (bool): Whether every region spans availability
+            zones.
+        dedicated_gateway (Optional[dict]): `SqlDedicatedGateway` service
+            properties (`instance_size`, `instance_count`) for the
+            integrated cache; None for no gateway.
+    """
+
+    description: str
+    consistency_policy: cosmosdb.ConsistencyPolicyArgs
+    serverless: bool = False
+    multi_region_writes: bool = False
+    zone_redundant: bool = False
+    dedicated_gateway: Optional[dict] = None
+
+    def account_args(self, regions: list[str]) -> dict:
+        """
+        The `cosmosdb.DatabaseAccount` arguments of the profile, without
+        resource group and name.
+
+        Args:
+            regions (list[str]): The account regions, the first one taking
+                writes (and every one with `multi_region_writes`) and the
+                rest failing over in order. Put the regions of the compute
+                that reads the account here.
+
+        Returns:
+            dict: The account arguments.
+        """
+        return {
+            "database_account_offer_type": (
+                cosmosdb.DatabaseAccountOfferType.STANDARD
+            ),
+            "locations": [
+                cosmosdb.LocationArgs(
+                    failover_priority=priority,
+                    is_zone_redundant=self.zone_redundant,
+                    location_name=region,
+                )
+                for priority, region in enumerate(regions)
+            ],
+            "backup_policy": cosmosdb.ContinuousModeBackupPolicyArgs(
+                continuous_mode_properties=cosmosdb.ContinuousModePropertiesArgs(
+                    tier=cosmosdb.ContinuousTier.CONTINUOUS7_DAYS,
+                ),
+                type="Continuous",
+            ),
+            "capabilities": [cosmosdb.CapabilityArgs(name="EnableServerless")]
+            if self.serverless
+            else [],
+            "consistency_policy": self.consistency_policy,
+            "default_identity": "FirstPartyIdentity",
+            "enable_automatic_failover": len(regions) > 1,
+            "enable_multiple_write_locations": self.multi_region_writes,
+            "kind": cosmosdb.DatabaseAccountKind.GLOBAL_DOCUMENT_DB,
+            "minimal_tls_version": cosmosdb.MinimalTlsVersion.TLS12,
+            "public_network_access": cosmosdb.PublicNetworkAccess.ENABLED,
+        }
+
+
+_SESSION = cosmosdb.ConsistencyPolicyArgs(
+    default_consistency_level=cosmosdb.DefaultConsistencyLevel.SESSION,
+)
+
+COSMOS_PROFILES: dict[str, CosmosProfile] = {
+    "serverless": CosmosProfile(
+        description="Serverless, single region, Session consistency",
+        consistency_policy=_SESSION,
+        serverless=True,
+    ),
+    "multi_region_reads": CosmosProfile(
+        description="Provisioned, zone redundant, reads in every region, "
+        "writes in the first, Session consistency",
+        consistency_policy=_SESSION,
+        zone_redundant=True,
+    ),
+    "multi_region_bounded_reads": CosmosProfile(
+        description="As multi_region_reads, reads at most 100000 writes or "
+        "5 minutes behind",
+        consistency_policy=cosmosdb.ConsistencyPolicyArgs(
+            default_consistency_level=(
+                cosmosdb.DefaultConsistencyLevel.BOUNDED_STALENESS
+            ),
+            max_interval_in_seconds=300,
+            max_staleness_prefix=100000,
+        ),
+        zone_redundant=True,
+    ),
+    "multi_region_writes": CosmosProfile(
+        description="Provisioned, zone redundant, reads and writes in every "
+        "region, Session consistency",
+        consistency_policy=_SESSION,
+        multi_region_writes=True,
+        zone_redundant=True,
+    ),
+    "integrated_cache": CosmosProfile(
+        description="Provisioned, Session consistency, dedicated gateway "
+        "with the integrated cache",
+        consistency_policy=_SESSION,
+        dedicated_gateway={
+            "instance_size": cosmosdb.ServiceSize.COSMOS_D4S,
+            "instance_count": 1,
+        },
+    ),
+}
+
+
+def cosmos_profile(name: str) -> CosmosProfile:
+    """
+    Look up a Cosmos DB profile by name.
+
+    Args:
+        name (str): A key of `COSMOS_PROFILES`.
+
+    Returns:
+        CosmosProfile: The profile.
+
+    Raises:
+        ValueError: If there is no such profile.
+    """
+    if name not in COSMOS_PROFILES:
+        raise ValueError(
+            f"Unknown Cosmos DB profile '{name}', expected one of "
+            f"{sorted(COSMOS_PROFILES)}"
+        )
+    return COSMOS_PROFILES[name]
+
+
 class CosmosNoSQL(ComponentResource):
     """
     Create a Storage Account with specified components.
@@ -76,14 +375,74 @@ class CosmosNoSQL(ComponentResource):
         args: CosmosDBArgs,
         opts: ResourceOptions,
     ):
+        """
+        `args.databases` (Pkl configs of `configs/schema/cosmos-schema.pkl`)
+        are provisioned as SQL databases and containers with their partition
+        keys, indexing policies, unique keys, TTL and manual or autoscale
+        throughput.
+
+        With `args.profile`, the account arguments come from the profile
+        over `args.regions` (see `COSMOS_PROFILES`), and
+        `args.cosmos_account_args.args` are merged over them. A profile
+        with a dedicated gateway also creates the `SqlDedicatedGateway`
+        service for the integrated cache.
+
+        Attributes:
+            cosmos_account (cosmosdb.DatabaseAccount): The account.
+            sql_databases (dict[str, cosmosdb.SqlResourceSqlDatabase]): The
+                databases by name.
+            sql_containers (dict[str, cosmosdb.SqlResourceSqlContainer]): The
+                containers by `<database>/<container>`.
+            dedicated_gateway (Optional[cosmosdb.Service]): The dedicated
+                gateway, if the profile has one.
+            dedicated_gateway_endpoint (Optional[Output[str]]): The
+                endpoint clients read through the integrated cache from.
+            primary_master_key (Output[str]): The primary key.
+            primary_readonly_master_key (Output[str]): The primary read-only
+                key.
+            connection_strings (Output[dict[str, str]]): The connection
+                string of every key by description, e.g. `Primary SQL
+                Connection String`.
+            cosmos_secrets (SecretsObject): Keys and connection strings of
+                the account, see `COSMOS_SECRET_NAMES`.
+
+        Raises:
+            ValueError: If the account arguments combine regions,
+                consistency and capabilities Azure does not support, or
+                `args.validate` is set and the database configs violate
+                Cosmos DB constraints (see `utils.cosmos_validation`).
+        """
+        profile = args.profile
+        account_args = (
+            {
+                **profile.account_args(args.regions),
+                **args.cosmos_account_args.args,
+            }
+            if profile
+            else args.cosmos_account_args.args
+        )
+        gateway = profile.dedicated_gateway if profile else None
+        problems = check_cosmos_account(
+            account_args, dedicated_gateway=gateway is not None
+        )
+        if problems:
+            raise ValueError(
+                f"Cosmos DB account '{args.cosmos_account_args.name}': "
+                + "; ".join(problems)
+            )
+        serverless = _serverless(account_args)
+        if args.validate:
+            check_cosmos(args.databases, serverless=serverless)
         super().__init__("flash1212:storage:StorageChain", name, None, opts)
 
         self.opts = ResourceOptions.merge(opts, ResourceOptions(parent=self))
+        self.sql_databases: dict[str, cosmosdb.SqlResourceSqlDatabase] = {}
+        self.sql_containers: dict[str, cosmosdb.SqlResourceSqlContainer] = {}
 
         self.cosmos_account = cosmosdb.DatabaseAccount(
             resource_name=args.cosmos_account_args.name,
             resource_group_name=args.resource_group_name,
-            **args.cosmos_account_args.args,
+            **account_args,
             tags={
                 **args.tags,
                 "defaultExperience": "Core (SQL)",
@@ -93,14 +452,103 @@ class CosmosNoSQL(ComponentResource):
             opts=self.opts,
         )
 
+        self.dedicated_gateway: Optional[cosmosdb.Service] = None
+        self.dedicated_gateway_endpoint: Optional[Output[str]] = None
+        if gateway is not None:
+            self.dedicated_gateway = cosmosdb.Service(
+                resource_name=f"{args.cosmos_account_args.name}-gateway",
+                account_name=self.cosmos_account.name,
+                properties=cosmosdb.SqlDedicatedGatewayServiceResourceCreateUpdatePropertiesArgs(
+                    service_type=cosmosdb.ServiceType.SQL_DEDICATED_GATEWAY,
+                    **gateway,
+                ),
+                resource_group_name=args.resource_group_name,
+                service_name="SqlDedicatedGateway",
+                opts=ResourceOptions(parent=self.cosmos_account),
+            )
+            self.dedicated_gateway_endpoint = Output.concat(
+                "https://", self.cosmos_account.name, ".sqlx.cosmos.azure.com/"
+            )
+
+        for database in args.databases:
+            self.__create_database(
+                database,
+                args.resource_group_name,
+                args.cosmos_account_args.name,
+            )
+
         self.__get_keys_and_string(
             account_name=self.cosmos_account.name,
             resource_group_name=args.resource_group_name,
+            document_endpoint=self.cosmos_account.document_endpoint,
         )
 
+    def __create_database(
+        self,
+        database: pcs.Database,
+        resource_group_name: Output[str],
+        account_name: str,
+    ) -> None:
+        """
+        Private method to create a SQL database and its containers. Their
+        resource names start with the account's, so same-named databases
+        and containers of different accounts get distinct URNs.
+        """
+        sql_database = cosmosdb.SqlResourceSqlDatabase(
+            resource_name=f"{account_name}/{database.name}",
+            account_name=self.cosmos_account.name,
+            database_name=database.name,
+            options=_throughput_options(database.throughput),
+            resource=cosmosdb.SqlDatabaseResourceArgs(id=database.name),
+            resource_group_name=resource_group_name,
+            opts=ResourceOptions(parent=self.cosmos_account),
+        )
+        self.sql_databases[database.name] = sql_database
+
+        for container in database.containers:
+            key = f"{database.name}/{container.name}"
+            self.sql_containers[key] = cosmosdb.SqlResourceSqlContainer(
+                resource_name=f"{account_name}/{key}",
+                account_name=self.cosmos_account.name,
+                container_name=container.name,
+                database_name=sql_database.name,
+                options=_throughput_options(container.throughput),
+                resource=cosmosdb.SqlContainerResourceArgs(
+                    id=container.name,
+                    default_ttl=container.defaultTtl,
+                    indexing_policy=_indexing_policy(container.indexingPolicy),
+                    partition_key=cosmosdb.ContainerPartitionKeyArgs(
+                        kind=container.partitionKey.kind,
+                        paths=container.partitionKey.paths,
+                        # Hierarchical keys need the version 2 hash.
+                        version=2
+                        if container.partitionKey.kind == "MultiHash"
+                        else None,
+                    ),
+                    unique_key_policy=cosmosdb.UniqueKeyPolicyArgs(
+                        unique_keys=[
+                            cosmosdb.UniqueKeyArgs(paths=paths)
+                            for paths in container.uniqueKeys
+                        ]
+                    )
+                    if container.uniqueKeys
+                    else None,
+                ),
+                resource_group_name=resource_group_name,
+                opts=ResourceOptions(parent=sql_database),
+            )
+
     def __get_keys_and_string(
-        self, account_name: Output[str], resource_group_name: Output[str]
+        self,
+        account_name: Output[str],
+        resource_group_name: Output[str],
+        document_endpoint: Output[str],
     ) -> None:
+        """
+        Private method to list the account keys, in one invoke, and derive
+        the connection strings from them and the document endpoint, in one
+        apply, rather than listing them with a second invoke.
+        """
         self.cosmos_account_keys: Output[
             cosmosdb.ListDatabaseAccountKeysResult
         ] = Output.secret(
@@ -109,21 +557,24 @@ class CosmosNoSQL(ComponentResource):
                 resource_group_name=resource_group_name,
             )
         )
-        self.primary_master_key: Output[str] = Output.secret(
-            self.cosmos_account_keys.apply(lambda sak: sak.primary_master_key)
-        )
-        self.primary_readonly_master_key: Output[str] = Output.secret(
-            self.cosmos_account_keys.apply(
-                lambda sak: sak.primary_readonly_master_key
+        derived: Output[dict[str, Any]] = Output.secret(
+            Output.all(self.cosmos_account_keys, document_endpoint).apply(
+                lambda keys_and_endpoint: _cosmos_secrets(*keys_and_endpoint)
             )
         )
-        self.connection_strings: Output[
-            cosmosdb.ListDatabaseAccountConnectionStringsResult
-        ] = Output.secret(
-            cosmosdb.list_database_account_connection_strings_output(
-                account_name=account_name,
-                resource_group_name=resource_group_name,
-            )
+        self.primary_master_key: Output[str] = derived["primary_master_key"]
+        self.primary_readonly_master_key: Output[str] = derived[
+            "primary_readonly_master_key"
+        ]
+        self.connection_strings: Output[dict[str, str]] = derived[
+            "connection_strings"
+        ]
+        self.cosmos_secrets = SecretsObject(
+            secrets={
+                name: derived["secrets"][name] for name in COSMOS_SECRET_NAMES
+            },
+            origin="automation",
+            purpose="cosmos_account_secrets",
         )
 
 
@@ -138,126 +589,483 @@ class StorageChain(ComponentResource):
         args: StorageArgs,
         opts: ResourceOptions,
     ):
+        """
+        With `args.shard_count` above 1, the blob containers and queues are
+        spread across that many storage accounts by rendezvous hashing of
+        their names (see `utils.storage_sharding`). Adding shards moves the
+        containers and queues the new accounts win, and a moved container
+        or queue is deleted with its data and recreated empty on its new
+        account. `args.shard_pins` (`blob/<name>` or `queue/<name>` to
+        shard) keeps them where they are; their data has to be migrated by
+        hand before unpinning them. Shard 0 keeps the unsharded resource
+        and secret names, the others get their index appended.
+
+        Attributes:
+            storage_account (storage.StorageAccount): Shard 0's account.
+            storage_accounts (list[storage.StorageAccount]): Every shard's
+                account.
+            storage_routes (dict[str, StorageRoute]): The shard of every
+                container (`blob/<name>`) and queue (`queue/<name>`).
+            storage_secrets (SecretsObject): Keys and connection strings of
+                every account and the SAS tokens.
+
+        Raises:
+            ValueError: If `args.shard_count` is below 1, a pin names an
+                unknown container or queue or a shard outside the count, a
+                shard's account name is too long or the account, blob
+                properties, containers and queues do not go together (see
+                `utils.storage_validation`).
+        """
+        if args.shard_count < 1:
+            raise ValueError(
+                f"shard_count must be at least 1, got {args.shard_count}"
+            )
+        pins = {"blob": {}, "queue": {}}
+        for key, shard in args.shard_pins.items():
+            kind, _, pinned = key.partition("/")
+            names = {
+                "blob": args.storage_blob_container_args,
+                "queue": args.storage_queue_args,
+            }.get(kind)
+            if not any(item.name == pinned for item in names or ()):
+                raise ValueError(
+                    f"Shard pin '{key}' is not a blob/<container> or "
+                    "queue/<queue> of the chain"
+                )
+            if not 0 <= shard < args.shard_count:
+                raise ValueError(
+                    f"Shard pin '{key}' is shard {shard}, expected 0 to "
+                    f"{args.shard_count - 1}"
+                )
+            pins[kind][pinned] = shard
+        problems = check_storage_account(
+            account_args=args.storage_account_args.args,
+            blob_properties_args=(
+                args.storage_blob_properties_args.args
+                if args.storage_blob_properties_args
+                else None
+            ),
+            container_count=len(args.storage_blob_container_args or ()),
+            queue_count=len(args.storage_queue_args or ()),
+        )
+        if problems:
+            raise ValueError(
+                f"Storage account '{args.storage_account_args.name}': "
+                + "; ".join(problems)
+            )
         super().__init__("flash1212:storage:StorageChain", name, None, opts)
 
         self.opts = ResourceOptions.merge(opts, ResourceOptions(parent=self))
         self.storage_blob_svc_props = None
         self.storage_blob_containers: dict[str, storage.BlobContainer] = {}
         self.storage_queues: dict[str, storage.Queue] = {}
+        self.storage_routes: dict[str, StorageRoute] = {}
         self.storage_sas_urls: dict[str, Output[dict[str, Output[str]]]] = {}
         self.storage_secrets: SecretsObject
 
-        self.storage_account = storage.StorageAccount(
-            resource_name=args.storage_account_args.name,
-            **args.storage_account_args.args,
-            opts=self.opts,
-        )
+        self.storage_accounts: list[storage.StorageAccount] = [
+            storage.StorageAccount(
+                resource_name=shard_name(args.storage_account_args.name, shard),
+                **_shard_account_args(args.storage_account_args.args, shard),
+                opts=self.opts,
+            )
+            for shard in range(args.shard_count)
+        ]
+        self.storage_account = self.storage_accounts[0]
 
+        blob_parents: list[Resource] = list(self.storage_accounts)
         if args.storage_blob_properties_args:
-            self.storage_blob_svc_props = storage.BlobServiceProperties(
-                resource_name=args.storage_blob_properties_args.name,
-                **{
-                    **args.storage_blob_properties_args.args,
-                    "account_name": self.storage_account.name,
-                },
-                opts=ResourceOptions(parent=self.storage_account),
-            )
+            for shard, account in enumerate(self.storage_accounts):
+                blob_parents[shard] = storage.BlobServiceProperties(
+                    resource_name=shard_name(
+                        args.storage_blob_properties_args.name, shard
+                    ),
+                    **{
+                        **args.storage_blob_properties_args.args,
+                        "account_name": account.name,
+                    },
+                    opts=ResourceOptions(parent=account),
+                )
+            self.storage_blob_svc_props = blob_parents[0]
 
         if args.storage_blob_container_args:
+            shards = assign_shards(
+                (
+                    container.name
+                    for container in args.storage_blob_container_args
+                ),
+                args.shard_count,
+                pins["blob"],
+            )
             for container in args.storage_blob_container_args:
-                self.storage_blob_containers[container.name] = (
-                    storage.BlobContainer(
-                        resource_name=container.name,
-                        **{
-                            **container.args,
-                            "account_name": self.storage_account.name,
-                        },
-                        opts=ResourceOptions(
-                            parent=self.storage_blob_svc_props
-                            if self.storage_blob_svc_props
-                            else self.storage_account
-                        ),
-                    )
-                )
-
-        sas_secrets = {}
-        if args.storage_container_sas_args:
-            for sas in args.storage_container_sas_args:
-                sas_token_result = (
-                    storage.list_storage_account_service_sas_output(
-                        **{
-                            **sas.args,
-                            "account_name": self.storage_account.name,
-                        },
-                        opts=InvokeOptions(parent=self.storage_account),
-                    )
-                )
-                sas_token = sas_token_result.apply(
-                    lambda r: r.service_sas_token
+                shard = shards[container.name]
+                account = self.storage_accounts[shard]
+                blob_container = storage.BlobContainer(
+                    resource_name=container.name,
+                    **{
+                        **container.args,
+                        "account_name": account.name,
+                    },
+                    # Stacks deployed without blob properties had their
+                    # containers under the account; keep their URNs.
+                    opts=ResourceOptions(
+                        parent=blob_parents[shard],
+                        aliases=[Alias(parent=account)]
+                        if blob_parents[shard] is not account
+                        else None,
+                    ),
                 )
-                sas_secrets[f"{sas.name}_sas_token"] = Output.secret(sas_token)
-                sas_secrets[f"{sas.name}_sas_url"] = Output.secret(
-                    Output.concat(
-                        self.storage_account.primary_endpoints.blob,
-                        sas.name,
-                        "?",
-                        sas_token,
-                    )
+                self.storage_blob_containers[container.name] = blob_container
+                self.storage_routes[f"blob/{container.name}"] = StorageRoute(
+                    shard=shard,
+                    connection=connection_name(shard),
+                    endpoint=Output.concat(
+                        account.primary_endpoints.blob, blob_container.name
+                    ),
                 )
 
         if args.storage_queue_args:
+            shards = assign_shards(
+                (queue.name for queue in args.storage_queue_args),
+                args.shard_count,
+                pins["queue"],
+            )
             for queue in args.storage_queue_args:
-                self.storage_queues[queue.name] = storage.Queue(
+                shard = shards[queue.name]
+                account = self.storage_accounts[shard]
+                storage_queue = storage.Queue(
                     resource_name=queue.name,
                     **{
                         **queue.args,
-                        "account_name": self.storage_account.name,
+                        "account_name": account.name,
                     },
-                    opts=ResourceOptions(parent=self.storage_account),
+                    opts=ResourceOptions(parent=account),
+                )
+                self.storage_queues[queue.name] = storage_queue
+                self.storage_routes[f"queue/{queue.name}"] = StorageRoute(
+                    shard=shard,
+                    connection=connection_name(shard),
+                    endpoint=Output.concat(
+                        account.primary_endpoints.queue, storage_queue.name
+                    ),
                 )
 
         self.__get_and_set_secrets(
-            account_name=self.storage_account.name,
             resource_group_name=args.resource_group_name,
-            sas_secrets=sas_secrets,
+            sas_args=args.storage_container_sas_args or [],
+            window=sas_window(
+                bucket=args.sas_time_bucket, lifetime=args.sas_lifetime
+            ),
         )
 
         self.register_outputs({})
 
+    def routing_app_settings(
+        self, client_id: Input[str]
+    ) -> dict[str, Input[str]]:
+        """
+        Function app settings of a sharded chain: an identity based
+        connection per shard (`StorageShard<i>__blobServiceUri`, ...) and
+        the connection of every container and queue
+        (`StorageRoute__blob__<name>`, `StorageRoute__queue__<name>`, with
+        hyphens as underscores). Empty if the chain is not sharded.
+
+        Args:
+            client_id (Input[str]): Client id of the managed identity the
+                app connects with.
+
+        Returns:
+            dict[str, Input[str]]: App setting name to value.
+        """
+        if len(self.storage_accounts) == 1:
+            return {}
+        settings: dict[str, Input[str]] = {}
+        for shard, account in enumerate(self.storage_accounts):
+            connection = connection_name(shard)
+            settings[f"{connection}__blobServiceUri"] = (
+                account.primary_endpoints.blob
+            )
+            settings[f"{connection}__queueServiceUri"] = (
+                account.primary_endpoints.queue
+            )
+            settings[f"{connection}__credential"] = "managedidentity"
+            settings[f"{connection}__clientId"] = client_id
+        for key, route in self.storage_routes.items():
+            kind, name = key.split("/", 1)
+            settings[f"StorageRoute__{kind}__{name.replace('-', '_')}"] = (
+                route.connection
+            )
+        return settings
+
     def __get_and_set_secrets(
         self,
-        account_name: Output[str],
         resource_group_name: Output[str],
-        sas_secrets: dict[str, Output[str]] = {},
+        sas_args: list[StorageComponentArgs],
+        window: tuple[str, str],
     ) -> None:
-        self.storage_account_keys: Output[
-            storage.ListStorageAccountKeysResult
-        ] = Output.secret(
-            storage.list_storage_account_keys_output(
-                account_name=account_name,
-                resource_group_name=resource_group_name,
+        secrets: dict[str, Output[str]] = {}
+        primary_keys: list[Output[str]] = []
+        for shard, account in enumerate(self.storage_accounts):
+            account_keys: Output[storage.ListStorageAccountKeysResult] = (
+                Output.secret(
+                    storage.list_storage_account_keys_output(
+                        account_name=account.name,
+                        resource_group_name=resource_group_name,
+                    )
+                )
+            )
+            primary_key: Output[str] = Output.secret(
+                account_keys.apply(lambda sak: sak.keys[0].value)
+            )
+            secondary_key: Output[str] = Output.secret(
+                account_keys.apply(lambda sak: sak.keys[1].value)
+            )
+            connection_string: Output[str] = Output.concat(
+                "DefaultEndpointsProtocol=https;AccountName=",
+                account.name,
+                ";AccountKey=",
+                Output.secret(primary_key),
+            )
+            if shard == 0:
+                self.storage_account_keys = account_keys
+                self.storage_connection_string = connection_string
+            primary_keys.append(primary_key)
+            secrets[shard_name("PrimaryStorageAccountKey", shard)] = primary_key
+            secrets[shard_name("SecondaryStorageAccountKey", shard)] = (
+                secondary_key
             )
+            secrets[shard_name("StorageConnectionString", shard)] = (
+                connection_string
+            )
+
+        # Signed locally with the primary key: no invoke per token.
+        for sas in sas_args:
+            route = self.storage_routes.get(f"blob/{sas.name}")
+            shard = route.shard if route else 0
+            account = self.storage_accounts[shard]
+            sas_token = self.__sign_sas(
+                sas, account.name, primary_keys[shard], window
+            )
+            sas_url = Output.secret(
+                Output.concat(
+                    account.primary_endpoints.blob,
+                    sas.name,
+                    "?",
+                    sas_token,
+                )
+            )
+            secrets[f"{sas.name}_sas_token"] = sas_token
+            secrets[f"{sas.name}_sas_url"] = sas_url
+            self.storage_sas_urls[sas.name] = Output.secret(
+                Output.all(sas_token=sas_token, sas_url=sas_url)
+            )
+
+        self.storage_secrets = SecretsObject(
+            secrets=secrets,
+            origin="automation",
+            purpose="storage_account_secrets",
         )
-        primary_key: Output[str] = Output.secret(
-            self.storage_account_keys.apply(lambda sak: sak.keys[0].value)
+
+    @staticmethod
+    def __sign_sas(
+        sas: StorageComponentArgs,
+        account_name: Output[str],
+        account_key: Output[str],
+        window: tuple[str, str],
+    ) -> Output[str]:
+        """
+        Signs the service SAS of a container, or of a blob in it.
+
+        Args:
+            sas (StorageComponentArgs): The container name and the
+                `list_storage_account_service_sas` arguments `permissions`,
+                `protocols`, `resource`, `identifier` and
+                `ip_address_or_range`, plus `blob_name` for a blob SAS.
+                `shared_access_start_time` and `shared_access_expiry_time`
+                override the time bucket window.
+            account_name (Output[str]): The storage account name.
+            account_key (Output[str]): The key to sign with.
+            window (tuple[str, str]): The time bucket start and expiry.
+
+        Returns:
+            Output[str]: The secret SAS token.
+        """
+        sas_args = sas.args
+        resource = _value(sas_args.get("resource", "c"))
+        path = (
+            f"{sas.name}/{sas_args['blob_name']}"
+            if resource == "b"
+            else sas.name
         )
-        secondary_key: Output[str] = Output.secret(
-            self.storage_account_keys.apply(lambda sak: sak.keys[1].value)
+        return Output.secret(
+            Output.all(account_name, account_key).apply(
+                lambda name_and_key: blob_service_sas(
+                    account_name=name_and_key[0],
+                    account_key=name_and_key[1],
+                    path=path,
+                    permissions=_value(sas_args["permissions"]),
+                    start=sas_args.get("shared_access_start_time", window[0]),
+                    expiry=sas_args.get("shared_access_expiry_time", window[1]),
+                    resource=resource,
+                    protocol=_value(sas_args.get("protocols", "https")),
+                    identifier=sas_args.get("identifier"),
+                    ip_range=sas_args.get("ip_address_or_range"),
+                )
+            )
         )
-        self.storage_connection_string: Output[str] = Output.concat(
-            "DefaultEndpointsProtocol=https;AccountName=",
-            self.storage_account.name,
-            ";AccountKey=",
-            Output.secret(primary_key),
+
+
+def _value(value: Any) -> Any:
+    """
+    The string of an azure-native enum member, other values unchanged.
+    """
+    return getattr(value, "value", value)
+
+
+def _shard_account_args(account_args: dict, shard: int) -> dict:
+    """
+    A shard's storage account arguments: an explicit `account_name` gets
+    the shard index appended.
+    """
+    account_name = account_args.get("account_name")
+    if shard == 0 or account_name is None:
+        return account_args
+    if not isinstance(account_name, str):
+        return {
+            **account_args,
+            "account_name": Output.concat(account_name, str(shard)),
+        }
+    sharded = shard_name(account_name, shard)
+    if len(sharded) > MAX_ACCOUNT_NAME_LENGTH:
+        raise ValueError(
+            f"Storage account name '{sharded}' of shard {shard} exceeds "
+            f"{MAX_ACCOUNT_NAME_LENGTH} characters"
         )
+    return {**account_args, "account_name": sharded}
 
-        self.storage_secrets = SecretsObject(
-            secrets={
-                "PrimaryStorageAccountKey": primary_key,
-                "SecondaryStorageAccountKey": secondary_key,
-                "StorageConnectionString": self.storage_connection_string,
-                **sas_secrets,
-            },
-            origin="automation",
-            purpose="storage_account_secrets",
+
+def _serverless(account_args: dict) -> bool:
+    """
+    Whether Cosmos DB account arguments enable the serverless capability.
+    """
+    return any(
+        _field(capability, "name") == "EnableServerless"
+        for capability in account_args.get("capabilities") or ()
+    )
+
+
+# Every account key, the `list_database_account_connection_strings`
+# description of its connection string and the secret names of both.
+_COSMOS_KEYS = (
+    (
+        "primary_master_key",
+        "Primary SQL Connection String",
+        "CosmosPrimaryMasterKey",
+        "CosmosConnectionString",
+    ),
+    (
+        "secondary_master_key",
+        "Secondary SQL Connection String",
+        "CosmosSecondaryMasterKey",
+        "CosmosSecondaryConnectionString",
+    ),
+    (
+        "primary_readonly_master_key",
+        "Primary Read-Only SQL Connection String",
+        "CosmosPrimaryReadonlyMasterKey",
+        "CosmosReadonlyConnectionString",
+    ),
+    (
+        "secondary_readonly_master_key",
+        "Secondary Read-Only SQL Connection String",
+        "CosmosSecondaryReadonlyMasterKey",
+        "CosmosSecondaryReadonlyConnectionString",
+    ),
+)
+COSMOS_SECRET_NAMES = tuple(
+    name for _, _, *names in _COSMOS_KEYS for name in names
+)
+
+
+def _cosmos_secrets(
+    keys: cosmosdb.ListDatabaseAccountKeysResult, document_endpoint: str
+) -> dict[str, Any]:
+    """
+    The keys and connection strings of a Cosmos DB account, the connection
+    strings built the way `list_database_account_connection_strings`
+    returns them.
+    """
+    connection_strings = {}
+    secrets = {}
+    for attribute, description, key_name, string_name in _COSMOS_KEYS:
+        key = getattr(keys, attribute)
+        connection_string = (
+            f"AccountEndpoint={document_endpoint};AccountKey={key};"
         )
+        connection_strings[description] = connection_string
+        secrets[key_name] = key
+        secrets[string_name] = connection_string
+    return {
+        "primary_master_key": keys.primary_master_key,
+        "primary_readonly_master_key": keys.primary_readonly_master_key,
+        "connection_strings": connection_strings,
+        "secrets": secrets,
+    }
+
+
+def _field(value: Any, name: str) -> Any:
+    """
+    A field of a dict or of an args object.
+    """
+    return value.get(name) if isinstance(value, dict) else getattr(value, name)
+
+
+def _throughput_options(
+    throughput: Optional[pcs.Throughput],
+) -> Optional[cosmosdb.CreateUpdateOptionsArgs]:
+    """
+    The manual or autoscale throughput options; None shares the database's
+    throughput, or has none on serverless accounts.
+    """
+    if throughput is None:
+        return None
+    if throughput.autoscaleMax is not None:
+        return cosmosdb.CreateUpdateOptionsArgs(
+            autoscale_settings=cosmosdb.AutoscaleSettingsArgs(
+                max_throughput=throughput.autoscaleMax
+            )
+        )
+    return cosmosdb.CreateUpdateOptionsArgs(throughput=throughput.manual)
+
+
+def _indexing_policy(policy: pcs.IndexingPolicy) -> cosmosdb.IndexingPolicyArgs:
+    """
+    The Pkl indexing policy as azure-native arguments.
+    """
+    return cosmosdb.IndexingPolicyArgs(
+        automatic=policy.automatic,
+        composite_indexes=[
+            [
+                cosmosdb.CompositePathArgs(order=path.order, path=path.path)
+                for path in composite
+            ]
+            for composite in policy.compositeIndexes
+        ]
+        if policy.compositeIndexes
+        else None,
+        excluded_paths=[
+            cosmosdb.ExcludedPathArgs(path=path)
+            for path in policy.excludedPaths
+        ],
+        included_paths=[
+            cosmosdb.IncludedPathArgs(path=path)
+            for path in policy.includedPaths
+        ],
+        indexing_mode=policy.indexingMode,
+        spatial_indexes=[
+            cosmosdb.SpatialSpecArgs(path=spatial.path, types=spatial.types)
+            for spatial in policy.spatialIndexes
+        ]
+        if policy.spatialIndexes
+        else None,
+    )
@@ -0,0 +1,96 @@
+"""
+Forwarding graph of Service Bus Pkl configs.
+
+Indexes the `forwardTo` and `forwardDeadLetteredMessagesTo` chains of every
+queue and subscription and prints the graph as DOT or JSON, for Graphviz or
+review. Reports forwarding cycles, chains over Azure's hop limit, targets
+that do not exist and hot sinks, entities many others forward into, on
+stderr. Exits with status 1 on a cycle, a chain over the hop limit or a
+missing target.
+
+Usage:
+
+    python scripts/python/analyze_servicebus_forwarding.py \
+        uber-demo/local_configs/app-func-sbs.pkl | dot -Tsvg > forwarding.svg
+"""
+
+import modulepath_fixer  # noqa: F401
+import argparse
+import sys
+
+from utils.servicebus_forwarding import (
+    HOT_SINK_FAN_IN,
+    MAX_FORWARDING_HOPS,
+    ForwardingGraph,
+)
+from utils.utils import load_pkl_configs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n\n")[0]
+    )
+    parser.add_argument(
+        "pkl_config_files", nargs="+", help="Service Bus Pkl config files"
+    )
+    parser.add_argument(
+        "--resource-type",
+        default="servicebus",
+        help="Registered resource type to load the files as",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("dot", "json"),
+        default="dot",
+        help="Output format (default: dot)",
+    )
+    parser.add_argument(
+        "--hot-fan-in",
+        type=int,
+        default=HOT_SINK_FAN_IN,
+        help="Fan-in from which an entity is a hot sink "
+        f"(default: {HOT_SINK_FAN_IN})",
+    )
+    args = parser.parse_args()
+
+    graph = ForwardingGraph(
+        namespace
+        for config in load_pkl_configs(
+            resource_type=args.resource_type,
+            pkl_config_files=args.pkl_config_files,
+        )
+        for namespace in config
+    )
+    if args.format == "json":
+        print(graph.to_json(args.hot_fan_in))
+    else:
+        print(graph.to_dot(args.hot_fan_in), end="")
+
+    errors = 0
+    for cycle in graph.cycles:
+        print(f"cycle: {' -> '.join(cycle)}", file=sys.stderr)
+        errors += 1
+    for path, depth in graph.too_deep().items():
+        print(
+            f"{path}: {depth} forwarding hops, limit {MAX_FORWARDING_HOPS}",
+            file=sys.stderr,
+        )
+        errors += 1
+    for dangling in graph.dangling:
+        print(
+            f"{dangling.source}: {dangling.option} target "
+            f"'{dangling.target}' does not exist",
+            file=sys.stderr,
+        )
+        errors += 1
+    for path, fan_in in graph.hot_sinks(args.hot_fan_in).items():
+        print(
+            f"hot sink {path}: {fan_in} entities forward into it, "
+            f"{graph.upstream(path)} upstream",
+            file=sys.stderr,
+        )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Checks that every Pkl entity option reaches its azure-native arguments.
+
+For the queue, topic and subscription options of the regular and the
+compact bindings, prints which field `utils.arg_mapping` maps onto which
+`*Args` argument, the fields without an argument (never deployed) and the
+arguments no field sets. Exits with status 1 if a field is unmapped, e.g.
+after a schema change that needs an entry in `SERVICEBUS_RENAMES`.
+
+Usage:
+
+    python scripts/python/check_arg_mappings.py
+"""
+
+import modulepath_fixer  # noqa: F401
+import argparse
+import sys
+
+import configs.generated.servicebus_pkl as psb
+import configs.generated.servicebus_pkl_compact as psb_compact
+from utils.arg_mapping import (
+    QUEUE_ARGS,
+    SUBSCRIPTION_ARGS,
+    TOPIC_ARGS,
+    ArgMapper,
+)
+
+# Arguments `ServiceBus` sets from the entity or its parents.
+_SET_BY_PARENT = {
+    "namespace_name",
+    "queue_name",
+    "resource_group_name",
+    "subscription_name",
+    "topic_name",
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n\n")[0]
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Only print unmapped fields",
+    )
+    args = parser.parse_args()
+
+    mappers: list[tuple[str, ArgMapper]] = [
+        ("QueueOptions", QUEUE_ARGS),
+        ("TopicOptions", TOPIC_ARGS),
+        ("SubscriptionOptions", SUBSCRIPTION_ARGS),
+    ]
+    unmapped_count = 0
+    for bindings in (psb, psb_compact):
+        for class_name, mapper in mappers:
+            source_class = getattr(bindings, class_name)
+            mapping = mapper.mapping(source_class)
+            unmapped = mapper.unmapped(source_class)
+            unset = sorted(
+                mapper.parameters - set(mapping.values()) - _SET_BY_PARENT
+            )
+            unmapped_count += len(unmapped)
+            label = (
+                f"{bindings.__name__}.{class_name} -> "
+                f"{mapper.args_class.__name__}"
+            )
+            print(label)
+            if not args.quiet:
+                for name, target in mapping.items():
+                    print(f"  {name:<42} {target}")
+            for name in unmapped:
+                print(f"  {name:<42} UNMAPPED")
+            if unset and not args.quiet:
+                print(f"  not set by the schema: {', '.join(unset)}")
+    print(f"{unmapped_count} unmapped field(s)", file=sys.stderr)
+    return 1 if unmapped_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Checks SQL-to-correlation filter rewrites against a corpus of expressions.
+
+For every corpus expression this asserts whether
+`utils.servicebus_filters.parse_correlation_filter` rewrites it, and for
+every rewrite that the SQL expression and the correlation filter select
+the same messages. Both are evaluated against every combination of the
+values the expression mentions, differently cased and typed variants of
+them, another value and the property being absent. The SQL side is
+evaluated by the small, independent interpreter below (equality,
+inequality, AND, OR, NOT, IS [NOT] NULL, parentheses, with SQL's three
+valued logic), not by the rewriter's parser.
+
+Property names and string values are compared case-sensitively, as by
+Service Bus. Exits with status 1 on the first mismatch.
+
+Usage:
+
+    python scripts/python/check_filter_rewrites.py
+"""
+
+import modulepath_fixer  # noqa: F401
+import itertools
+import re
+import sys
+from typing import Any, Optional
+
+import configs.generated.servicebus_pkl as psb
+from utils.servicebus_filters import SYSTEM_PROPERTIES, parse_correlation_filter
+
+# (expression, whether it is rewritten)
+CORPUS: list[tuple[str, bool]] = [
+    ("Priority = 'High'", True),
+    ("Priority = 'Normal'", True),
+    ("user.Priority = 'High'", True),
+    ("'High' = Priority", True),
+    ("sys.Label = 'orders'", True),
+    ("sys.CorrelationId = 'abc' AND sys.To = 'svc'", True),
+    ("sys.ContentType = 'application/json' AND Region = 'eu'", True),
+    ("sys.SessionId = 's' and sys.ReplyTo = 'r'", True),
+    ("sys.MessageId = 'm' AND sys.ReplyToSessionId = 'rs'", True),
+    ("Priority = 'High' AND Region = 'eu' AND Tenant = 't'", True),
+    ("(Priority = 'High') AND (Region = 'eu')", True),
+    ("((Priority = 'High' AND Region = 'eu'))", True),
+    ("Name = 'O''Brien'", True),
+    ("  Priority='High'  ", True),
+    ("Priority = 'High' OR Priority = 'Normal'", False),
+    ("NOT Priority = 'High'", False),
+    ("Priority <> 'High'", False),
+    ("Priority = 1", False),
+    ("Priority = ''", False),
+    ("Priority = 'High' AND Priority = 'Normal'", False),
+    ("Priority = 'High' AND Priority = 'High'", False),
+    ("sys.Label = 'a' AND sys.Label = 'b'", False),
+    ("sys.DeliveryCount = '1'", False),
+    ("Priority IS NULL", False),
+    ("Priority = 'High' AND (Region = 'eu' OR Region = 'us')", False),
+    ("Priority = Region", False),
+    ("(Priority = 'High'", False),
+    ("Priority = 'High' AND", False),
+    ("1=1", False),
+    ("", False),
+]
+
+_TOKENS = re.compile(
+    r"\s*('(?:[^']|'')*'|<>|[=()]|\d+|[A-Za-z_][A-Za-z0-9_.]*)"
+)
+
+
+class _Sql:
+    """
+    Evaluates a SQL filter expression against a message with three valued
+    logic; `None` is unknown.
+    """
+
+    def __init__(self, expression: str):
+        self.tokens = _TOKENS.findall(expression)
+        self.position = 0
+
+    def evaluate(self, message: dict[str, dict[str, Any]]) -> bool:
+        self.position = 0
+        self.message = message
+        result = self.__or()
+        if self.position != len(self.tokens):
+            raise SyntaxError(self.tokens[self.position :])
+        return result is True
+
+    def __peek(self) -> Optional[str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def __next(self) -> str:
+        token = self.__peek()
+        if token is None:
+            raise SyntaxError("unexpected end")
+        self.position += 1
+        return token
+
+    def __keyword(self, word: str) -> bool:
+        token = self.__peek()
+        if token is not None and token.upper() == word:
+            self.position += 1
+            return True
+        return False
+
+    def __or(self) -> Optional[bool]:
+        left = self.__and()
+        while self.__keyword("OR"):
+            right = self.__and()
+            if left is True or right is True:
+                left = True
+            elif left is None or right is None:
+                left = None
+            else:
+                left = False
+        return left
+
+    def __and(self) -> Optional[bool]:
+        left = self.__not()
+        while self.__keyword("AND"):
+            right = self.__not()
+            if left is False or right is False:
+                left = False
+            elif left is None or right is None:
+                left = None
+            else:
+                left = True
+        return left
+
+    def __not(self) -> Optional[bool]:
+        if self.__keyword("NOT"):
+            value = self.__not()
+            return None if value is None else not value
+        return self.__comparison()
+
+    def __comparison(self) -> Optional[bool]:
+        if self.__peek() == "(":
+            self.__next()
+            value = self.__or()
+            if self.__next() != ")":
+                raise SyntaxError("expected )")
+            return value
+        left = self.__operand()
+        if self.__keyword("IS"):
+            negate = self.__keyword("NOT")
+            if not self.__keyword("NULL"):
+                raise SyntaxError("expected NULL")
+            return (left is None) != negate
+        operator = self.__next()
+        right = self.__operand()
+        if left is None or right is None or type(left) is not type(right):
+            return None
+        if operator == "=":
+            return left == right
+        if operator == "<>":
+            return left != right
+        raise SyntaxError(operator)
+
+    def __operand(self) -> Any:
+        token = self.__next()
+        if token.startswith("'"):
+            return token[1:-1].replace("''", "'")
+        if token.isdigit():
+            return int(token)
+        scope, _, name = token.rpartition(".")
+        if scope.lower() == "sys":
+            return self.message["sys"].get(name)
+        return self.message["user"].get(name)
+
+
+def _correlation_matches(
+    correlation_filter: psb.RuleCorrelationFilter,
+    message: dict[str, dict[str, Any]],
+) -> bool:
+    for name, field in SYSTEM_PROPERTIES.items():
+        expected = getattr(correlation_filter, field)
+        if expected is not None and message["sys"].get(name) != expected:
+            return False
+    for name, expected in (correlation_filter.properties or {}).items():
+        value = message["user"].get(name)
+        if not isinstance(value, str) or value != expected:
+            return False
+    return True
+
+
+def _messages(expression: str) -> list[dict[str, dict[str, Any]]]:
+    """
+    Every combination of candidate values for the properties the
+    expression mentions.
+    """
+    tokens = _TOKENS.findall(expression)
+    literals = {
+        token[1:-1].replace("''", "'")
+        for token in tokens
+        if token.startswith("'")
+    }
+    candidates: list[Any] = [None, "other", 1]
+    for literal in sorted(literals):
+        candidates += [literal, literal.upper(), literal.lower()]
+    candidates = list(dict.fromkeys(candidates))
+
+    properties = sorted(
+        {
+            token
+            for token in tokens
+            if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_.]*", token)
+            and token.upper() not in ("AND", "OR", "NOT", "IS", "NULL")
+        }
+    )
+    messages = []
+    for values in itertools.product(candidates, repeat=len(properties)):
+        message: dict[str, dict[str, Any]] = {"sys": {}, "user": {}}
+        for token, value in zip(properties, values):
+            if value is None:
+                continue
+            scope, _, name = token.rpartition(".")
+            message["sys" if scope.lower() == "sys" else "user"][name] = value
+        messages.append(message)
+    return messages
+
+
+def main() -> int:
+    checked = 0
+    for expression, rewritable in CORPUS:
+        correlation_filter = parse_correlation_filter(expression)
+        if (correlation_filter is not None) != rewritable:
+            print(
+                f"FAIL {expression!r}: expected "
+                f"{'a' if rewritable else 'no'} rewrite, got "
+                f"{correlation_filter}"
+            )
+            return 1
+        if correlation_filter is None:
+            print(f"kept      {expression!r}")
+            continue
+        sql = _Sql(expression)
+        messages = _messages(expression)
+        for message in messages:
+            if sql.evaluate(message) != _correlation_matches(
+                correlation_filter, message
+            ):
+                print(f"FAIL {expression!r} differs on {message}")
+                return 1
+        checked += len(messages)
+        print(f"rewritten {expression!r} ({len(messages)} messages)")
+    print(
+        f"{len(CORPUS)} expressions, {checked} message evaluations agree",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
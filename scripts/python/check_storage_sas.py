@@ -0,0 +1,135 @@
+"""
+Checks the local SAS signing of `utils.storage_sas` against known vectors.
+
+The vectors sign with the public Azurite development account key; their
+signatures were computed independently with `openssl dgst -sha256 -mac
+HMAC`. Also checks that the time bucket window is stable within a bucket
+and moves at its edge. Runs offline; exits with status 1 on the first
+mismatch.
+
+Usage:
+
+    python scripts/python/check_storage_sas.py
+"""
+
+import modulepath_fixer  # noqa: F401
+import sys
+from datetime import datetime, timedelta, timezone
+
+from utils.storage_sas import blob_service_sas, blob_string_to_sign, sas_window
+
+ACCOUNT = "devstoreaccount1"
+KEY = (
+    "Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOt"
+    "r/KBHBeksoGMGw=="
+)
+
+# (blob_service_sas arguments, string-to-sign, token)
+VECTORS: list[tuple[dict, str, str]] = [
+    (
+        {
+            "path": "images",
+            "permissions": "r",
+            "start": "2024-01-01T00:00:00Z",
+            "expiry": "2024-01-03T00:00:00Z",
+        },
+        "r\n2024-01-01T00:00:00Z\n2024-01-03T00:00:00Z\n"
+        "/blob/devstoreaccount1/images\n\n\nhttps\n2022-11-02\nc\n\n\n\n\n\n\n",
+        "sv=2022-11-02&st=2024-01-01T00%3A00%3A00Z&se=2024-01-03T00%3A00%3A00Z"
+        "&sr=c&sp=r&spr=https"
+        "&sig=4EorXQukYwSIgnA%2FJg%2BN3lkGtihH0oIhK570y4Ji6LA%3D",
+    ),
+    (
+        {
+            "path": "images/cat.png",
+            "permissions": "rw",
+            "start": None,
+            "expiry": "2024-06-30T12:00:00Z",
+            "resource": "b",
+            "protocol": "https,http",
+            "identifier": "policy1",
+            "ip_range": "10.0.0.0-10.0.0.255",
+        },
+        "rw\n\n2024-06-30T12:00:00Z\n/blob/devstoreaccount1/images/cat.png\n"
+        "policy1\n10.0.0.0-10.0.0.255\nhttps,http\n2022-11-02\nb\n\n\n\n\n\n\n",
+        "sv=2022-11-02&se=2024-06-30T12%3A00%3A00Z&sr=b&sp=rw"
+        "&sip=10.0.0.0-10.0.0.255&spr=https%2Chttp&si=policy1"
+        "&sig=%2FGnO%2FQVdoY728Iv6x%2FdLBca16BKmfadO3NZTRI4mVog%3D",
+    ),
+]
+
+# (now, bucket, lifetime, start, expiry)
+WINDOWS: list[tuple[datetime, timedelta, timedelta, str, str]] = [
+    (
+        datetime(2024, 5, 17, 13, 45, 12, tzinfo=timezone.utc),
+        timedelta(hours=24),
+        timedelta(hours=24),
+        "2024-05-17T00:00:00Z",
+        "2024-05-19T00:00:00Z",
+    ),
+    (
+        datetime(2024, 5, 17, 23, 59, 59, tzinfo=timezone.utc),
+        timedelta(hours=24),
+        timedelta(hours=24),
+        "2024-05-17T00:00:00Z",
+        "2024-05-19T00:00:00Z",
+    ),
+    (
+        datetime(2024, 5, 18, 0, 0, 0, tzinfo=timezone.utc),
+        timedelta(hours=24),
+        timedelta(hours=24),
+        "2024-05-18T00:00:00Z",
+        "2024-05-20T00:00:00Z",
+    ),
+    (
+        datetime(2024, 5, 17, 13, 45, 12, tzinfo=timezone.utc),
+        timedelta(hours=6),
+        timedelta(hours=1),
+        "2024-05-17T12:00:00Z",
+        "2024-05-17T19:00:00Z",
+    ),
+]
+
+
+def main() -> int:
+    for arguments, string_to_sign, token in VECTORS:
+        signed_fields = {
+            key: value
+            for key, value in arguments.items()
+            if key not in ("path", "permissions", "start", "expiry")
+        }
+        actual = blob_string_to_sign(
+            account_name=ACCOUNT,
+            path=arguments["path"],
+            resource=signed_fields.pop("resource", "c"),
+            permissions=arguments["permissions"],
+            start=arguments["start"],
+            expiry=arguments["expiry"],
+            **signed_fields,
+        )
+        if actual != string_to_sign:
+            print(f"FAIL string-to-sign {actual!r} != {string_to_sign!r}")
+            return 1
+        actual = blob_service_sas(
+            account_name=ACCOUNT, account_key=KEY, **arguments
+        )
+        if actual != token:
+            print(f"FAIL token {actual} != {token}")
+            return 1
+        print(f"signed {arguments['path']}")
+
+    for now, bucket, lifetime, start, expiry in WINDOWS:
+        actual = sas_window(now, bucket, lifetime)
+        if actual != (start, expiry):
+            print(f"FAIL window at {now} is {actual}, not {(start, expiry)}")
+            return 1
+        print(f"window at {now:%Y-%m-%dT%H:%M:%SZ}: {start} - {expiry}")
+    print(
+        f"{len(VECTORS)} signatures and {len(WINDOWS)} windows agree",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+"""
+Generates an ahead-of-time compiled decoder for a `pkl-gen-python` bindings
+module.
+
+`pkl.Parser(namespace=globals())` resolves every object by reflective name
+lookup and hands its members to the dataclass positionally. The generated
+decoder instead has one function per class that reads the evaluator's binary
+(msgpack) output and builds the dataclasses directly, in one pass.
+
+With `--compact` it instead generates frozen, `__slots__` bindings with
+interned strings and shared immutable objects, together with their decoder,
+for holding large topologies in memory.
+
+Usage:
+
+    python scripts/python/gen_pkl_decoder.py configs.generated.servicebus_pkl \
+        -o configs/generated/servicebus_pkl_decoder.py
+    python scripts/python/gen_pkl_decoder.py configs.generated.servicebus_pkl \
+        --compact -o configs/generated/servicebus_pkl_compact.py
+"""
+
+import modulepath_fixer  # noqa: F401
+import argparse
+import dataclasses
+import importlib
+import re
+import typing
+from pathlib import Path
+from types import ModuleType
+
+HEADER = """\
+# Code generated by scripts/python/gen_pkl_decoder.py from `{module}`.
+# DO NOT EDIT.
+from __future__ import annotations
+
+import msgpack
+import pkl
+
+from {module} import (
+{imports}
+)
+
+
+"""
+
+COMPACT_HEADER = """\
+# Code generated by scripts/python/gen_pkl_decoder.py --compact from
+# `{module}`. DO NOT EDIT.
+from __future__ import annotations
+
+from dataclasses import dataclass
+from sys import intern
+from typing import Dict, Optional, Tuple
+
+import msgpack
+import pkl
+
+from {module} import (
+{imports}
+)
+
+
+_shared_tuples: dict = {{}}
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return None if value is None else intern(value)
+
+
+def _tuple(values: tuple) -> tuple:
+    return _shared_tuples.setdefault(values, values)
+
+
+"""
+
+COMPACT_FOOTER = """
+
+def clear_shared() -> None:
+    \"\"\"
+    Releases the instances shared between decoded `{root}` configs.
+    \"\"\"
+    for shared in (
+        _shared_tuples,
+{shared}
+    ):
+        shared.clear()
+"""
+
+FOOTER = '''
+
+def decode(obj) -> {root}:
+    """
+    Builds the `{root}` bindings from the evaluator's decoded msgpack
+    output.
+    """
+    return decode_{root}(obj)
+
+
+def loads(data: bytes) -> {root}:
+    """
+    Builds the `{root}` bindings from the evaluator's binary output.
+    """
+    return decode_{root}(msgpack.unpackb(data, strict_map_key=False))
+
+
+class _CompiledParser(pkl.Parser):
+    def parse(self, obj):
+        return decode_{root}(obj)
+
+
+def load_pkl(source) -> {root}:
+    """
+    Evaluates the Pkl module at `source` into `{root}` using the compiled
+    decoder.
+    """
+    return pkl.load(source, parser=_CompiledParser())
+'''
+
+
+# Compact fields that are not stored but derived from the other fields, by
+# class identifier: field name -> expression over `self`.
+COMPACT_DERIVED: dict[str, dict[str, str]] = {
+    # `rights` already lists what the flags grant.
+    "servicebus#AuthorizationRule": {
+        "listen": '"Listen" in self.rights',
+        "send": '"Send" in self.rights',
+        "manage": '"Manage" in self.rights',
+    },
+}
+
+# Placeholder for the encoded member inside converter expressions.
+_MEMBER = "__member__"
+_TYPING_NAMES = {"Any", "Dict", "List", "Literal", "Optional", "Set", "Union"}
+_BUILTIN_NAMES = {"bool", "float", "int", "str"}
+
+
+def _bindings(module: ModuleType) -> list[type]:
+    return [
+        value
+        for value in vars(module).values()
+        if isinstance(value, type)
+        and dataclasses.is_dataclass(value)
+        and value.__module__ == module.__name__
+        and hasattr(value, "_registered_identifier")
+    ]
+
+
+def _is_str(hint) -> bool:
+    if typing.get_origin(hint) is typing.Literal:
+        return all(isinstance(arg, str) for arg in typing.get_args(hint))
+    return hint is str
+
+
+def _converter(hint, value: str, bindings: set[type], compact: bool) -> str:
+    """
+    Returns the expression converting the encoded `value` into `hint`.
+
+    In compact mode strings are interned and listings become tuples.
+    """
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+    if origin is typing.Union and type(None) in args:
+        (inner,) = [arg for arg in args if arg is not type(None)]
+        if compact and _is_str(inner):
+            return f"_intern({value})"
+        converted = _converter(inner, value, bindings, compact)
+        if converted == value:
+            return value
+        return f"None if {value} is None else {converted}"
+    if hint in bindings:
+        return f"decode_{hint.__name__}({value})"
+    if origin in (list, set):
+        converted = _converter(args[0], "e", bindings, compact)
+        if compact and origin is list:
+            if converted == "e":
+                return f"_tuple(tuple({value}[1]))"
+            if converted == "intern(e)":
+                return f"_tuple(tuple(map(intern, {value}[1])))"
+            return f"tuple([{converted} for e in {value}[1]])"
+        if converted == "e":
+            return f"{value}[1]" if origin is list else f"set({value}[1])"
+        bracket = "[]" if origin is list else "{}"
+        return f"{bracket[0]}{converted} for e in {value}[1]{bracket[1]}"
+    if origin is dict:
+        converted = _converter(args[1], "e", bindings, compact)
+        if converted == "e":
+            return f"{value}[1]"
+        return f"{{k: {converted} for k, e in {value}[1].items()}}"
+    if compact and _is_str(hint):
+        return f"intern({value})"
+    # Strings, numbers, booleans and Literal aliases are encoded as is.
+    return value
+
+
+def _shareable(clazz: type, module: ModuleType, bindings: set[type]) -> bool:
+    """
+    Whether instances of a compact class only hold immutable scalars, tuples
+    of scalars or other shareable instances, so equal instances can be
+    shared between entities.
+    """
+
+    def immutable(hint) -> bool:
+        args = typing.get_args(hint)
+        origin = typing.get_origin(hint)
+        if origin is typing.Union:
+            return all(immutable(arg) for arg in args)
+        if origin is list:
+            # Entities holding other entities are never shared.
+            return args[0] not in bindings and immutable(args[0])
+        if origin in (dict, set):
+            return False
+        if hint in bindings:
+            return _shareable(hint, module, bindings)
+        return True
+
+    hints = typing.get_type_hints(clazz, vars(module))
+    return all(immutable(hint) for hint in hints.values())
+
+
+def _render_class(
+    clazz: type,
+    module: ModuleType,
+    bindings: set[type],
+    compact: bool = False,
+    shared: bool = False,
+) -> str:
+    hints = typing.get_type_hints(clazz, vars(module))
+    name = clazz.__name__
+    derived = _derived(clazz) if compact else {}
+    body = ["    m = {name: value for _, name, value in obj[3]}"]
+    arguments = []
+    for field in dataclasses.fields(clazz):
+        if field.name in derived:
+            continue
+        hint = hints[field.name]
+        optional = type(None) in typing.get_args(hint)
+        member = f'm.get("{field.name}")' if optional else f'm["{field.name}"]'
+        converted = _converter(hint, _MEMBER, bindings, compact)
+        if converted.count(_MEMBER) > 1:
+            # Bind the member once, the converter references it repeatedly.
+            body.append(f"    v = {member}")
+            converted = converted.replace(_MEMBER, "v")
+            body.append(f"    {field.name} = {converted}")
+            converted = field.name
+        else:
+            converted = converted.replace(_MEMBER, member)
+        arguments.append(
+            f"        {converted},"
+            if shared
+            else f"        {field.name}={converted},"
+        )
+    if shared:
+        # Equal instances are decoded once and shared between entities.
+        body += ["    values = ("] + arguments + ["    )"]
+        body += [
+            f"    shared = _shared_{name}.get(values)",
+            "    if shared is None:",
+            f"        shared = _shared_{name}[values] = {name}(*values)",
+            "    return shared",
+        ]
+    else:
+        body += [f"    return {name}("] + arguments + ["    )"]
+    return "\n".join([f"def decode_{name}(obj) -> {name}:"] + body)
+
+
+def _compact_annotation(annotation: str) -> str:
+    # Listings become tuples so instances can be frozen and shared.
+    while True:
+        replaced = re.sub(r"List\[([^\[\]]+)\]", r"Tuple[\1, ...]", annotation)
+        if replaced == annotation:
+            return annotation
+        annotation = replaced
+
+
+def _derived(clazz: type) -> dict[str, str]:
+    return COMPACT_DERIVED.get(clazz._registered_identifier, {})
+
+
+def _render_compact_class(clazz: type) -> str:
+    derived = _derived(clazz)
+    lines = ["@dataclass(frozen=True, slots=True)", f"class {clazz.__name__}:"]
+    for field in dataclasses.fields(clazz):
+        annotation = _compact_annotation(str(clazz.__annotations__[field.name]))
+        if field.name not in derived:
+            lines += [f"    {field.name}: {annotation}", ""]
+    lines.append(
+        f'    _registered_identifier = "{clazz._registered_identifier}"'
+    )
+    for name, expression in derived.items():
+        annotation = _compact_annotation(str(clazz.__annotations__[name]))
+        lines += [
+            "",
+            "    @property",
+            f"    def {name}(self) -> {annotation}:",
+            f"        return {expression}",
+        ]
+    return "\n".join(lines)
+
+
+def render_decoder(module: ModuleType) -> str:
+    """
+    Renders the compiled decoder source for a bindings module.
+
+    Args:
+        module (ModuleType): The `pkl-gen-python` bindings module.
+
+    Returns:
+        str: Python source of the decoder module.
+    """
+    classes = _bindings(module)
+    bindings = set(classes)
+    (root,) = [c for c in classes if "#" not in c._registered_identifier]
+    names = sorted(c.__name__ for c in classes)
+    source = HEADER.format(
+        module=module.__name__,
+        imports="\n".join(f"    {name}," for name in names),
+    )
+    source += "\n\n".join(
+        _render_class(clazz, module, bindings) + "\n" for clazz in classes
+    )
+    source += FOOTER.format(root=root.__name__)
+    return source
+
+
+def render_compact(module: ModuleType) -> str:
+    """
+    Renders compact bindings for a bindings module, together with their
+    compiled decoder.
+
+    The compact classes are frozen and slotted, hold tuples instead of
+    lists, intern their strings and share equal instances of classes that
+    only hold immutable values (options, SKUs, authorization rules ...).
+    Fields in `COMPACT_DERIVED` become properties instead of being stored.
+
+    Args:
+        module (ModuleType): The `pkl-gen-python` bindings module.
+
+    Returns:
+        str: Python source of the compact bindings module.
+    """
+    classes = _bindings(module)
+    bindings = set(classes)
+    (root,) = [c for c in classes if "#" not in c._registered_identifier]
+    shared = [clazz for clazz in classes if _shareable(clazz, module, bindings)]
+    aliases = set()
+    for clazz in classes:
+        for annotation in clazz.__annotations__.values():
+            aliases.update(re.findall(r"[A-Za-z_]\w*", str(annotation)))
+    aliases -= _TYPING_NAMES | _BUILTIN_NAMES | {c.__name__ for c in classes}
+    source = COMPACT_HEADER.format(
+        module=module.__name__,
+        imports="\n".join(f"    {name}," for name in sorted(aliases)),
+    )
+    source += "\n\n".join(
+        _render_compact_class(clazz) + "\n" for clazz in classes
+    )
+    source += "\n\n"
+    source += "".join(
+        f"_shared_{clazz.__name__}: dict = {{}}\n" for clazz in shared
+    )
+    source += "\n\n" + "\n\n".join(
+        _render_class(clazz, module, bindings, True, clazz in shared) + "\n"
+        for clazz in classes
+    )
+    source += COMPACT_FOOTER.format(
+        root=root.__name__,
+        shared="\n".join(
+            f"        _shared_{clazz.__name__}," for clazz in shared
+        ),
+    )
+    source += FOOTER.format(root=root.__name__)
+    return source
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n\n")[0]
+    )
+    parser.add_argument(
+        "module",
+        help="Dotted path of the bindings module, "
+        "e.g. configs.generated.servicebus_pkl",
+    )
+    parser.add_argument(
+        "-o", "--output", required=True, help="Decoder file to write"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Generate frozen, slotted bindings with interned strings and "
+        "shared immutable objects together with their decoder",
+    )
+    args = parser.parse_args()
+
+    module = importlib.import_module(args.module)
+    render = render_compact if args.compact else render_decoder
+    Path(args.output).write_text(render(module))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Plans a targeted `pulumi up` for a Service Bus config change.
+
+Diffs the config snapshot of the last deployment against the given Pkl
+config files and prints the `pulumi up --target ...` command covering only
+the changed namespaces, queues, topics, subscriptions, rules and
+authorization rules, or, with `--deployment-mode template`, the ARM template
+deployments applying them.
+
+Usage:
+
+    # After a successful deployment, record what was deployed
+    python scripts/python/plan_servicebus.py --save deployed.json \
+        uber-demo/local_configs/app-func-sbs.pkl
+
+    # After editing the config
+    python scripts/python/plan_servicebus.py --previous deployed.json \
+        --component-urn 'urn:pulumi:dev::uber-demo::...::funcapp' \
+        uber-demo/local_configs/app-func-sbs.pkl
+"""
+
+import modulepath_fixer  # noqa: F401
+import argparse
+import json
+import sys
+
+from utils.module_dataclasses import SERVICEBUS_DEPLOYMENT_MODES
+from utils.servicebus_plan import (
+    load_snapshot,
+    plan_targets,
+    save_snapshot,
+    snapshot,
+)
+from utils.utils import load_pkl_configs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n\n")[0]
+    )
+    parser.add_argument(
+        "pkl_config_files", nargs="+", help="Service Bus Pkl config files"
+    )
+    parser.add_argument(
+        "--resource-type",
+        default="servicebus",
+        help="Registered resource type to load the files as",
+    )
+    parser.add_argument(
+        "--save", help="Write the snapshot of the config files here and exit"
+    )
+    parser.add_argument(
+        "--previous", help="Snapshot of the deployed config files"
+    )
+    parser.add_argument(
+        "--component-urn",
+        help="URN of the deployed ServiceBus component "
+        "(pulumi stack --show-urns)",
+    )
+    parser.add_argument(
+        "--deployment-mode",
+        choices=SERVICEBUS_DEPLOYMENT_MODES,
+        default="resources",
+        help="ServiceBusArgs.deployment_mode of the deployed component",
+    )
+    parser.add_argument("--stack", help="Stack to pass to pulumi up")
+    parser.add_argument(
+        "--json", action="store_true", help="Print the plan as JSON"
+    )
+    args = parser.parse_args()
+
+    namespaces = [
+        namespace
+        for config in load_pkl_configs(
+            resource_type=args.resource_type,
+            pkl_config_files=args.pkl_config_files,
+        )
+        for namespace in config
+    ]
+    if args.save:
+        save_snapshot(args.save, namespaces)
+        return 0
+    if not args.previous or not args.component_urn:
+        parser.error("--previous and --component-urn are required to plan")
+
+    plan = plan_targets(
+        previous=load_snapshot(args.previous),
+        current=snapshot(namespaces),
+        component_urn=args.component_urn,
+        deployment_mode=args.deployment_mode,
+    )
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "changes": [vars(change) for change in plan.changes],
+                    "targets": plan.targets,
+                    "target_dependents": plan.target_dependents,
+                    "orphans": [change.path for change in plan.orphans],
+                },
+                indent=2,
+            )
+        )
+        return 0
+
+    for change in plan.changes:
+        fields = f" ({', '.join(change.fields)})" if change.fields else ""
+        print(f"{change.action:>8} {change.kind} {change.path}{fields}")
+    command = plan.command(stack=args.stack)
+    print(command or "No Service Bus changes.")
+    if plan.orphans:
+        print(
+            f"{len(plan.orphans)} removed entities stay in Azure: template "
+            "deployments are incremental; delete them by hand.",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
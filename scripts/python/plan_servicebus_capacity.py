@@ -0,0 +1,81 @@
+"""
+Capacity plan of Service Bus Pkl configs.
+
+Estimates the broker operations and throughput of every namespace from the
+`loadHints` of its queues and topics and prints the SKU, Premium messaging
+units and partitioning the load needs. Exits with status 1 if the
+configured SKU does not fit.
+
+Usage:
+
+    python scripts/python/plan_servicebus_capacity.py \
+        uber-demo/local_configs/app-func-sbs.pkl
+"""
+
+import modulepath_fixer  # noqa: F401
+import argparse
+import sys
+
+from utils.servicebus_capacity import plan_capacity
+from utils.utils import load_pkl_configs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n\n")[0]
+    )
+    parser.add_argument(
+        "pkl_config_files", nargs="+", help="Service Bus Pkl config files"
+    )
+    parser.add_argument(
+        "--resource-type",
+        default="servicebus",
+        help="Registered resource type to load the files as",
+    )
+    parser.add_argument(
+        "--entities",
+        action="store_true",
+        help="Also print the estimate of every queue and topic",
+    )
+    args = parser.parse_args()
+
+    namespaces = [
+        namespace
+        for config in load_pkl_configs(
+            resource_type=args.resource_type,
+            pkl_config_files=args.pkl_config_files,
+        )
+        for namespace in config
+    ]
+    plans = plan_capacity(namespaces)
+
+    print(
+        f"{'namespace':<36} {'ops/s':>9} {'KB/s':>9} "
+        f"{'sku':>14} {'recommended':>14}"
+    )
+    for plan in plans:
+        configured = f"{plan.sku} {plan.capacity or ''}".strip()
+        recommended = (
+            f"{plan.recommended_sku} {plan.recommended_capacity or ''}"
+        ).strip()
+        print(
+            f"{plan.path:<36} {plan.operations_per_second:>9.0f} "
+            f"{plan.kilobytes_per_second:>9.0f} {configured:>14} "
+            f"{recommended:>14}"
+        )
+        if args.entities:
+            for entity in plan.entities:
+                print(
+                    f"  {entity.path:<34} "
+                    f"{entity.operations_per_second:>9.0f} "
+                    f"{entity.kilobytes_per_second:>9.0f} {entity.kind:>14}"
+                )
+
+    findings = [finding for plan in plans for finding in plan.findings]
+    for finding in findings:
+        print(finding)
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
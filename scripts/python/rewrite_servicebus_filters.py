@@ -0,0 +1,83 @@
+"""
+Reports the subscription rule SQL filters that `ServiceBus` rewrites into
+correlation filters when `ServiceBusArgs(rewrite_sql_filters=True)` is set.
+
+Nothing is deployed; each rewrite is printed with the correlation filter
+replacing the SQL expression, followed by the rules left as SQL.
+
+Usage:
+
+    python scripts/python/rewrite_servicebus_filters.py \
+        uber-demo/local_configs/app-func-sbs.pkl
+"""
+
+import modulepath_fixer  # noqa: F401
+import argparse
+import sys
+
+from utils.servicebus_filters import FilterRewrite, rewrite_sql_filter
+from utils.utils import load_pkl_configs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n\n")[0]
+    )
+    parser.add_argument(
+        "pkl_config_files", nargs="+", help="Service Bus Pkl config files"
+    )
+    parser.add_argument(
+        "--resource-type",
+        default="servicebus",
+        help="Registered resource type to load the files as",
+    )
+    args = parser.parse_args()
+
+    rewrites: list[FilterRewrite] = []
+    kept: list[str] = []
+    for config in load_pkl_configs(
+        resource_type=args.resource_type,
+        pkl_config_files=args.pkl_config_files,
+    ):
+        for namespace in config:
+            for topic in namespace.topics or ():
+                for subscription in topic.subscriptions or ():
+                    for rule in subscription.rules or ():
+                        if rule.filterType != "SqlFilter":
+                            continue
+                        path = "/".join(
+                            [
+                                namespace.namePrefix,
+                                topic.name,
+                                subscription.name,
+                                rule.rule_name,
+                            ]
+                        )
+                        correlation_filter = rewrite_sql_filter(rule)
+                        if correlation_filter is None:
+                            kept.append(
+                                f"{path}: {rule.sqlFilter.sqlExpression!r}"
+                            )
+                            continue
+                        rewrites.append(
+                            FilterRewrite(
+                                path=path,
+                                sql_expression=rule.sqlFilter.sqlExpression,
+                                correlation_filter=correlation_filter,
+                            )
+                        )
+
+    for rewrite in rewrites:
+        print(rewrite)
+    for rule in kept:
+        print(f"{rule} stays a SqlFilter")
+    print(
+        f"{len(rewrites)} of {len(rewrites) + len(kept)} SQL filter(s) "
+        "rewritten",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
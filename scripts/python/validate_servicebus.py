@@ -0,0 +1,63 @@
+"""
+Pre-flight check of Service Bus Pkl configs.
+
+Evaluates (or loads from the evaluation cache) the given config files and
+reports every schema naming and Azure limit violation at once, without
+touching Pulumi or Azure. Exits with status 1 if any violation is found.
+
+Usage:
+
+    python scripts/python/validate_servicebus.py \
+        uber-demo/local_configs/app-func-sbs.pkl
+"""
+
+import modulepath_fixer  # noqa: F401
+import argparse
+import sys
+import time
+
+from utils.servicebus_validation import validate_servicebus
+from utils.utils import load_pkl_configs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n\n")[0]
+    )
+    parser.add_argument(
+        "pkl_config_files", nargs="+", help="Service Bus Pkl config files"
+    )
+    parser.add_argument(
+        "--resource-type",
+        default="servicebus",
+        help="Registered resource type to load the files as",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the evaluation cache",
+    )
+    args = parser.parse_args()
+
+    configs = load_pkl_configs(
+        resource_type=args.resource_type,
+        pkl_config_files=args.pkl_config_files,
+        use_cache=not args.no_cache,
+    )
+    started = time.perf_counter()
+    namespaces = [namespace for config in configs for namespace in config]
+    violations = validate_servicebus(namespaces)
+    elapsed = time.perf_counter() - started
+
+    for violation in violations:
+        print(violation)
+    print(
+        f"{len(violations)} violation(s) in {len(namespaces)} namespace(s), "
+        f"checked in {elapsed * 1000:.1f} ms",
+        file=sys.stderr,
+    )
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,24 +3,27 @@
 Pulumi program to create Azure App Functions
 """
 
-from typing import Type
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 import modulepath_fixer  # noqa: F401
 
 from configs import (
     container_names,
+    cosmos_config_files,
+    cosmos_profile_name,
+    cosmos_regions,
     create_container_sas,
     create_cosmos_db,
     location,
     queue_names,
     resource_group_prefix,
+    sas_time_bucket_hours,
+    storage_profile_name,
     subscription_id,
 )
 from pulumi import export, Output, ResourceOptions
 from pulumi_azuread import get_client_config
 from pulumi_azure_native import (
     authorization,
-    cosmosdb,
     managedidentity,
     resources,
     storage,
@@ -32,17 +35,11 @@ from modules.storage import (
     CosmosComponentArgs,
     StorageChain,
     StorageArgs,
-    StorageAccountDefaults,
     StorageComponentArgs,
+    cosmos_profile,
+    storage_profile,
 )
-
-
-def get_defaults(storage_defaults_class: Type[StorageAccountDefaults]) -> dict:
-    return {
-        k: v
-        for k, v in vars(storage_defaults_class).items()
-        if not k.startswith("__") and not callable(v)
-    }
+from utils.utils import load_pkl_configs
 
 
 ### Setup Resource Group
@@ -52,10 +49,11 @@ default_tags = {"purpose": "az-204"}
 resource_prefix = "flashy"
 
 ### Setup Storage
+profile = storage_profile(storage_profile_name)
 storage_account_args = StorageComponentArgs(
     name=f"{resource_prefix}storacct",
     args={
-        **get_defaults(StorageAccountDefaults),
+        **profile.account_args,
         "location": location,
         "resource_group_name": resource_group.name,
         "allow_blob_public_access": True,
@@ -63,6 +61,17 @@ storage_account_args = StorageComponentArgs(
     },
 )
 
+storage_blob_properties_args = None
+if profile.blob_properties_args is not None:
+    storage_blob_properties_args = StorageComponentArgs(
+        name=f"{resource_prefix}-blob-props",
+        args={
+            **profile.blob_properties_args,
+            "blob_services_name": "default",
+            "resource_group_name": resource_group.name,
+        },
+    )
+
 storage_blob_container_args = [
     StorageComponentArgs(
         name=name,
@@ -76,24 +85,14 @@ storage_blob_container_args = [
 
 storage_container_sas_args = []
 if create_container_sas:
-    start_time = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-    expiry_time = (datetime.now(timezone.utc) + timedelta(days=1)).strftime(
-        "%Y-%m-%dT%H:%M:%SZ"
-    )
-
+    # Signed locally; start and expiry snap to sas-time-bucket-hours
     storage_container_sas_args = [
         StorageComponentArgs(
             name=name,
             args={
-                "canonicalized_resource": Output.concat(
-                    "/blob/", storage_account_args.name, f"/{name}"
-                ),
                 "permissions": storage.Permissions.R,
                 "protocols": storage.HttpProtocol.HTTPS,
-                "resource_group_name": resource_group.name,
                 "resource": storage.SignedResource.C,
-                "shared_access_start_time": start_time,
-                "shared_access_expiry_time": expiry_time,
             },
         )
         for name in container_names
@@ -112,9 +111,11 @@ storage = StorageChain(
     args=StorageArgs(
         resource_group_name=resource_group.name,
         storage_account_args=storage_account_args,
+        storage_blob_properties_args=storage_blob_properties_args,
         storage_blob_container_args=storage_blob_container_args,
         storage_queue_args=storage_queue_args,
         storage_container_sas_args=storage_container_sas_args,
+        sas_time_bucket=timedelta(hours=sas_time_bucket_hours),
         tags=default_tags,
     ),
     opts=default_opts,
@@ -140,35 +141,7 @@ storage_queue_endpoints = {
 cosmos_nosql = None
 if create_cosmos_db:
     cosmos_account_args = CosmosComponentArgs(
-        name=f"{resource_prefix}cosmosacct",
-        args={
-            "database_account_offer_type": cosmosdb.DatabaseAccountOfferType.STANDARD,
-            "locations": [
-                cosmosdb.LocationArgs(
-                    failover_priority=0,
-                    is_zone_redundant=False,
-                    location_name="Central US",
-                )
-            ],
-            "backup_policy": cosmosdb.ContinuousModeBackupPolicyArgs(
-                continuous_mode_properties=cosmosdb.ContinuousModePropertiesArgs(
-                    tier=cosmosdb.ContinuousTier.CONTINUOUS7_DAYS,
-                ),
-                type="Continuous",
-            ),
-            "capabilities": [cosmosdb.CapabilityArgs(name="EnableServerless")],
-            "capacity": cosmosdb.CapacityArgs(total_throughput_limit=4000),
-            "consistency_policy": cosmosdb.ConsistencyPolicyArgs(
-                default_consistency_level=cosmosdb.DefaultConsistencyLevel.SESSION,
-                max_interval_in_seconds=5,
-                max_staleness_prefix=100,
-            ),
-            "default_identity": "FirstPartyIdentity",
-            "enable_free_tier": True,
-            "kind": cosmosdb.DatabaseAccountKind.GLOBAL_DOCUMENT_DB,
-            "minimal_tls_version": cosmosdb.MinimalTlsVersion.TLS12,
-            "public_network_access": cosmosdb.PublicNetworkAccess.ENABLED,
-        },
+        name=f"{resource_prefix}cosmosacct", args={}
     )
 
     cosmos_nosql = CosmosNoSQL(
@@ -176,6 +149,16 @@ if create_cosmos_db:
         args=CosmosDBArgs(
             resource_group_name=resource_group.name,
             cosmos_account_args=cosmos_account_args,
+            profile=cosmos_profile(cosmos_profile_name),
+            regions=cosmos_regions or [location],
+            databases=[
+                database
+                for databases in load_pkl_configs(
+                    resource_type="cosmos",
+                    pkl_config_files=cosmos_config_files,
+                )
+                for database in databases
+            ],
         ),
         opts=default_opts,
     )
@@ -278,6 +261,8 @@ if cosmos_nosql:
         Output.all(
             name=cosmos_nosql.cosmos_account.name,
             document_endpoint=cosmos_nosql.cosmos_account.document_endpoint,
+            read_locations=cosmos_nosql.cosmos_account.read_locations,
+            dedicated_gateway_endpoint=cosmos_nosql.dedicated_gateway_endpoint,
             connection_strings=cosmos_nosql.connection_strings,
             primary_master_key=cosmos_nosql.primary_master_key,
             primary_readonly_master_key=cosmos_nosql.primary_readonly_master_key,
@@ -285,6 +270,13 @@ if cosmos_nosql:
             lambda args: {
                 "account_name": args["name"],
                 "document_endpoint": args["document_endpoint"],
+                "read_endpoints": {
+                    location.location_name: location.document_endpoint
+                    for location in args["read_locations"]
+                },
+                "dedicated_gateway_endpoint": args[
+                    "dedicated_gateway_endpoint"
+                ],
                 "connection_strings": args["connection_strings"],
                 "primary_master_key": args["primary_master_key"],
                 "primary_readonly_master_key": args[
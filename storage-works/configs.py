@@ -9,6 +9,27 @@ storage_work_configs = Config()
 resource_group_prefix = storage_work_configs.require("resource-group-prefix")
 container_names:list[str] = storage_work_configs.require_object("container-names")
 create_container_sas: bool = storage_work_configs.get_bool("create-container-sas") or False
+# SAS tokens are re-signed once per bucket and stay valid a day after it
+sas_time_bucket_hours: int = (
+    storage_work_configs.get_int("sas-time-bucket-hours") or 24
+)
+# Storage account profile, a key of `modules.storage.STORAGE_PROFILES`
+storage_profile_name: str = (
+    storage_work_configs.get("storage-profile") or "standard"
+)
 queue_names:list[str] = storage_work_configs.require_object("queue-names")
 
 create_cosmos_db: bool = storage_work_configs.require_bool("create-cosmos-db")
+# Cosmos DB account profile, a key of `modules.storage.COSMOS_PROFILES`
+cosmos_profile_name: str = (
+    storage_work_configs.get("cosmos-profile") or "serverless"
+)
+# Cosmos DB regions near the compute reading them, the first taking writes;
+# defaults to the stack location
+cosmos_regions: list[str] = (
+    storage_work_configs.get_object("cosmos-regions") or []
+)
+# Pkl files of the Cosmos DB databases and containers to provision
+cosmos_config_files: list[str] = (
+    storage_work_configs.get_object("cosmos-config-files") or []
+)
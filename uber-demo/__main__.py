@@ -4,7 +4,6 @@ Pulumi program to create an uber Azure App Function
 """
 
 import modulepath_fixer  # noqa: F401
-from typing import Type
 
 from pulumi_configs import (
     app_svc_plan_name,
@@ -16,21 +15,34 @@ from pulumi_configs import (
     create_servicebus,
     create_storage_account,
     blob_names,
+    eventgrid_config_files,
     func_app_name,
+    func_package_source,
     func_runtime_args,
+    func_scale_overrides,
+    func_scale_profile,
+    func_trigger_tuning,
+    storage_profile_name,
+    storage_shard_count,
+    storage_shard_pins,
     location,
+    pkl_cache_enabled,
+    pkl_compact_configs,
     queue_names,
     resource_group_prefix,
-    servicebus_config_file,
+    servicebus_capacity_planning,
+    servicebus_config_files,
+    servicebus_deployment_mode,
+    servicebus_key_vault_secrets,
+    servicebus_rewrite_sql_filters,
     subscription_id,
 )
-from pulumi import export, Input, Output, ResourceOptions
+from pulumi import export, log, FileAsset, Input, Output, ResourceOptions
 from pulumi_azuread import get_client_config
 from pulumi_azure_native import (
     applicationinsights,
     authorization,
     keyvault,
-    eventgrid,
     managedidentity,
     operationalinsights,
     resources,
@@ -38,9 +50,10 @@ from pulumi_azure_native import (
     web,
 )
 
+import configs.generated.eventgrid_pkl as peg
 import configs.generated.servicebus_pkl as psb
 
-from utils.module_dataclasses import ServiceBusArgs
+from utils.module_dataclasses import EventGridArgs, ServiceBusArgs
 
 from local_dataclasses import (
     AnalyticsAndLogsOutputs,
@@ -48,22 +61,34 @@ from local_dataclasses import (
     StorageOutputs,
 )
 
+from modules.eventgrid import EventGridRouting
 from modules.messaging import ServiceBus
 
 from modules.storage import (
     StorageChain,
     StorageArgs,
-    StorageAccountDefaults,
     StorageComponentArgs,
+    storage_profile,
 )
 
-from utils.utils import load_pkl_config
+from utils.function_package import (
+    FLEX_PACKAGE_BLOB,
+    PACKAGE_HASH_SETTING,
+    FunctionPackage,
+    build_function_package,
+)
+from utils.function_scale import FlexScale, flex_scale
+from utils.function_tuning import tune_triggers
+from utils.storage_sharding import shard_name
+from utils.utils import load_pkl_configs
 
 ### Setup Resource Group
 resource_group = resources.ResourceGroup(f"{resource_group_prefix}-{location}")
 default_opts = ResourceOptions(parent=resource_group)
 default_tags = {"purpose": "az-204", "app": func_app_name}
 resource_prefix = "funcapp"
+# The Service Bus connection strings the function app consumes.
+servicebus_secret_pattern = "ConnectionStringSecondary"
 identities: list[IdentityOutput] = [
     IdentityOutput(
         principal_id=get_client_config().object_id,
@@ -160,32 +185,36 @@ def define_role_assignments(
     role_assignments = []
 
     if storage_outputs:
-        if storage_outputs.storage_blob_endpoints:
-            role_assignments.extend(
-                [
-                    {
-                        "role_name": "Storage Blob Data Owner",
-                        "role_id": "b7e6dc6d-f1e8-4753-8033-0f276bb0955b",
-                        "scope": storage_outputs.storage_chain.storage_account.id,  # noqa: E501
-                        "name_postfix": "Storage",
-                    },
+        # One set of roles per shard account
+        accounts = storage_outputs.storage_chain.storage_accounts
+        for shard, account in enumerate(accounts):
+            name_postfix = shard_name("Storage", shard)
+            if storage_outputs.storage_blob_endpoints:
+                role_assignments.extend(
+                    [
+                        {
+                            "role_name": "Storage Blob Data Owner",
+                            "role_id": "b7e6dc6d-f1e8-4753-8033-0f276bb0955b",
+                            "scope": account.id,
+                            "name_postfix": name_postfix,
+                        },
+                        {
+                            "role_name": "Storage Blob Data Contributor",
+                            "role_id": "ba92f5b4-2d11-453d-a403-e96b0029c9fe",
+                            "scope": account.id,
+                            "name_postfix": name_postfix,
+                        },
+                    ]
+                )
+            if storage_outputs.storage_queue_endpoints:
+                role_assignments.append(
                     {
-                        "role_name": "Storage Blob Data Contributor",
-                        "role_id": "ba92f5b4-2d11-453d-a403-e96b0029c9fe",
-                        "scope": storage_outputs.storage_chain.storage_account.id,  # noqa: E501
-                        "name_postfix": "Storage",
+                        "role_name": "Storage Queue Data Contributor",
+                        "role_id": "974c5e8b-45b9-4653-ba55-5f855dd0fb88",
+                        "scope": account.id,
+                        "name_postfix": name_postfix,
                     },
-                ]
-            )
-        if storage_outputs.storage_queue_endpoints:
-            role_assignments.append(
-                {
-                    "role_name": "Storage Queue Data Contributor",
-                    "role_id": "974c5e8b-45b9-4653-ba55-5f855dd0fb88",
-                    "scope": storage_outputs.storage_chain.storage_account.id,
-                    "name_postfix": "Storage",
-                },
-            )
+                )
 
     if app_insights:
         role_assignments.append(
@@ -205,9 +234,15 @@ def define_app_settings(
     akv_secrets: dict[str, Input[str]] | None,
     storage_outputs: StorageOutputs | None,
     analytics_and_logs: AnalyticsAndLogsOutputs | None,
+    servicebus: ServiceBus | None,
+    package: FunctionPackage | None = None,
 ) -> dict[str, Input[str]]:
     app_settings = {}
 
+    if package:
+        # Restarts the app onto a new package, and only then.
+        app_settings[PACKAGE_HASH_SETTING] = package.sha256
+
     if akv_secrets:
         for secret_name, secret in akv_secrets.items():
             app_settings[secret_name] = secret
@@ -230,6 +265,24 @@ def define_app_settings(
         app_settings["AzureWebJobsStorage__clientId"] = (
             assigned_identity.client_id
         )
+        app_settings.update(
+            storage_outputs.storage_chain.routing_app_settings(
+                assigned_identity.client_id
+            )
+        )
+    if func_trigger_tuning is not None:
+        tuning = tune_triggers(
+            namespaces=servicebus.pkl_configs if servicebus else (),
+            storage_queues=(
+                storage_outputs.storage_chain.storage_queues
+                if storage_outputs
+                else ()
+            ),
+            **func_trigger_tuning,
+        )
+        for reason in tuning.reasons:
+            log.info(f"Trigger tuning: {reason}")
+        app_settings.update(tuning.app_settings())
 
     return app_settings
 
@@ -357,19 +410,45 @@ def setup_event_grid(
     location: str,
     resource_group_name: Output[str],
     prefix: str,
-) -> eventgrid.SystemTopic | None:
+    storage_outputs: StorageOutputs | None,
+    servicebus: ServiceBus | None,
+    func_app: web.WebApp | None,
+) -> EventGridRouting | None:
     if not create_event_grid:
         return None
+    if not storage_outputs:
+        raise ValueError(
+            "create_event_grid routes storage account events and needs "
+            "create_storage_account"
+        )
 
-    event_grid_topic = eventgrid.SystemTopic(
-        resource_name=f"{prefix}-event-topic",
-        location=location,
-        resource_group_name=resource_group_name,
-        tags=default_tags,
+    eventgrid_configs: list[peg.SystemTopic] = [
+        system_topic
+        for system_topics in load_pkl_configs(
+            resource_type="eventgrid",
+            pkl_config_files=eventgrid_config_files,
+            use_cache=pkl_cache_enabled,
+        )
+        for system_topic in system_topics
+    ]
+
+    event_grid = EventGridRouting(
+        name=f"{prefix}-event-grid",
+        args=EventGridArgs(
+            location=location,
+            pkl_configs=eventgrid_configs,
+            resource_group_name=resource_group_name,
+            storage_chain=storage_outputs.storage_chain,
+            subscription_id=subscription_id,
+            tags=default_tags,
+            servicebus=servicebus,
+            function_app_id=func_app.id if func_app else None,
+        ),
         opts=default_opts,
     )
 
-    return event_grid_topic
+    export("event_subscriptions", list(event_grid.event_subscriptions))
+    return event_grid
 
 
 def setup_roles(
@@ -411,9 +490,17 @@ def setup_servicebus(
     if not create_servicebus:
         return None
 
-    servicebus_configs: list[psb.Namespace] = load_pkl_config(
-        resource_type="servicebus", pkl_config_file=servicebus_config_file
-    )
+    servicebus_configs: list[psb.Namespace] = [
+        namespace
+        for namespaces in load_pkl_configs(
+            resource_type=(
+                "servicebus-compact" if pkl_compact_configs else "servicebus"
+            ),
+            pkl_config_files=servicebus_config_files,
+            use_cache=pkl_cache_enabled,
+        )
+        for namespace in namespaces
+    ]
 
     sbs = ServiceBus(
         name=prefix,
@@ -422,11 +509,17 @@ def setup_servicebus(
             resource_group_name=resource_group_name,
             pkl_configs=servicebus_configs,
             tags=default_tags,
+            deployment_mode=servicebus_deployment_mode,
+            rewrite_sql_filters=servicebus_rewrite_sql_filters,
+            capacity_planning=servicebus_capacity_planning,
         ),
         opts=default_opts,
     )
 
-    export("servicebus_secrets", sbs.servicebus_secrets)
+    export(
+        "servicebus_secrets",
+        sbs.servicebus_secrets.secrets.select(servicebus_key_vault_secrets),
+    )
 
     return sbs
 
@@ -441,32 +534,26 @@ def setup_storage(
     if not create:
         return None
 
-    def get_defaults(
-        storage_defaults_class: Type[StorageAccountDefaults],
-    ) -> dict:
-        return {
-            k: v
-            for k, v in vars(storage_defaults_class).items()
-            if not k.startswith("__") and not callable(v)
-        }
-
+    profile = storage_profile(storage_profile_name)
     storage_account_args = StorageComponentArgs(
         name=f"{prefix}storacct",
         args={
-            **get_defaults(StorageAccountDefaults),
+            **profile.account_args,
             "location": location,
             "resource_group_name": resource_group.name,
         },
     )
 
-    storage_blob_svc_props_args = StorageComponentArgs(
-        name=f"{prefix}-blob-props",
-        args={
-            "blob_services_name": "default",
-            "delete_retention_policy": {},
-            "resource_group_name": resource_group.name,
-        },
-    )
+    storage_blob_svc_props_args = None
+    if profile.blob_properties_args is not None:
+        storage_blob_svc_props_args = StorageComponentArgs(
+            name=f"{prefix}-blob-props",
+            args={
+                **profile.blob_properties_args,
+                "blob_services_name": "default",
+                "resource_group_name": resource_group.name,
+            },
+        )
 
     if create_function_app:
         blob_names.append(prefix)
@@ -498,29 +585,32 @@ def setup_storage(
             storage_blob_properties_args=storage_blob_svc_props_args,
             storage_blob_container_args=storage_blob_container_args,
             storage_queue_args=storage_queue_args,
+            shard_count=storage_shard_count,
+            shard_pins=storage_shard_pins,
             tags=default_tags,
         ),
         opts=default_opts,
     )
 
     storage_blob_endpoints = {
-        name: Output.concat(
-            storage_chain.storage_account.primary_endpoints.blob,
-            container.name,
-        )
-        for name, container in storage_chain.storage_blob_containers.items()
+        name: storage_chain.storage_routes[f"blob/{name}"].endpoint
+        for name in storage_chain.storage_blob_containers
     }
     storage_queue_endpoints = {
-        name: Output.concat(
-            storage_chain.storage_account.primary_endpoints.queue,
-            queue.name,
-        )
-        for name, queue in storage_chain.storage_queues.items()
+        name: storage_chain.storage_routes[f"queue/{name}"].endpoint
+        for name in storage_chain.storage_queues
     }
     export("blob_container_endpoints", storage_blob_endpoints)
     export("storage_secrets", storage_chain.storage_secrets)
     export("storage_account_keys", storage_chain.storage_account_keys)
     export("queue_names", storage_chain.storage_queues.keys())
+    export(
+        "storage_routes",
+        {
+            key: {"shard": route.shard, "connection": route.connection}
+            for key, route in storage_chain.storage_routes.items()
+        },
+    )
 
     return StorageOutputs(
         storage_chain=storage_chain,
@@ -538,6 +628,8 @@ def setup_web_app(
     func_app_name: str,
     assigned_identity: managedidentity.UserAssignedIdentity,
     func_runtime_args: dict | None,
+    package: FunctionPackage | None,
+    scale: FlexScale,
     storage_outputs: StorageOutputs | None,
     location: str,
     resource_group_name: Output[str],
@@ -571,6 +663,25 @@ def setup_web_app(
             storage_outputs.storage_blob_endpoints[resource_prefix]
         )
 
+    package_blob = None
+    if package and funcs_deployment_storage_args_value:
+        chain = storage_outputs.storage_chain
+        route = chain.storage_routes[f"blob/{resource_prefix}"]
+        # The asset is diffed by content, so only a new hash uploads.
+        package_blob = storage.Blob(
+            resource_name=f"{func_app_name}-package",
+            account_name=chain.storage_accounts[route.shard].name,
+            blob_name=FLEX_PACKAGE_BLOB,
+            container_name=chain.storage_blob_containers[resource_prefix].name,
+            content_type="application/zip",
+            metadata={"sha256": package.sha256},
+            resource_group_name=resource_group_name,
+            source=FileAsset(str(package.path)),
+            type=storage.BlobType.BLOCK,
+            opts=ResourceOptions(parent=app_svc_plan),
+        )
+        export("function_package_sha256", package.sha256)
+
     web_func_runtime_args = web.FunctionsRuntimeArgs(
         name="Python", version="3.13"
     )
@@ -602,10 +713,23 @@ def setup_web_app(
             ),
             runtime=web_func_runtime_args,
             scale_and_concurrency=web.FunctionsScaleAndConcurrencyArgs(
-                always_ready=[],
-                instance_memory_mb=2048,
-                maximum_instance_count=100,
-                triggers=None,
+                always_ready=[
+                    web.FunctionsAlwaysReadyConfigArgs(
+                        instance_count=count, name=group
+                    )
+                    for group, count in scale.always_ready.items()
+                ],
+                instance_memory_mb=scale.instance_memory_mb,
+                maximum_instance_count=scale.maximum_instance_count,
+                triggers=web.FunctionsScaleAndConcurrencyTriggersArgs(
+                    http=web.FunctionsScaleAndConcurrencyTriggersHttpArgs(
+                        per_instance_concurrency=(
+                            scale.http_per_instance_concurrency
+                        )
+                    )
+                )
+                if scale.http_per_instance_concurrency is not None
+                else None,
             ),
         ),
         identity=web.ManagedServiceIdentityArgs(
@@ -625,7 +749,9 @@ def setup_web_app(
         ),
         tags=func_app_tags,
         opts=ResourceOptions(
-            parent=app_svc_plan, ignore_changes=["siteConfig.appettings"]
+            parent=app_svc_plan,
+            depends_on=[package_blob] if package_blob else None,
+            ignore_changes=["siteConfig.appettings"],
         ),
     )
     export("default_host_name", func_app.default_host_name)
@@ -663,15 +789,6 @@ servicebus_outputs = setup_servicebus(
     resource_group_name=resource_group.name,
 )
 
-event_grid_topic = setup_event_grid(
-    create_event_grid=create_event_grid,
-    default_opts=default_opts,
-    default_tags=default_tags,
-    location=location,
-    resource_group_name=resource_group.name,
-    prefix=resource_prefix,
-)
-
 assigned_identity = setup_assigned_identity(
     default_opts=default_opts,
     default_tags=default_tags,
@@ -697,6 +814,12 @@ analytics_and_logs = setup_anlytics_and_insights(
     prefix=resource_prefix,
 )
 
+func_package = (
+    build_function_package(func_package_source)
+    if func_package_source and create_function_app
+    else None
+)
+
 func_app = setup_web_app(
     app_insights=analytics_and_logs.app_insights
     if analytics_and_logs
@@ -708,9 +831,23 @@ func_app = setup_web_app(
     default_tags=default_tags,
     func_app_name=func_app_name,
     func_runtime_args=func_runtime_args,
+    package=func_package,
+    scale=flex_scale(func_scale_profile, func_scale_overrides),
+    location=location,
+    resource_group_name=resource_group.name,
+    storage_outputs=storage_outputs,
+)
+
+event_grid = setup_event_grid(
+    create_event_grid=create_event_grid,
+    default_opts=default_opts,
+    default_tags=default_tags,
     location=location,
     resource_group_name=resource_group.name,
+    prefix=resource_prefix,
     storage_outputs=storage_outputs,
+    servicebus=servicebus_outputs,
+    func_app=func_app,
 )
 
 role_assignments = define_role_assignments(
@@ -761,7 +898,11 @@ if storage_outputs and storage_outputs.storage_chain:
     secrets_dict.update(storage_outputs.storage_chain.storage_secrets.secrets)
 
 if servicebus_outputs and servicebus_outputs.servicebus_secrets:
-    secrets_dict.update(servicebus_outputs.servicebus_secrets.secrets)
+    secrets_dict.update(
+        servicebus_outputs.servicebus_secrets.secrets.select(
+            servicebus_key_vault_secrets
+        )
+    )
 
 if key_vault:
     for secret_name, secret_value in secrets_dict.items():
@@ -777,7 +918,7 @@ if key_vault:
                 secret.properties.apply(lambda p: p.secret_uri_with_version),
                 ")",
             )
-        if "ConnectionStringSecondary" in secret_name:
+        if servicebus_secret_pattern in secret_name:
             app_settings_secrets[secret_name] = Output.concat(
                 "@Microsoft.KeyVault(SecretUri=",
                 secret.properties.apply(lambda p: p.secret_uri_with_version),
@@ -791,6 +932,8 @@ if func_app:
         storage_outputs=storage_outputs,
         analytics_and_logs=analytics_and_logs,
         assigned_identity=assigned_identity,
+        servicebus=servicebus_outputs,
+        package=func_package,
     )
 
     web_app_settings = setup_web_app_settings(
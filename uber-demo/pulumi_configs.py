@@ -26,11 +26,76 @@ blob_names: list = func_app_configs.require_object("blob_names")
 func_app_name: str = func_app_configs.require("func_app_name")
 resource_group_prefix: str = func_app_configs.require("resource-group-prefix")
 queue_names: list = func_app_configs.require_object("queue_names")
+# Storage account profile, a key of `modules.storage.STORAGE_PROFILES`
+storage_profile_name: str = (
+    func_app_configs.get("storage_profile") or "standard"
+)
+# Spread blob containers and queues across this many storage accounts
+storage_shard_count: int = func_app_configs.get_int("storage_shard_count") or 1
+# Shards of containers and queues that must not move when the count
+# changes, e.g. {"blob/images": 0}: the `shard` of their `storage_routes`
+# export entries
+storage_shard_pins: dict = (
+    func_app_configs.get_object("storage_shard_pins") or {}
+)
 # Function App Settings
 func_runtime_args: dict | None = func_app_configs.get_object(
     "func_runtime_args"
 )
+# Function app source directory (holding host.json) to zip and deploy; the
+# package is only uploaded when its content hash changes
+func_package_source: str | None = func_app_configs.get("func_package_source")
+# Flex Consumption scale, a key of `utils.function_scale.FLEX_SCALE_PROFILES`
+# (e.g. per environment), with `FlexScale` fields overriding it, e.g.
+# {"always_ready": {"http": 1}, "http_per_instance_concurrency": 8}
+func_scale_profile: str = (
+    func_app_configs.get("func_scale_profile") or "default"
+)
+func_scale_overrides: dict | None = func_app_configs.get_object("func_scale")
+# Size the Service Bus and storage queue trigger concurrency from the
+# topology, e.g. {"processing_seconds": 2, "instances": 4,
+# "queue_messages_per_second": {"jobs": 50}}; unset keeps the host defaults
+func_trigger_tuning: dict | None = func_app_configs.get_object(
+    "func_trigger_tuning"
+)
 # Pkl Config Files
-servicebus_config_file: str = ""
+servicebus_config_files: list[str] = []
+eventgrid_config_files: list[str] = []
+# Set to false to bypass the on-disk cache of evaluated Pkl configs
+pkl_cache_enabled: bool = func_app_configs.get_bool("pkl_cache_enabled") in (
+    None,
+    True,
+)
+# Decode Service Bus configs into the compact, shared bindings (large
+# topologies)
+pkl_compact_configs: bool = bool(
+    func_app_configs.get_bool("pkl_compact_configs")
+)
+# "resources" (one Pulumi resource per entity) or "template" (ARM template
+# deployments per namespace, for large topologies)
+servicebus_deployment_mode: str = (
+    func_app_configs.get("servicebus_deployment_mode") or "resources"
+)
+# Create simple SqlFilter subscription rules as CorrelationFilters
+servicebus_rewrite_sql_filters: bool = bool(
+    func_app_configs.get_bool("servicebus_rewrite_sql_filters")
+)
+# Export and store in Key Vault only the Service Bus secrets whose name
+# contains this, e.g. "ConnectionStringSecondary", so the keys of the other
+# authorization rules are never listed; unset keeps every connection string
+servicebus_key_vault_secrets: str = (
+    func_app_configs.get("servicebus_key_vault_secrets") or ""
+)
+# "off", "warn" or "enforce" the SKU the Pkl load hints call for
+servicebus_capacity_planning: str = (
+    func_app_configs.get("servicebus_capacity_planning") or "off"
+)
 if create_servicebus:
-    servicebus_config_file = func_app_configs.require("servicebus_config_file")
+    # Either a list of files (e.g. per team/environment) or a single file
+    servicebus_config_files = func_app_configs.get_object(
+        "servicebus_config_files"
+    ) or [func_app_configs.require("servicebus_config_file")]
+if create_event_grid:
+    eventgrid_config_files = func_app_configs.get_object(
+        "eventgrid_config_files"
+    ) or [func_app_configs.require("eventgrid_config_file")]
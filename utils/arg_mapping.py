@@ -0,0 +1,178 @@
+import dataclasses
+import inspect
+import re
+from typing import Any, Callable, Optional
+
+import pulumi_azure_native.servicebus as asb
+
+# Pkl fields whose snake_case name differs from their azure-native argument.
+SERVICEBUS_RENAMES = {
+    "defaultMessageTtl": "default_message_time_to_live",
+    "enabledBatchOperations": "enable_batched_operations",
+}
+
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+# Pkl field, argument, ARM property, converter.
+_Entry = tuple[str, str, str, Optional[Callable[[Any], Any]]]
+
+
+def snake_case(name: str) -> str:
+    """
+    `maxSizeInMegabytes` -> `max_size_in_megabytes`.
+    """
+    return _CAMEL_BOUNDARY.sub("_", name).lower()
+
+
+def camel_case(name: str) -> str:
+    """
+    `max_size_in_megabytes` -> `maxSizeInMegabytes`.
+    """
+    head, *rest = name.split("_")
+    return head + "".join(part.capitalize() for part in rest)
+
+
+class ArgMapper:
+    """
+    Maps the fields of generated Pkl dataclasses onto the keyword arguments
+    of an azure-native `*Args` class by name: a field's snake_case name, or
+    its entry in `renames`, must be a parameter of the `*Args` constructor.
+
+    The table of each Pkl class is built from the dataclass fields and the
+    constructor signature on first use and cached, so mapping an instance is
+    one loop over precomputed `(field, argument, property, converter)`
+    entries. The regular and compact bindings get a table each.
+
+    Args:
+        args_class (type): The azure-native `*Args` class.
+        renames (Optional[dict[str, str]], optional): Pkl field to argument
+            name, where snake_case does not match.
+        converters (Optional[dict[str, Callable[[Any], Any]]], optional):
+            Pkl field to a function applied to its value in `kwargs`, e.g.
+            an enum constructor.
+
+    Attributes:
+        args_class (type): The azure-native `*Args` class.
+        parameters (frozenset[str]): The constructor's parameter names.
+    """
+
+    def __init__(
+        self,
+        args_class: type,
+        renames: Optional[dict[str, str]] = None,
+        converters: Optional[dict[str, Callable[[Any], Any]]] = None,
+    ):
+        self.args_class = args_class
+        self.parameters = frozenset(
+            name
+            for name in inspect.signature(args_class.__init__).parameters
+            if name not in ("self", "__self__")
+        )
+        self.__renames = renames or {}
+        self.__converters = converters or {}
+        self.__tables: dict[type, tuple[_Entry, ...]] = {}
+        self.__unmapped: dict[type, tuple[str, ...]] = {}
+
+    def __table(self, source_class: type) -> tuple[_Entry, ...]:
+        table = self.__tables.get(source_class)
+        if table is not None:
+            return table
+        mapped = []
+        unmapped = []
+        for source_field in dataclasses.fields(source_class):
+            name = source_field.name
+            target = self.__renames.get(name, snake_case(name))
+            if target in self.parameters:
+                mapped.append(
+                    (
+                        name,
+                        target,
+                        camel_case(target),
+                        self.__converters.get(name),
+                    )
+                )
+            else:
+                unmapped.append(name)
+        table = self.__tables[source_class] = tuple(mapped)
+        self.__unmapped[source_class] = tuple(unmapped)
+        return table
+
+    def kwargs(self, source: Any) -> dict[str, Any]:
+        """
+        The `*Args` keyword arguments of a Pkl instance, without unset
+        fields.
+
+        Args:
+            source (Any): A generated Pkl dataclass instance.
+
+        Returns:
+            dict[str, Any]: Argument name to converted value.
+        """
+        kwargs = {}
+        for name, target, _, convert in self.__table(type(source)):
+            value = getattr(source, name)
+            if value is not None:
+                kwargs[target] = convert(value) if convert else value
+        return kwargs
+
+    def properties(self, source: Any) -> dict[str, Any]:
+        """
+        The ARM properties of a Pkl instance: the `*Args` names in
+        camelCase, values unconverted and unset fields dropped.
+
+        Args:
+            source (Any): A generated Pkl dataclass instance.
+
+        Returns:
+            dict[str, Any]: Property name to value.
+        """
+        properties = {}
+        for name, _, target, _ in self.__table(type(source)):
+            value = getattr(source, name)
+            if value is not None:
+                properties[target] = value
+        return properties
+
+    def mapping(self, source_class: type) -> dict[str, str]:
+        """
+        The mapped fields of a Pkl class.
+
+        Args:
+            source_class (type): A generated Pkl dataclass.
+
+        Returns:
+            dict[str, str]: Pkl field to argument name.
+        """
+        return {
+            name: target for name, target, _, _ in self.__table(source_class)
+        }
+
+    def unmapped(self, source_class: type) -> tuple[str, ...]:
+        """
+        The fields of a Pkl class without a matching argument; they are
+        never deployed.
+
+        Args:
+            source_class (type): A generated Pkl dataclass.
+
+        Returns:
+            tuple[str, ...]: The field names.
+        """
+        self.__table(source_class)
+        return self.__unmapped[source_class]
+
+    def seen(self) -> list[type]:
+        """
+        The Pkl classes mapped so far.
+        """
+        return list(self.__tables)
+
+
+QUEUE_ARGS = ArgMapper(
+    asb.QueueArgs, SERVICEBUS_RENAMES, {"status": asb.EntityStatus}
+)
+TOPIC_ARGS = ArgMapper(
+    asb.TopicArgs, SERVICEBUS_RENAMES, {"status": asb.EntityStatus}
+)
+SUBSCRIPTION_ARGS = ArgMapper(
+    asb.SubscriptionArgs, SERVICEBUS_RENAMES, {"status": asb.EntityStatus}
+)
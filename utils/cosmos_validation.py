@@ -0,0 +1,294 @@
+from typing import Any, Iterable, Optional
+
+import configs.generated.cosmos_pkl as pcs
+from utils.servicebus_validation import Violation
+
+# Cosmos DB for NoSQL limits.
+MAX_SHARED_THROUGHPUT_CONTAINERS = 25
+MAX_UNIQUE_KEY_PATHS = 16
+MIN_COMPOSITE_INDEX_PATHS = 2
+ROOT_PATH = "/*"
+
+# Cosmos DB account limits.
+# The integrated cache only serves reads of these consistency levels.
+CACHED_CONSISTENCY_LEVELS = ("Session", "Eventual")
+# Bounded staleness bounds (max_staleness_prefix, max_interval_in_seconds)
+# of single and multi-region accounts.
+SINGLE_REGION_STALENESS_BOUNDS = ((10, 2147483647), (5, 86400))
+MULTI_REGION_STALENESS_BOUNDS = ((100000, 2147483647), (300, 86400))
+
+
+def validate_cosmos(
+    databases: Iterable[pcs.Database], serverless: bool = False
+) -> list[Violation]:
+    """
+    Checks Cosmos DB database and container configs for the constraints the
+    Pkl schema cannot express and Azure only reports on deployment. Every
+    violation is collected; nothing raises.
+
+    Args:
+        databases (Iterable[pcs.Database]): The Pkl database configs.
+        serverless (bool, optional): Whether the account is serverless,
+            which has no provisioned throughput. Defaults to False.
+
+    Returns:
+        list[Violation]: Every violation, in config order.
+    """
+    violations = []
+    database_names: set[str] = set()
+    for database in databases:
+        if database.name in database_names:
+            violations.append(
+                Violation(database.name, "database name is not unique")
+            )
+        database_names.add(database.name)
+        violations += _check_throughput(
+            database.name, database.throughput, serverless
+        )
+        shared = [
+            container
+            for container in database.containers
+            if container.throughput is None
+        ]
+        if (
+            database.throughput
+            and len(shared) > MAX_SHARED_THROUGHPUT_CONTAINERS
+        ):
+            violations.append(
+                Violation(
+                    database.name,
+                    f"{len(shared)} containers share the database "
+                    f"throughput, at most {MAX_SHARED_THROUGHPUT_CONTAINERS}",
+                )
+            )
+
+        container_names: set[str] = set()
+        for container in database.containers:
+            path = f"{database.name}/{container.name}"
+            if container.name in container_names:
+                violations.append(
+                    Violation(path, "container name is not unique")
+                )
+            container_names.add(container.name)
+            violations += _check_throughput(
+                path, container.throughput, serverless
+            )
+            violations += _check_partition_key(path, container.partitionKey)
+            violations += _check_indexing_policy(path, container.indexingPolicy)
+            for unique_key in container.uniqueKeys or ():
+                if len(unique_key) > MAX_UNIQUE_KEY_PATHS:
+                    violations.append(
+                        Violation(
+                            path,
+                            f"unique key has {len(unique_key)} paths, at "
+                            f"most {MAX_UNIQUE_KEY_PATHS}",
+                        )
+                    )
+    return violations
+
+
+def check_cosmos(
+    databases: Iterable[pcs.Database], serverless: bool = False
+) -> None:
+    """
+    Raises if `validate_cosmos` finds any violation.
+
+    Raises:
+        ValueError: Listing every violation.
+    """
+    violations = validate_cosmos(databases, serverless=serverless)
+    if violations:
+        raise ValueError(
+            f"Cosmos DB config has {len(violations)} violation(s):\n"
+            + "\n".join(f"  {violation}" for violation in violations)
+        )
+
+
+def _check_throughput(
+    path: str, throughput: Optional[pcs.Throughput], serverless: bool
+) -> list[Violation]:
+    if throughput is None:
+        return []
+    if serverless:
+        return [
+            Violation(
+                path, "serverless accounts have no provisioned throughput"
+            )
+        ]
+    if (throughput.manual is None) == (throughput.autoscaleMax is None):
+        return [
+            Violation(
+                path, "throughput sets exactly one of manual and autoscaleMax"
+            )
+        ]
+    return []
+
+
+def _check_partition_key(
+    path: str, partition_key: pcs.PartitionKey
+) -> list[Violation]:
+    violations = []
+    paths = partition_key.paths
+    if len(set(paths)) != len(paths):
+        violations.append(Violation(path, "partition key repeats a path"))
+    if partition_key.kind == "Hash" and len(paths) > 1:
+        violations.append(
+            Violation(
+                path,
+                f"{len(paths)} partition key paths need the MultiHash kind",
+            )
+        )
+    return violations
+
+
+def _check_indexing_policy(
+    path: str, policy: pcs.IndexingPolicy
+) -> list[Violation]:
+    violations = []
+    if policy.indexingMode == "none":
+        if (
+            policy.automatic
+            or policy.includedPaths
+            or policy.excludedPaths
+            or policy.compositeIndexes
+            or policy.spatialIndexes
+        ):
+            violations.append(
+                Violation(
+                    path,
+                    "indexingMode none takes no paths or indexes and is not "
+                    "automatic",
+                )
+            )
+        return violations
+
+    if ROOT_PATH not in policy.includedPaths + policy.excludedPaths:
+        violations.append(
+            Violation(
+                path,
+                f"the root path {ROOT_PATH} must be included or excluded",
+            )
+        )
+    for index_path in sorted(
+        set(policy.includedPaths) & set(policy.excludedPaths)
+    ):
+        violations.append(
+            Violation(
+                path,
+                f"{index_path} is both included and excluded"
+                + (
+                    ", replace the default includedPaths with "
+                    "`includedPaths = new Listing { ... }`"
+                    if index_path == ROOT_PATH
+                    else ""
+                ),
+            )
+        )
+    for composite in policy.compositeIndexes or ():
+        if len(composite) < MIN_COMPOSITE_INDEX_PATHS:
+            violations.append(
+                Violation(
+                    path,
+                    f"composite index on {[p.path for p in composite]} needs "
+                    f"at least {MIN_COMPOSITE_INDEX_PATHS} paths",
+                )
+            )
+        if len({p.path for p in composite}) != len(composite):
+            violations.append(Violation(path, "composite index repeats a path"))
+    return violations
+
+
+def _arg(value: Any, name: str) -> Any:
+    """
+    A field of an args dict or a pulumi args object, enums unwrapped.
+    """
+    if value is None:
+        return None
+    found = value.get(name) if isinstance(value, dict) else getattr(value, name)
+    return getattr(found, "value", found)
+
+
+def check_cosmos_account(
+    account_args: dict, dedicated_gateway: bool = False
+) -> list[str]:
+    """
+    Problems with a Cosmos DB account's regions, consistency and
+    capabilities that Azure rejects or that defeat their purpose.
+
+    Args:
+        account_args (dict): `cosmosdb.DatabaseAccount` arguments.
+        dedicated_gateway (bool, optional): Whether the account gets a
+            dedicated gateway for the integrated cache.
+
+    Returns:
+        list[str]: One message per problem, empty if the combination is
+            legal.
+    """
+    locations = account_args.get("locations") or []
+    names = [_arg(location, "location_name") for location in locations]
+    priorities = sorted(
+        _arg(location, "failover_priority") for location in locations
+    )
+    serverless = any(
+        _arg(capability, "name") == "EnableServerless"
+        for capability in account_args.get("capabilities") or ()
+    )
+    multi_write = bool(account_args.get("enable_multiple_write_locations"))
+    policy = account_args.get("consistency_policy")
+    consistency = _arg(policy, "default_consistency_level")
+    problems = []
+
+    if not locations:
+        problems.append("the account needs at least one location")
+    if len(set(names)) != len(names):
+        problems.append(f"locations {names} repeat a region")
+    if priorities != list(range(len(locations))):
+        problems.append(
+            f"failover priorities {priorities} are not 0 to "
+            f"{len(locations) - 1}"
+        )
+    if serverless:
+        if len(locations) > 1:
+            problems.append(
+                f"serverless accounts run in a single region, got {names}"
+            )
+        if account_args.get("enable_free_tier"):
+            problems.append("serverless accounts have no free tier")
+        if dedicated_gateway:
+            problems.append(
+                "serverless accounts have no dedicated gateway, the "
+                "integrated cache needs provisioned throughput"
+            )
+    if multi_write:
+        if len(locations) < 2:
+            problems.append("multi-region writes need at least two locations")
+        if consistency == "Strong":
+            problems.append(
+                "Strong consistency is not supported with multi-region writes"
+            )
+    if consistency == "BoundedStaleness":
+        (min_prefix, max_prefix), (min_interval, max_interval) = (
+            MULTI_REGION_STALENESS_BOUNDS
+            if len(locations) > 1
+            else SINGLE_REGION_STALENESS_BOUNDS
+        )
+        prefix = _arg(policy, "max_staleness_prefix")
+        interval = _arg(policy, "max_interval_in_seconds")
+        if prefix is None or not min_prefix <= prefix <= max_prefix:
+            problems.append(
+                f"bounded staleness max_staleness_prefix {prefix} is not "
+                f"within {min_prefix} to {max_prefix}"
+            )
+        if interval is None or not min_interval <= interval <= max_interval:
+            problems.append(
+                f"bounded staleness max_interval_in_seconds {interval} is "
+                f"not within {min_interval} to {max_interval}"
+            )
+    if dedicated_gateway and consistency not in CACHED_CONSISTENCY_LEVELS:
+        problems.append(
+            f"the integrated cache only serves "
+            f"{' and '.join(CACHED_CONSISTENCY_LEVELS)} reads, got "
+            f"{consistency}"
+        )
+
+    return problems
@@ -0,0 +1,294 @@
+from collections import Counter
+from typing import Iterable
+
+import configs.generated.eventgrid_pkl as peg
+import configs.generated.servicebus_pkl as psb
+from utils.servicebus_validation import Violation
+
+# Event Grid limits per event subscription.
+MAX_ADVANCED_FILTERS = 25
+MAX_ADVANCED_FILTER_VALUES = 25
+# Event Grid only batches deliveries to webhook and function endpoints.
+BATCHING_DESTINATIONS = ("AzureFunction",)
+SERVICEBUS_DESTINATIONS = ("ServiceBusQueue", "ServiceBusTopic")
+
+# The `AdvancedFilter` member each operator reads; None reads no value.
+FILTER_VALUE_MEMBERS: dict[str, str | None] = {
+    "NumberIn": "numberValues",
+    "NumberNotIn": "numberValues",
+    "NumberLessThan": "numberValue",
+    "NumberGreaterThan": "numberValue",
+    "NumberLessThanOrEquals": "numberValue",
+    "NumberGreaterThanOrEquals": "numberValue",
+    "NumberInRange": "numberRanges",
+    "NumberNotInRange": "numberRanges",
+    "BoolEquals": "boolValue",
+    "StringIn": "stringValues",
+    "StringNotIn": "stringValues",
+    "StringBeginsWith": "stringValues",
+    "StringNotBeginsWith": "stringValues",
+    "StringEndsWith": "stringValues",
+    "StringNotEndsWith": "stringValues",
+    "StringContains": "stringValues",
+    "StringNotContains": "stringValues",
+    "IsNullOrUndefined": None,
+    "IsNotNull": None,
+}
+_VALUE_MEMBERS = (
+    "stringValues",
+    "numberValues",
+    "numberRanges",
+    "numberValue",
+    "boolValue",
+)
+
+
+def validate_eventgrid(
+    system_topics: Iterable[peg.SystemTopic],
+    servicebus_namespaces: Iterable[psb.Namespace] = (),
+    storage_containers: Iterable[str] = (),
+    storage_queues: Iterable[str] = (),
+    shard_count: int = 1,
+    function_app: bool = False,
+) -> list[Violation]:
+    """
+    Checks Event Grid routing configs against the resources they route to
+    and the Event Grid limits the Pkl schema cannot express. Every
+    violation is collected; nothing raises.
+
+    Args:
+        system_topics (Iterable[peg.SystemTopic]): The Pkl system topics.
+        servicebus_namespaces (Iterable[psb.Namespace], optional): The
+            Service Bus topology Service Bus destinations must exist in.
+        storage_containers (Iterable[str], optional): The StorageChain
+            containers dead letters may go to.
+        storage_queues (Iterable[str], optional): The StorageChain queues
+            storage queue destinations must exist in.
+        shard_count (int, optional): The StorageChain's number of accounts.
+        function_app (bool, optional): Whether there is a function app for
+            AzureFunction destinations.
+
+    Returns:
+        list[Violation]: Every violation, in config order.
+    """
+    entities: dict[tuple[str, str], set[str]] = {}
+    for namespace in servicebus_namespaces:
+        entities[("ServiceBusQueue", namespace.namePrefix)] = {
+            queue.name for queue in namespace.queues or ()
+        }
+        entities[("ServiceBusTopic", namespace.namePrefix)] = {
+            topic.name for topic in namespace.topics or ()
+        }
+    containers = set(storage_containers)
+    queues = set(storage_queues)
+
+    system_topics = list(system_topics)
+    violations = []
+    names: set[str] = set()
+    shards = Counter(topic.shard for topic in system_topics)
+    for topic in system_topics:
+        if topic.name in names:
+            violations.append(
+                Violation(topic.name, "system topic name is not unique")
+            )
+        names.add(topic.name)
+        if topic.shard >= shard_count:
+            violations.append(
+                Violation(
+                    topic.name,
+                    f"shard {topic.shard} does not exist, the StorageChain "
+                    f"has {shard_count} account(s)",
+                )
+            )
+        elif shards[topic.shard] > 1:
+            violations.append(
+                Violation(
+                    topic.name,
+                    f"shard {topic.shard} already has a system topic, an "
+                    "account can only have one",
+                )
+            )
+        subscription_names: set[str] = set()
+        for subscription in topic.subscriptions:
+            path = f"{topic.name}/{subscription.name}"
+            if subscription.name in subscription_names:
+                violations.append(
+                    Violation(path, "subscription name is not unique")
+                )
+            subscription_names.add(subscription.name)
+            violations += _check_destination(
+                path, subscription.destination, entities, queues, function_app
+            )
+            if subscription.filter:
+                violations += _check_filter(path, subscription.filter)
+            if (
+                subscription.deadLetter
+                and subscription.deadLetter.container not in containers
+            ):
+                violations.append(
+                    Violation(
+                        path,
+                        f"dead letter container "
+                        f"'{subscription.deadLetter.container}' is not a "
+                        "StorageChain container",
+                    )
+                )
+    return violations
+
+
+def check_eventgrid(
+    system_topics: Iterable[peg.SystemTopic],
+    servicebus_namespaces: Iterable[psb.Namespace] = (),
+    storage_containers: Iterable[str] = (),
+    storage_queues: Iterable[str] = (),
+    shard_count: int = 1,
+    function_app: bool = False,
+) -> None:
+    """
+    Raises if `validate_eventgrid` finds any violation.
+
+    Raises:
+        ValueError: Listing every violation.
+    """
+    violations = validate_eventgrid(
+        system_topics,
+        servicebus_namespaces=servicebus_namespaces,
+        storage_containers=storage_containers,
+        storage_queues=storage_queues,
+        shard_count=shard_count,
+        function_app=function_app,
+    )
+    if violations:
+        raise ValueError(
+            f"Event Grid config has {len(violations)} violation(s):\n"
+            + "\n".join(f"  {violation}" for violation in violations)
+        )
+
+
+def _check_destination(
+    path: str,
+    destination: peg.Destination,
+    entities: dict[tuple[str, str], set[str]],
+    queues: set[str],
+    function_app: bool,
+) -> list[Violation]:
+    violations = []
+    kind = destination.type
+    if kind in SERVICEBUS_DESTINATIONS:
+        known = entities.get((kind, destination.namespace or ""))
+        if destination.namespace is None:
+            violations.append(
+                Violation(path, f"{kind} destination needs a namespace")
+            )
+        elif known is None:
+            violations.append(
+                Violation(
+                    path,
+                    f"Service Bus namespace '{destination.namespace}' is not "
+                    "deployed",
+                )
+            )
+        elif destination.name not in known:
+            violations.append(
+                Violation(
+                    path,
+                    f"'{destination.name}' is not a "
+                    f"{'queue' if kind == 'ServiceBusQueue' else 'topic'} of "
+                    f"namespace '{destination.namespace}'",
+                )
+            )
+    elif destination.namespace is not None:
+        violations.append(
+            Violation(path, f"{kind} destination takes no namespace")
+        )
+    if kind == "StorageQueue" and destination.name not in queues:
+        violations.append(
+            Violation(path, f"'{destination.name}' is not a StorageChain queue")
+        )
+    if (
+        kind != "StorageQueue"
+        and destination.queueMessageTimeToLiveInSeconds is not None
+    ):
+        violations.append(
+            Violation(
+                path,
+                "queueMessageTimeToLiveInSeconds only applies to StorageQueue "
+                "destinations",
+            )
+        )
+    if kind == "AzureFunction" and not function_app:
+        violations.append(
+            Violation(path, "AzureFunction destination without a function app")
+        )
+    if destination.batching and kind not in BATCHING_DESTINATIONS:
+        violations.append(
+            Violation(
+                path,
+                f"Event Grid does not batch deliveries to {kind}, only to "
+                f"{', '.join(BATCHING_DESTINATIONS)}",
+            )
+        )
+    return violations
+
+
+def _check_filter(path: str, filter: peg.Filter) -> list[Violation]:
+    violations = []
+    if filter.includedEventTypes is not None and not filter.includedEventTypes:
+        violations.append(
+            Violation(path, "includedEventTypes is empty, nothing is delivered")
+        )
+    advanced = filter.advancedFilters or []
+    if len(advanced) > MAX_ADVANCED_FILTERS:
+        violations.append(
+            Violation(
+                path,
+                f"{len(advanced)} advanced filters, at most "
+                f"{MAX_ADVANCED_FILTERS}",
+            )
+        )
+    value_count = 0
+    for advanced_filter in advanced:
+        operator = advanced_filter.operatorType
+        member = FILTER_VALUE_MEMBERS[operator]
+        for other in _VALUE_MEMBERS:
+            value = getattr(advanced_filter, other)
+            if other != member and value is not None:
+                violations.append(
+                    Violation(
+                        path,
+                        f"{operator} filter on '{advanced_filter.key}' does "
+                        f"not take {other}",
+                    )
+                )
+        if member is None:
+            continue
+        value = getattr(advanced_filter, member)
+        if value is None or value == []:
+            violations.append(
+                Violation(
+                    path,
+                    f"{operator} filter on '{advanced_filter.key}' needs "
+                    f"{member}",
+                )
+            )
+            continue
+        if member == "numberRanges":
+            for low_high in value:
+                if len(low_high) != 2 or low_high[0] > low_high[1]:
+                    violations.append(
+                        Violation(
+                            path,
+                            f"{operator} filter on '{advanced_filter.key}' "
+                            f"range {list(low_high)} is not [low, high]",
+                        )
+                    )
+        value_count += len(value) if isinstance(value, list) else 1
+    if value_count > MAX_ADVANCED_FILTER_VALUES:
+        violations.append(
+            Violation(
+                path,
+                f"advanced filters hold {value_count} values, at most "
+                f"{MAX_ADVANCED_FILTER_VALUES}",
+            )
+        )
+    return violations
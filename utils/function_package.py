@@ -0,0 +1,135 @@
+import fnmatch
+import hashlib
+import io
+import os
+import stat
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+PACKAGE_DIR_ENV = "FUNCTION_PACKAGE_DIR"
+DEFAULT_PACKAGE_DIR = (
+    Path.home() / ".cache" / "pulumi-azure" / "function-packages"
+)
+# The blob a Flex Consumption app loads from its deployment container.
+FLEX_PACKAGE_BLOB = "released-package.zip"
+# App setting carrying the package hash; changing it restarts the app onto
+# the new package.
+PACKAGE_HASH_SETTING = "FUNCTION_PACKAGE_SHA256"
+# Paths (relative, `/` separated) left out of the package.
+DEFAULT_EXCLUDES = (
+    ".git/*",
+    ".venv/*",
+    "*/__pycache__/*",
+    "__pycache__/*",
+    "*.pyc",
+    "local.settings.json",
+    ".vscode/*",
+)
+# Every entry gets the earliest timestamp a zip can hold and fixed
+# permissions, so the bytes only depend on the file paths and contents.
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_FILE_MODE = 0o644
+_EXECUTABLE_MODE = 0o755
+
+
+@dataclass(frozen=True)
+class FunctionPackage:
+    """
+    A function app zip package, named by its content hash.
+
+    Args:
+        path (Path): The zip file, `<sha256>.zip`.
+        sha256 (str): The hex SHA-256 of the zip.
+    """
+
+    path: Path
+    sha256: str
+
+
+def build_function_package(
+    source_dir: str | Path,
+    package_dir: Optional[str | Path] = None,
+    excludes: Iterable[str] = DEFAULT_EXCLUDES,
+) -> FunctionPackage:
+    """
+    Zips a function app source directory deterministically: entries are
+    sorted, carry `ZIP_DATE_TIME` and fixed permissions, so unchanged
+    sources rebuild byte-identical and keep their hash. The zip is written
+    to `<package_dir>/<sha256>.zip` unless it is already there.
+
+    Args:
+        source_dir (str | Path): The function app root, holding `host.json`.
+        package_dir (Optional[str | Path], optional): Where packages are
+            kept. Defaults to `FUNCTION_PACKAGE_DIR` or DEFAULT_PACKAGE_DIR.
+        excludes (Iterable[str], optional): `fnmatch` patterns of relative
+            paths to leave out. Defaults to DEFAULT_EXCLUDES.
+
+    Returns:
+        FunctionPackage: The package.
+
+    Raises:
+        ValueError: If source_dir is not a directory or has no `host.json`.
+    """
+    source = Path(source_dir)
+    if not source.is_dir():
+        raise ValueError(f"Function source '{source}' is not a directory")
+    if not (source / "host.json").is_file():
+        raise ValueError(f"Function source '{source}' has no host.json")
+    excludes = tuple(excludes)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for relative, file in _package_files(source, excludes):
+            info = zipfile.ZipInfo(relative, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3
+            mode = (
+                _EXECUTABLE_MODE
+                if file.stat().st_mode & stat.S_IXUSR
+                else _FILE_MODE
+            )
+            info.external_attr = (stat.S_IFREG | mode) << 16
+            archive.writestr(info, file.read_bytes(), compresslevel=9)
+    content = buffer.getvalue()
+    sha256 = hashlib.sha256(content).hexdigest()
+
+    directory = Path(
+        package_dir or os.environ.get(PACKAGE_DIR_ENV) or DEFAULT_PACKAGE_DIR
+    )
+    path = directory / f"{sha256}.zip"
+    if not path.is_file():
+        directory.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so a package is never seen half written.
+        partial = path.with_suffix(f".{os.getpid()}.tmp")
+        partial.write_bytes(content)
+        partial.replace(path)
+    return FunctionPackage(path=path, sha256=sha256)
+
+
+def _package_files(
+    source: Path, excludes: tuple[str, ...]
+) -> list[tuple[str, Path]]:
+    """
+    The files to package as (relative path, path), sorted by relative path.
+    """
+    files = []
+    for root, dirs, names in os.walk(source):
+        base = Path(root).relative_to(source)
+        # Skip excluded directories, e.g. a virtualenv, without walking them.
+        dirs[:] = sorted(
+            name
+            for name in dirs
+            if not _excluded(f"{(base / name).as_posix()}/", excludes)
+        )
+        for name in names:
+            file = Path(root) / name
+            relative = (base / name).as_posix()
+            if not _excluded(relative, excludes) and file.is_file():
+                files.append((relative, file))
+    return sorted(files)
+
+
+def _excluded(relative: str, excludes: tuple[str, ...]) -> bool:
+    return any(fnmatch.fnmatch(relative, pattern) for pattern in excludes)
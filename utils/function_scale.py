@@ -0,0 +1,156 @@
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Optional
+
+# Flex Consumption plan limits.
+INSTANCE_MEMORY_SIZES_MB = (512, 2048, 4096)
+MIN_MAXIMUM_INSTANCE_COUNT = 1
+MAX_MAXIMUM_INSTANCE_COUNT = 1000
+MAX_HTTP_PER_INSTANCE_CONCURRENCY = 1000
+# Always ready instances are kept per trigger group, or per function as
+# `function:<name>`.
+ALWAYS_READY_GROUPS = ("http", "blob", "durable")
+FUNCTION_GROUP_PREFIX = "function:"
+
+
+@dataclass(frozen=True)
+class FlexScale:
+    """
+    Scale and concurrency of a Flex Consumption function app.
+
+    Args:
+        instance_memory_mb (int): Memory of each instance, one of
+            INSTANCE_MEMORY_SIZES_MB.
+        maximum_instance_count (int): Instances the app scales out to.
+        always_ready (dict[str, int]): Instances kept warm by trigger group
+            (`http`, `blob`, `durable`) or function (`function:<name>`),
+            paid for while idle; the first requests to a group without any
+            wait for a cold start.
+        http_per_instance_concurrency (Optional[int]): HTTP requests an
+            instance handles at once before the app scales out; None keeps
+            the default of the memory size.
+    """
+
+    instance_memory_mb: int = 2048
+    maximum_instance_count: int = 100
+    always_ready: dict[str, int] = field(default_factory=dict)
+    http_per_instance_concurrency: Optional[int] = None
+
+
+FLEX_SCALE_PROFILES: dict[str, FlexScale] = {
+    # Scale from zero; every trigger group cold starts.
+    "default": FlexScale(),
+    # Small and capped, for stacks nobody waits on.
+    "dev": FlexScale(instance_memory_mb=512, maximum_instance_count=10),
+    # Two warm HTTP instances take the first requests without a cold
+    # start; the rest scale out as usual.
+    "prod": FlexScale(
+        instance_memory_mb=2048,
+        maximum_instance_count=200,
+        always_ready={"http": 2},
+    ),
+}
+
+
+def validate_flex_scale(scale: FlexScale) -> list[str]:
+    """
+    Problems with Flex Consumption scale settings Azure rejects.
+
+    Args:
+        scale (FlexScale): The settings.
+
+    Returns:
+        list[str]: One message per problem, empty if the settings are legal.
+    """
+    problems = []
+    if scale.instance_memory_mb not in INSTANCE_MEMORY_SIZES_MB:
+        problems.append(
+            f"instance_memory_mb {scale.instance_memory_mb} is not one of "
+            f"{INSTANCE_MEMORY_SIZES_MB}"
+        )
+    if not (
+        MIN_MAXIMUM_INSTANCE_COUNT
+        <= scale.maximum_instance_count
+        <= MAX_MAXIMUM_INSTANCE_COUNT
+    ):
+        problems.append(
+            f"maximum_instance_count {scale.maximum_instance_count} is not "
+            f"within {MIN_MAXIMUM_INSTANCE_COUNT} to "
+            f"{MAX_MAXIMUM_INSTANCE_COUNT}"
+        )
+    # bool is an int, but `http: true` is not an instance count.
+    counts = {
+        group: count
+        for group, count in scale.always_ready.items()
+        if isinstance(count, int) and not isinstance(count, bool)
+    }
+    for group, count in scale.always_ready.items():
+        if group not in ALWAYS_READY_GROUPS and not (
+            group.startswith(FUNCTION_GROUP_PREFIX)
+            and len(group) > len(FUNCTION_GROUP_PREFIX)
+        ):
+            problems.append(
+                f"always ready group '{group}' is not one of "
+                f"{ALWAYS_READY_GROUPS} or '{FUNCTION_GROUP_PREFIX}<name>'"
+            )
+        if group not in counts or count < 0:
+            problems.append(
+                f"always ready group '{group}' has {count} instances, "
+                "expected a count of 0 or more"
+            )
+    ready = sum(count for count in counts.values() if count > 0)
+    if ready > scale.maximum_instance_count:
+        problems.append(
+            f"{ready} always ready instances exceed maximum_instance_count "
+            f"{scale.maximum_instance_count}"
+        )
+    concurrency = scale.http_per_instance_concurrency
+    if concurrency is not None and not (
+        1 <= concurrency <= MAX_HTTP_PER_INSTANCE_CONCURRENCY
+    ):
+        problems.append(
+            f"http_per_instance_concurrency {concurrency} is not within 1 to "
+            f"{MAX_HTTP_PER_INSTANCE_CONCURRENCY}"
+        )
+    return problems
+
+
+def flex_scale(
+    profile: str = "default", overrides: Optional[dict[str, Any]] = None
+) -> FlexScale:
+    """
+    The Flex Consumption scale settings of a profile, with overrides.
+
+    Args:
+        profile (str, optional): A key of `FLEX_SCALE_PROFILES`, e.g. the
+            environment. Defaults to "default".
+        overrides (Optional[dict[str, Any]], optional): `FlexScale` fields
+            replacing the profile's; `always_ready` replaces the whole
+            mapping.
+
+    Returns:
+        FlexScale: The validated settings.
+
+    Raises:
+        ValueError: If the profile or an override is unknown, or the
+            settings are not legal (see `validate_flex_scale`).
+    """
+    if profile not in FLEX_SCALE_PROFILES:
+        raise ValueError(
+            f"Unknown Flex scale profile '{profile}', expected one of "
+            f"{sorted(FLEX_SCALE_PROFILES)}"
+        )
+    overrides = overrides or {}
+    known = {f.name for f in fields(FlexScale)}
+    unknown = sorted(set(overrides) - known)
+    if unknown:
+        raise ValueError(
+            f"Unknown Flex scale settings {unknown}, expected some of "
+            f"{sorted(known)}"
+        )
+    scale = replace(FLEX_SCALE_PROFILES[profile], **overrides)
+    problems = validate_flex_scale(scale)
+    if problems:
+        raise ValueError(
+            f"Flex scale profile '{profile}': " + "; ".join(problems)
+        )
+    return scale
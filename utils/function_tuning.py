@@ -0,0 +1,342 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+import configs.generated.servicebus_pkl as psb
+from utils.servicebus_capacity import TARGET_UTILISATION
+
+# host.json overrides as app settings, `extensions.serviceBus.*` and
+# `extensions.queues.*`.
+SERVICEBUS_SETTING_PREFIX = "AzureFunctionsJobHost__extensions__serviceBus__"
+QUEUES_SETTING_PREFIX = "AzureFunctionsJobHost__extensions__queues__"
+# Defaults of Azure and the Service Bus extension, per instance core.
+DEFAULT_LOCK_DURATION = "PT1M"
+DEFAULT_MAX_DELIVERY_COUNT = 10
+DEFAULT_MAX_AUTO_LOCK_RENEWAL_SECONDS = 300
+# Assumed handler duration when the caller does not know better.
+DEFAULT_PROCESSING_SECONDS = 1.0
+MAX_QUEUE_BATCH_SIZE = 32
+# Prefetched messages must be processed within this share of their lock.
+PREFETCH_LOCK_SHARE = 0.5
+PREFETCH_PER_CALL = 2
+# A lock expiring in the prefetch buffer costs a delivery; with fewer
+# deliveries than this prefetching dead-letters healthy messages.
+PREFETCH_MIN_DELIVERY_COUNT = 3
+
+_DURATION = re.compile(
+    r"P(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?"
+    r"(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?"
+)
+
+
+@dataclass
+class TriggerTuning:
+    """
+    Host concurrency of a function app's Service Bus and storage queue
+    triggers. None keeps the extension default.
+
+    Args:
+        max_concurrent_calls (Optional[int]): Service Bus messages handled
+            at once per instance.
+        prefetch_count (Optional[int]): Service Bus messages buffered per
+            receiver.
+        max_concurrent_sessions (Optional[int]): Service Bus sessions
+            handled at once per instance.
+        max_auto_lock_renewal_duration (Optional[str]): How long Service Bus
+            locks are renewed, as a TimeSpan.
+        batch_size (Optional[int]): Storage queue messages fetched at once.
+        new_batch_threshold (Optional[int]): In-flight storage queue
+            messages below which the next batch is fetched.
+        reasons (list[str]): How each value was sized.
+    """
+
+    max_concurrent_calls: Optional[int] = None
+    prefetch_count: Optional[int] = None
+    max_concurrent_sessions: Optional[int] = None
+    max_auto_lock_renewal_duration: Optional[str] = None
+    batch_size: Optional[int] = None
+    new_batch_threshold: Optional[int] = None
+    reasons: list[str] = field(default_factory=list)
+
+    def app_settings(self) -> dict[str, str]:
+        """
+        The tuned values as function app settings.
+
+        Returns:
+            dict[str, str]: App setting name to value.
+        """
+        settings = {
+            f"{SERVICEBUS_SETTING_PREFIX}maxConcurrentCalls": (
+                self.max_concurrent_calls
+            ),
+            f"{SERVICEBUS_SETTING_PREFIX}prefetchCount": self.prefetch_count,
+            f"{SERVICEBUS_SETTING_PREFIX}maxConcurrentSessions": (
+                self.max_concurrent_sessions
+            ),
+            f"{SERVICEBUS_SETTING_PREFIX}maxAutoLockRenewalDuration": (
+                self.max_auto_lock_renewal_duration
+            ),
+            f"{QUEUES_SETTING_PREFIX}batchSize": self.batch_size,
+            f"{QUEUES_SETTING_PREFIX}newBatchThreshold": (
+                self.new_batch_threshold
+            ),
+        }
+        return {
+            name: str(value)
+            for name, value in settings.items()
+            if value is not None
+        }
+
+
+@dataclass
+class _Consumer:
+    path: str
+    options: psb.QueueOptions | psb.SubscriptionOptions
+    messages_per_second: Optional[float]
+
+
+def tune_triggers(
+    namespaces: Iterable[psb.Namespace] = (),
+    storage_queues: Iterable[str] = (),
+    queue_messages_per_second: Optional[dict[str, float]] = None,
+    processing_seconds: float = DEFAULT_PROCESSING_SECONDS,
+    instances: int = 1,
+) -> TriggerTuning:
+    """
+    Sizes the trigger concurrency of a function app consuming every queue
+    and subscription of a Service Bus topology and the given storage queues.
+    The settings are host wide, so each is sized for its busiest or, for
+    the prefetch, most constrained entity.
+
+    Concurrency follows Little's law: an entity receiving `r` messages per
+    second, each handled in `processing_seconds`, needs `r *
+    processing_seconds` calls in flight, at `TARGET_UTILISATION`, shared
+    by `instances`. Service Bus rates come from the `loadHints` of queues
+    and of the topic a subscription belongs to; entities forwarding their
+    messages have no receivers and are skipped. Session entities handle
+    one message per session at a time and size `maxConcurrentSessions`
+    instead. The prefetch is only set along with `maxConcurrentCalls`; it
+    must drain within `PREFETCH_LOCK_SHARE` of the shortest `lockDuration`
+    and is off if any `maxDeliveryCount` is below
+    `PREFETCH_MIN_DELIVERY_COUNT`.
+
+    Args:
+        namespaces (Iterable[psb.Namespace], optional): The Pkl namespace
+            configs, regular or compact bindings.
+        storage_queues (Iterable[str], optional): Names of the storage
+            queues the app consumes.
+        queue_messages_per_second (Optional[dict[str, float]], optional):
+            Expected messages per second by storage queue name; queues
+            without an entry keep the default batching.
+        processing_seconds (float, optional): Expected handler duration.
+            Defaults to DEFAULT_PROCESSING_SECONDS.
+        instances (int, optional): Instances the app is expected to run
+            on under that load. Defaults to 1.
+
+    Returns:
+        TriggerTuning: The tuned values.
+
+    Raises:
+        ValueError: If processing_seconds or instances is not positive or a
+            lockDuration is not an ISO 8601 duration.
+    """
+    if processing_seconds <= 0:
+        raise ValueError(
+            f"processing_seconds must be positive, got {processing_seconds}"
+        )
+    if instances < 1:
+        raise ValueError(f"instances must be at least 1, got {instances}")
+    tuning = TriggerTuning()
+    consumers = [
+        consumer
+        for namespace in namespaces
+        for consumer in _consumers(namespace)
+    ]
+    if consumers:
+        _tune_servicebus(tuning, consumers, processing_seconds, instances)
+    rates = queue_messages_per_second or {}
+    hinted = {name: rates[name] for name in storage_queues if name in rates}
+    if hinted:
+        _tune_queues(tuning, hinted, processing_seconds, instances)
+    return tuning
+
+
+def _consumers(namespace: psb.Namespace) -> list[_Consumer]:
+    ns = namespace.namePrefix
+    consumers = [
+        _Consumer(
+            f"{ns}/{queue.name}",
+            queue.options,
+            queue.loadHints.messagesPerSecond if queue.loadHints else None,
+        )
+        for queue in namespace.queues or ()
+    ]
+    for topic in namespace.topics or ():
+        subscriptions = list(topic.subscriptions or ())
+        rate = None
+        if topic.loadHints and subscriptions:
+            hints = topic.loadHints
+            fan_out = (
+                hints.fanOut if hints.fanOut is not None else len(subscriptions)
+            )
+            # Each subscription gets its share of the deliveries.
+            rate = hints.messagesPerSecond * fan_out / len(subscriptions)
+        consumers += [
+            _Consumer(
+                f"{ns}/{topic.name}/{subscription.name}",
+                subscription.options,
+                rate,
+            )
+            for subscription in subscriptions
+        ]
+    return [
+        consumer
+        for consumer in consumers
+        if consumer.options is None or consumer.options.forwardTo is None
+    ]
+
+
+def _concurrency(
+    messages_per_second: float, processing_seconds: float, instances: int
+) -> int:
+    """
+    Calls in flight per instance, by Little's law.
+    """
+    return max(
+        math.ceil(
+            messages_per_second
+            * processing_seconds
+            / (TARGET_UTILISATION * instances)
+        ),
+        1,
+    )
+
+
+def _busiest(
+    consumers: list[_Consumer], processing_seconds: float, instances: int
+) -> Optional[tuple[int, _Consumer]]:
+    sized = [
+        (
+            _concurrency(
+                consumer.messages_per_second, processing_seconds, instances
+            ),
+            consumer,
+        )
+        for consumer in consumers
+        if consumer.messages_per_second is not None
+    ]
+    return max(sized, key=lambda item: item[0], default=None)
+
+
+def _tune_servicebus(
+    tuning: TriggerTuning,
+    consumers: list[_Consumer],
+    processing_seconds: float,
+    instances: int,
+) -> None:
+    sessions = [
+        consumer
+        for consumer in consumers
+        if consumer.options is not None and consumer.options.requiresSession
+    ]
+    calls = _busiest(
+        [consumer for consumer in consumers if consumer not in sessions],
+        processing_seconds,
+        instances,
+    )
+    if calls:
+        tuning.max_concurrent_calls, consumer = calls
+        tuning.reasons.append(
+            f"maxConcurrentCalls {calls[0]}: {consumer.path} receives "
+            f"{consumer.messages_per_second:g} msg/s"
+        )
+    busiest_sessions = _busiest(sessions, processing_seconds, instances)
+    if busiest_sessions:
+        tuning.max_concurrent_sessions, consumer = busiest_sessions
+        tuning.reasons.append(
+            f"maxConcurrentSessions {busiest_sessions[0]}: {consumer.path} "
+            f"receives {consumer.messages_per_second:g} msg/s"
+        )
+
+    # The prefetch is sized from maxConcurrentCalls; without load hints
+    # sizing those it keeps its default.
+    if tuning.max_concurrent_calls is not None:
+        _tune_prefetch(tuning, consumers, processing_seconds)
+
+    if processing_seconds * 2 > DEFAULT_MAX_AUTO_LOCK_RENEWAL_SECONDS:
+        renewal = math.ceil(processing_seconds * 2)
+        tuning.max_auto_lock_renewal_duration = (
+            f"{renewal // 3600:02d}:{renewal % 3600 // 60:02d}:"
+            f"{renewal % 60:02d}"
+        )
+        tuning.reasons.append(
+            "maxAutoLockRenewalDuration "
+            f"{tuning.max_auto_lock_renewal_duration}: twice the "
+            "processing time"
+        )
+
+
+def _tune_prefetch(
+    tuning: TriggerTuning,
+    consumers: list[_Consumer],
+    processing_seconds: float,
+) -> None:
+    # Every receiver shares the prefetch, so the tightest entity bounds it.
+    in_flight = tuning.max_concurrent_calls
+    prefetch = in_flight * PREFETCH_PER_CALL
+    limit = f"{PREFETCH_PER_CALL} per concurrent call"
+    for consumer in consumers:
+        options = consumer.options
+        delivery_count = (
+            options.maxDeliveryCount if options else None
+        ) or DEFAULT_MAX_DELIVERY_COUNT
+        if delivery_count < PREFETCH_MIN_DELIVERY_COUNT:
+            prefetch = 0
+            limit = f"{consumer.path} maxDeliveryCount {delivery_count}"
+            break
+        lock = (options.lockDuration if options else None) or (
+            DEFAULT_LOCK_DURATION
+        )
+        # The last buffered message waits for the buffer to drain.
+        drained = math.floor(
+            in_flight
+            * (_seconds(lock) * PREFETCH_LOCK_SHARE / processing_seconds - 1)
+        )
+        if drained < prefetch:
+            prefetch = max(drained, 0)
+            limit = f"{consumer.path} lockDuration {lock}"
+    tuning.prefetch_count = prefetch
+    tuning.reasons.append(f"prefetchCount {prefetch}: bounded by {limit}")
+
+
+def _tune_queues(
+    tuning: TriggerTuning,
+    rates: dict[str, float],
+    processing_seconds: float,
+    instances: int,
+) -> None:
+    name, rate = max(rates.items(), key=lambda item: item[1])
+    # A queue has up to batchSize + newBatchThreshold messages in flight.
+    in_flight = _concurrency(rate, processing_seconds, instances)
+    tuning.batch_size = min(math.ceil(in_flight / 2), MAX_QUEUE_BATCH_SIZE)
+    tuning.new_batch_threshold = max(in_flight - tuning.batch_size, 0)
+    tuning.reasons.append(
+        f"batchSize {tuning.batch_size}, newBatchThreshold "
+        f"{tuning.new_batch_threshold}: storage queue {name} receives "
+        f"{rate:g} msg/s"
+    )
+
+
+def _seconds(duration: str) -> float:
+    match = _DURATION.fullmatch(duration)
+    if not match or duration in ("P", "PT") or duration.endswith("T"):
+        raise ValueError(f"'{duration}' is not an ISO 8601 duration")
+    parts = {key: float(value or 0) for key, value in match.groupdict().items()}
+    return (
+        parts["days"] * 86400
+        + parts["hours"] * 3600
+        + parts["minutes"] * 60
+        + parts["seconds"]
+    )
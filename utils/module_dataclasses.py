@@ -1,29 +1,161 @@
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Iterator, Optional
 from pulumi import Input, Output
 
+import configs.generated.eventgrid_pkl as peg
 import configs.generated.servicebus_pkl as psb
 
+if TYPE_CHECKING:
+    from modules.messaging import ServiceBus
+    from modules.storage import StorageChain
+
+
+SecretIndexKey = tuple[str, Optional[str], str]
+SERVICEBUS_DEPLOYMENT_MODES = ("resources", "template")
+SERVICEBUS_CAPACITY_PLANNING_MODES = ("off", "warn", "enforce")
+
+
+class LazySecrets(MutableMapping[str, Input[str]]):
+    """
+    Secrets mapping whose values are produced on first read.
+
+    `defer` registers a factory instead of a value; the factory runs, and its
+    result is wrapped in `Output.secret`, only when the secret is read or
+    exported. Secrets produced by the same invoke should share a memoized
+    factory so that it runs at most once. Iterating the names, `in` and
+    `len` never run a factory, while `items()`, `values()` and `dict(...)`
+    read and therefore resolve every secret.
+
+    Attributes:
+        index (dict[SecretIndexKey, list[str]]): Secret names by their
+            (namespace, entity, rule) origin; entity is None for
+            namespace-level secrets.
+    """
+
+    def __init__(self):
+        self.index: dict[SecretIndexKey, list[str]] = {}
+        # Insertion ordered names, resolved or not.
+        self.__names: dict[str, None] = {}
+        self.__values: dict[str, Input[str]] = {}
+        self.__factories: dict[str, Callable[[], Input[str]]] = {}
+
+    def defer(
+        self,
+        name: str,
+        factory: Callable[[], Input[str]],
+        index_key: Optional[SecretIndexKey] = None,
+    ) -> None:
+        """
+        Registers a secret produced by `factory` on first read.
+
+        Args:
+            name (str): The secret name.
+            factory (Callable[[], Input[str]]): Produces the secret value.
+            index_key (Optional[SecretIndexKey]): The (namespace, entity,
+                rule) the secret belongs to.
+
+        Raises:
+            ValueError: If a secret of that name is already registered.
+        """
+        if name in self.__names:
+            raise ValueError(
+                f"Secret '{name}' is already registered; secret names must "
+                "be unique"
+            )
+        self.__factories[name] = factory
+        self.__names[name] = None
+        if index_key is not None:
+            self.index.setdefault(index_key, []).append(name)
+
+    def select(self, pattern: str) -> dict[str, Input[str]]:
+        """
+        Resolves and returns only the secrets whose name contains `pattern`.
+        """
+        return {name: self[name] for name in self if pattern in name}
+
+    def lookup(
+        self,
+        namespace: Optional[str] = None,
+        entity: Optional[str] = None,
+        rule: Optional[str] = None,
+    ) -> list[str]:
+        """
+        Returns the names of the secrets matching every given part of the
+        (namespace, entity, rule) index, without resolving them.
+        """
+        return [
+            name
+            for (ns, ent, rl), names in self.index.items()
+            if namespace in (None, ns)
+            and entity in (None, ent)
+            and rule in (None, rl)
+            for name in names
+        ]
+
+    @property
+    def resolved(self) -> list[str]:
+        """
+        Names of the secrets whose factory has run.
+        """
+        return list(self.__values)
+
+    def __getitem__(self, name: str) -> Input[str]:
+        if name not in self.__values:
+            factory = self.__factories.pop(name)
+            value = factory()
+            self.__values[name] = (
+                value if isinstance(value, Output) else Output.secret(value)
+            )
+        return self.__values[name]
+
+    def __setitem__(self, name: str, value: Input[str]) -> None:
+        self.__factories.pop(name, None)
+        self.__values[name] = (
+            value if isinstance(value, Output) else Output.secret(value)
+        )
+        self.__names[name] = None
+
+    def __delitem__(self, name: str) -> None:
+        del self.__names[name]
+        self.__factories.pop(name, None)
+        self.__values.pop(name, None)
+        for names in self.index.values():
+            if name in names:
+                names.remove(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.__names))
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.__names
+
 
 @dataclass
 class SecretsObject:
     """
     Dataclass to hold the secrets for the Azure Keyvault.
     Args:
-        secrets (dict[str, Input[str]]): The secrets to store in the Azure
-            Keyvault.
+        secrets (dict[str, Input[str]] | LazySecrets): The secrets to store
+            in the Azure Keyvault.
         origin (str): The origin of the secrets.
         purpose (str): The purpose of the secrets.
         custom_tags (dict[str, str], optional): Custom tags to add to the
             secrets. Defaults to {}.
     """
 
-    secrets: dict[str, Input[str]]
+    secrets: dict[str, Input[str]] | LazySecrets
     origin: str
     purpose: str
     custom_tags: Optional[dict[str, str]] = field(default_factory=dict)
 
     def __post_init__(self):
+        # LazySecrets wraps each value when it is resolved.
+        if isinstance(self.secrets, LazySecrets):
+            return
         for key, value in self.secrets.items():
             if not isinstance(value, Output):
                 self.secrets[key] = Output.secret(value)
@@ -41,6 +173,27 @@ class ServiceBusArgs:
         resource_group (Output[str]): The name of the resource group the Azure
             Service Bus Namespace is in.
         tags (dict): Tags to add to the Azure Service Bus Namespace
+        validate (bool, optional): Check pkl_configs with
+            `utils.servicebus_validation` before registering any resource.
+            Defaults to True.
+        deployment_mode (str, optional): "resources" registers every
+            entity as its own Pulumi resource; "template" deploys each
+            namespace's whole topology as ARM template deployments.
+            Defaults to "resources".
+        legacy_aliases (bool, optional): Alias every resource to the flat
+            name and parent it had before namespaces and topics became
+            child components, so stacks deployed with the flat layout update
+            in place. Defaults to True.
+        rewrite_sql_filters (bool, optional): Create subscription rules
+            whose SQL filter is a conjunction of equalities as the
+            equivalent, cheaper to evaluate correlation filter, see
+            `utils.servicebus_filters`. Only applies to the "resources"
+            deployment mode. Defaults to False.
+        capacity_planning (str, optional): Compare the SKU of every
+            namespace with the load estimated from its entities' load
+            hints, see `utils.servicebus_capacity`: "off", "warn" logs
+            every finding, "enforce" raises on any finding before
+            registering resources. Defaults to "off".
 
     """
 
@@ -48,3 +201,59 @@ class ServiceBusArgs:
     pkl_configs: list[psb.Namespace]
     resource_group_name: Output[str]
     tags: dict[str, str]
+    validate: bool = True
+    deployment_mode: str = "resources"
+    legacy_aliases: bool = True
+    rewrite_sql_filters: bool = False
+    capacity_planning: str = "off"
+
+    def __post_init__(self):
+        if self.deployment_mode not in SERVICEBUS_DEPLOYMENT_MODES:
+            raise ValueError(
+                f"Invalid deployment_mode: {self.deployment_mode}. "
+                f"Expected one of {SERVICEBUS_DEPLOYMENT_MODES}"
+            )
+        if self.capacity_planning not in SERVICEBUS_CAPACITY_PLANNING_MODES:
+            raise ValueError(
+                f"Invalid capacity_planning: {self.capacity_planning}. "
+                f"Expected one of {SERVICEBUS_CAPACITY_PLANNING_MODES}"
+            )
+
+
+@dataclass
+class EventGridArgs:
+    """
+    Dataclass to hold the arguments for routing storage account events with
+    Azure Event Grid.
+
+    Args:
+        location (str): The location of the system topics.
+        pkl_configs (list[peg.SystemTopic]): The Pkl system topic configs.
+        resource_group_name (Output[str]): The name of the resource group the
+            system topics, the storage accounts and the Service Bus
+            namespaces are in.
+        storage_chain (StorageChain): The storage accounts whose events are
+            routed; also holds the storage queue destinations and the dead
+            letter containers.
+        subscription_id (Input[str]): The Azure subscription, for the
+            Service Bus destination ids.
+        tags (dict): Tags to add to the system topics.
+        servicebus (Optional[ServiceBus], optional): The Service Bus the
+            ServiceBusQueue and ServiceBusTopic destinations are in.
+            Defaults to None.
+        function_app_id (Optional[Input[str]], optional): The function app
+            of AzureFunction destinations. Defaults to None.
+        validate (bool, optional): Check pkl_configs with
+            `utils.eventgrid_validation` before registering any resource.
+            Defaults to True.
+    """
+
+    location: str
+    pkl_configs: list[peg.SystemTopic]
+    resource_group_name: Output[str]
+    storage_chain: "StorageChain"
+    subscription_id: Input[str]
+    tags: dict[str, str]
+    servicebus: Optional["ServiceBus"] = None
+    function_app_id: Optional[Input[str]] = None
+    validate: bool = True
@@ -0,0 +1,246 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import pkl
+from pulumi import log
+
+CACHE_DIR_ENV = "PKL_CACHE_DIR"
+CACHE_DISABLE_ENV = "PKL_CACHE_DISABLE"
+CACHE_MAX_ENTRIES_ENV = "PKL_CACHE_MAX_ENTRIES"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "pulumi-azure" / "pkl"
+DEFAULT_MAX_ENTRIES = 64
+# Bump when the layout of cached entries changes.
+CACHE_FORMAT_VERSION = "1"
+
+# `amends`, `extends`, `import` and `import*` clauses referencing a module.
+_MODULE_REFERENCE = re.compile(
+    r'^\s*(?:amends|extends|import\*?)\s+"([^"]+)"', re.MULTILINE
+)
+
+
+@dataclass
+class CacheEvent:
+    """
+    Record of a single cache lookup.
+
+    Args:
+        pkl_config_file (str): The Pkl file that was loaded.
+        key (str): The content hash the file resolved to.
+        hit (bool): Whether the evaluated result was served from the cache.
+        seconds (float): Wall time spent producing the result.
+    """
+
+    pkl_config_file: str
+    key: str
+    hit: bool
+    seconds: float
+
+
+@dataclass
+class PklCache:
+    """
+    Content-addressed on-disk cache of evaluated Pkl modules.
+
+    Entries hold the evaluator's binary (msgpack) output, keyed by a hash of
+    the config file, every local module it amends, extends or imports and the
+    evaluator version. Hydrating the generated dataclasses from an entry does
+    not start the Pkl evaluator. The cache keeps at most `max_entries` entries
+    and evicts the least recently used ones.
+
+    Args:
+        cache_dir (Path): Directory holding the cache entries.
+        max_entries (int): Maximum number of entries kept on disk.
+        enabled (bool): When False every lookup is a miss and nothing is
+            written.
+    Attributes:
+        events (list[CacheEvent]): Hit/miss log of this cache instance.
+    """
+
+    cache_dir: Path = field(
+        default_factory=lambda: Path(
+            os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+        )
+    )
+    max_entries: int = field(
+        default_factory=lambda: int(
+            os.environ.get(CACHE_MAX_ENTRIES_ENV, DEFAULT_MAX_ENTRIES)
+        )
+    )
+    enabled: bool = field(
+        default_factory=lambda: os.environ.get(CACHE_DISABLE_ENV, "").lower()
+        not in ("1", "true", "yes")
+    )
+    events: list[CacheEvent] = field(default_factory=list)
+
+    def key(self, pkl_config_file: str) -> str:
+        """
+        Computes the cache key of a Pkl config file.
+
+        Args:
+            pkl_config_file (str): Path to the Pkl config file.
+
+        Returns:
+            str: Hex encoded sha256 digest.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"format={CACHE_FORMAT_VERSION}\n".encode())
+        digest.update(f"evaluator={evaluator_version()}\n".encode())
+        for reference, content in _module_closure(Path(pkl_config_file)):
+            digest.update(f"{reference}\n{len(content)}\n".encode())
+            digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the cached evaluator output for `key` and marks the entry as
+        recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[bytes]: The cached evaluator output or None on a miss.
+        """
+        if not self.enabled:
+            return None
+        entry = self.__entry_path(key)
+        try:
+            data = entry.read_bytes()
+        except FileNotFoundError:
+            return None
+        # The mtime is the LRU clock.
+        os.utime(entry)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Stores evaluator output under `key` and evicts the least recently
+        used entries above `max_entries`.
+
+        Args:
+            key (str): The cache key.
+            data (bytes): The evaluator output.
+        """
+        if not self.enabled:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see partial entries.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, self.__entry_path(key))
+        self.__evict()
+
+    def record(
+        self, pkl_config_file: str, key: str, hit: bool, seconds: float
+    ) -> None:
+        """
+        Records and reports the outcome of a lookup.
+
+        Args:
+            pkl_config_file (str): The Pkl file that was loaded.
+            key (str): The cache key of the file.
+            hit (bool): Whether the result was served from the cache.
+            seconds (float): Time spent loading this file alone.
+        """
+        event = CacheEvent(
+            pkl_config_file=pkl_config_file,
+            key=key,
+            hit=hit,
+            seconds=seconds,
+        )
+        self.events.append(event)
+        log.info(
+            f"pkl cache {'hit' if hit else 'miss'}: {pkl_config_file} "
+            f"[{key[:12]}] in {event.seconds * 1000:.1f} ms"
+        )
+
+    def clear(self) -> None:
+        """
+        Removes every cache entry.
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def __entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.msgpack"
+
+    def __evict(self) -> None:
+        entries = sorted(
+            self.cache_dir.glob("*.msgpack"),
+            key=lambda entry: entry.stat().st_mtime_ns,
+        )
+        for entry in entries[: max(len(entries) - self.max_entries, 0)]:
+            entry.unlink(missing_ok=True)
+
+
+def evaluator_version() -> str:
+    """
+    Identifies the Pkl evaluator without starting it.
+
+    The pkl-python version is combined with the name, size and modification
+    time of the `pkl` binary it would launch.
+
+    Returns:
+        str: The evaluator identity.
+    """
+    binary = shutil.which("pkl")
+    if binary is None:
+        bin_dir = Path(pkl.__file__).parent / "bin"
+        binaries = sorted(bin_dir.iterdir()) if bin_dir.is_dir() else []
+        binary = str(binaries[0]) if binaries else None
+    if binary is None:
+        return f"pkl-python={pkl.__version__};binary=none"
+    stat = Path(binary).stat()
+    return (
+        f"pkl-python={pkl.__version__};binary={Path(binary).name}:"
+        f"{stat.st_size}:{stat.st_mtime_ns}"
+    )
+
+
+def _module_closure(pkl_file: Path) -> list[tuple[str, bytes]]:
+    """
+    Collects the contents of a Pkl module and every local module it
+    references, in a deterministic depth first order.
+
+    Non-file references (`pkl:`, `package:`, `https:` ...) cannot be hashed
+    by content and contribute their URI instead; package URIs are versioned.
+
+    Args:
+        pkl_file (Path): The root Pkl module.
+
+    Returns:
+        list[tuple[str, bytes]]: (reference, content) pairs.
+    """
+    closure: list[tuple[str, bytes]] = []
+    seen: set[Path] = set()
+
+    def visit(reference: str, path: Path) -> None:
+        path = path.resolve()
+        if path in seen:
+            return
+        seen.add(path)
+        if not path.is_file():
+            # Left for the evaluator to report.
+            closure.append((reference, b""))
+            return
+        content = path.read_bytes()
+        closure.append((reference, content))
+        for target in _MODULE_REFERENCE.findall(content.decode()):
+            if target.startswith("file:"):
+                visit(target, Path(target.removeprefix("file://")))
+            elif ":" in target.split("/")[0]:
+                closure.append((target, b""))
+            elif any(char in target for char in "*[{"):
+                for match in sorted(path.parent.glob(target)):
+                    visit(str(match.relative_to(path.parent)), match)
+            else:
+                visit(target, path.parent / target)
+
+    visit(pkl_file.name, pkl_file)
+    return closure
@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+
+import configs.generated.servicebus_pkl as psb
+
+# Azure Monitor metrics of a Premium namespace, in percent.
+CPU_METRIC = "NamespaceCpuUsage"
+MEMORY_METRIC = "NamespaceMemoryUsage"
+METRIC_NAMESPACE = "microsoft.servicebus/namespaces"
+TIME_GRAIN = "PT1M"
+# Premium capacity only takes 1, 2, 4, 8 or 16 messaging units; this scale
+# type steps to the next of them.
+SCALE_TYPE = "ServiceAllowedNextValue"
+
+
+@dataclass(frozen=True)
+class ScaleRule:
+    """
+    One autoscale rule of a Premium namespace, independent of whether it is
+    deployed as a Pulumi resource or an ARM template.
+
+    Args:
+        metric_name (str): The namespace metric the rule watches.
+        operator (str): `GreaterThan` or `LessThan`.
+        threshold (int): Metric value in percent.
+        direction (str): `Increase` or `Decrease`.
+        time_window (str): ISO 8601 window the metric is averaged over.
+        cooldown (str): ISO 8601 wait after a scale action.
+    """
+
+    metric_name: str
+    operator: str
+    threshold: int
+    direction: str
+    time_window: str
+    cooldown: str
+
+
+def scale_rules(autoscale: psb.Autoscale) -> list[ScaleRule]:
+    """
+    Builds the scale out and scale in rules of an autoscale config. Azure
+    scales out when any scale out rule fires and in only when every scale
+    in rule does, so CPU and memory get a rule each.
+
+    Args:
+        autoscale (psb.Autoscale): The Pkl autoscale config.
+
+    Returns:
+        list[ScaleRule]: The rules, scale out first.
+    """
+    thresholds = [
+        (CPU_METRIC, autoscale.scaleOutCpuPercent, autoscale.scaleInCpuPercent),
+        (
+            MEMORY_METRIC,
+            autoscale.scaleOutMemoryPercent,
+            autoscale.scaleInMemoryPercent,
+        ),
+    ]
+    rules = [
+        ScaleRule(
+            metric_name=metric,
+            operator="GreaterThan",
+            threshold=out,
+            direction="Increase",
+            time_window=autoscale.timeWindow,
+            cooldown=autoscale.cooldown,
+        )
+        for metric, out, _ in thresholds
+        if out is not None
+    ]
+    rules += [
+        ScaleRule(
+            metric_name=metric,
+            operator="LessThan",
+            threshold=in_,
+            direction="Decrease",
+            time_window=autoscale.timeWindow,
+            cooldown=autoscale.cooldown,
+        )
+        for metric, _, in_ in thresholds
+        if in_ is not None
+    ]
+    return rules
@@ -0,0 +1,338 @@
+import math
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+import configs.generated.servicebus_pkl as psb
+from utils.servicebus_validation import PREMIUM_CAPACITIES, Violation
+
+# Credit based throttling of the Basic and Standard tiers: every data
+# operation costs one credit, per namespace and second.
+STANDARD_OPERATIONS_PER_SECOND = 1000
+# Basic and Standard bill every started 64 KB of a message as an operation.
+OPERATION_CHUNK_IN_KILOBYTES = 64
+STANDARD_MAX_MESSAGE_SIZE_IN_KILOBYTES = 256
+# Planning figures for one Premium messaging unit with ~1 KB messages.
+# Premium throughput depends on the workload; confirm with a load test.
+PREMIUM_OPERATIONS_PER_MESSAGING_UNIT = 4000
+PREMIUM_KILOBYTES_PER_SECOND_PER_MESSAGING_UNIT = 4096
+# Share of the capacity a plan may use, the rest absorbs bursts.
+TARGET_UTILISATION = 0.7
+# Extra broker work per message, relative to the operation it adds to:
+# duplicate detection looks every send up in its history, sessions lock
+# and renew a session per receive.
+DUPLICATE_DETECTION_OVERHEAD = 0.25
+SESSION_OVERHEAD = 0.25
+# A Standard entity using more than this share of the namespace's credits
+# should be partitioned.
+PARTITIONING_SHARE = 0.5
+
+
+@dataclass
+class EntityLoad:
+    """
+    Estimated load of a queue or topic with load hints.
+
+    Args:
+        path (str): `namespace/entity`.
+        kind (str): `queue` or `topic`.
+        operations_per_second (float): Sends, receives and completions,
+            including fan-out and overheads.
+        kilobytes_per_second (float): Message bytes sent and delivered.
+    """
+
+    path: str
+    kind: str
+    operations_per_second: float
+    kilobytes_per_second: float
+
+
+@dataclass
+class NamespaceCapacity:
+    """
+    The capacity plan of a namespace.
+
+    Args:
+        path (str): The namespace name.
+        sku (str): The configured SKU.
+        capacity (Optional[int]): The configured messaging units.
+        operations_per_second (float): Estimated operations of all entities.
+        kilobytes_per_second (float): Estimated bytes of all entities.
+        recommended_sku (str): The SKU the load needs.
+        recommended_capacity (Optional[int]): The Premium messaging units
+            the load needs, None below Premium.
+        entities (list[EntityLoad]): Per entity estimates.
+        findings (list[Violation]): Where the config does not fit the load.
+    """
+
+    path: str
+    sku: str
+    capacity: Optional[int]
+    operations_per_second: float
+    kilobytes_per_second: float
+    recommended_sku: str
+    recommended_capacity: Optional[int]
+    entities: list[EntityLoad] = field(default_factory=list)
+    findings: list[Violation] = field(default_factory=list)
+
+
+def plan_capacity(
+    namespaces: Iterable[psb.Namespace],
+) -> list[NamespaceCapacity]:
+    """
+    Estimates the broker operations and bytes per second each namespace
+    carries from the `loadHints` of its queues and topics, and compares
+    them with its SKU.
+
+    A queue message is sent once and received and completed once. A topic
+    message is sent once and received and completed by `fanOut`
+    subscriptions (default: all of them). Duplicate detection adds to the
+    sends, sessions to the receives. Entities without load hints count as
+    idle.
+
+    Works on the regular and the compact bindings alike.
+
+    Args:
+        namespaces (Iterable[psb.Namespace]): The Pkl namespace configs.
+
+    Returns:
+        list[NamespaceCapacity]: One plan per namespace.
+    """
+    return [_plan_namespace(namespace) for namespace in namespaces]
+
+
+def capacity_findings(
+    namespaces: Iterable[psb.Namespace],
+) -> list[Violation]:
+    """
+    Every finding of `plan_capacity`.
+
+    Args:
+        namespaces (Iterable[psb.Namespace]): The Pkl namespace configs.
+
+    Returns:
+        list[Violation]: The findings, empty if every namespace fits.
+    """
+    return [
+        finding
+        for plan in plan_capacity(namespaces)
+        for finding in plan.findings
+    ]
+
+
+def check_capacity(namespaces: Iterable[psb.Namespace]) -> None:
+    """
+    Raises if `plan_capacity` finds a namespace or entity that does not fit
+    its estimated load.
+
+    Args:
+        namespaces (Iterable[psb.Namespace]): The Pkl namespace configs.
+
+    Raises:
+        ValueError: Listing every finding.
+    """
+    findings = capacity_findings(namespaces)
+    if findings:
+        raise ValueError(
+            f"Service Bus capacity plan has {len(findings)} finding(s):\n"
+            + "\n".join(f"  {finding}" for finding in findings)
+        )
+
+
+def _plan_namespace(namespace: psb.Namespace) -> NamespaceCapacity:
+    path = str(namespace.namePrefix)
+    sku = namespace.options.sku
+    loads: list[tuple[psb.Queue | psb.Topic, EntityLoad]] = [
+        (queue, _queue_load(f"{path}/{queue.name}", queue))
+        for queue in namespace.queues or ()
+        if queue.loadHints
+    ] + [
+        (topic, _topic_load(f"{path}/{topic.name}", topic))
+        for topic in namespace.topics or ()
+        if topic.loadHints
+    ]
+    entities = [entity for _, entity in loads]
+    operations = sum(entity.operations_per_second for entity in entities)
+    kilobytes = sum(entity.kilobytes_per_second for entity in entities)
+    largest_message = max(
+        (config.loadHints.averageMessageSizeInKilobytes for config, _ in loads),
+        default=0,
+    )
+    standard_budget = STANDARD_OPERATIONS_PER_SECOND * TARGET_UTILISATION
+    units = _messaging_units(operations, kilobytes)
+
+    plan = NamespaceCapacity(
+        path=path,
+        sku=sku.name,
+        capacity=sku.capacity,
+        operations_per_second=round(operations, 1),
+        kilobytes_per_second=round(kilobytes, 1),
+        recommended_sku=sku.name,
+        recommended_capacity=None,
+        entities=entities,
+    )
+    fits_standard = (
+        operations <= standard_budget
+        and largest_message <= STANDARD_MAX_MESSAGE_SIZE_IN_KILOBYTES
+    )
+    if sku.name != "Premium" and fits_standard:
+        for config, entity in loads:
+            plan.findings += _partitioning_findings(
+                config, entity, standard_budget
+            )
+        return plan
+
+    plan.recommended_sku = "Premium"
+    plan.recommended_capacity = min(units, PREMIUM_CAPACITIES[-1])
+    if sku.name != "Premium":
+        reason = (
+            f"estimated {operations:.0f} operations/s exceed "
+            f"{TARGET_UTILISATION:.0%} of the {sku.name} tier's "
+            f"{STANDARD_OPERATIONS_PER_SECOND} credits/s"
+            if operations > standard_budget
+            else f"average message size {largest_message:g} KB exceeds the "
+            f"{sku.name} tier's {STANDARD_MAX_MESSAGE_SIZE_IN_KILOBYTES} KB"
+        )
+        plan.findings.append(
+            Violation(
+                path,
+                f"{reason}; use Premium with {plan.recommended_capacity} "
+                "messaging unit(s)",
+            )
+        )
+        for entity in entities:
+            if entity.operations_per_second > standard_budget:
+                plan.findings.append(
+                    Violation(
+                        entity.path,
+                        f"estimated {entity.operations_per_second:.0f} "
+                        f"operations/s will be throttled on {sku.name}",
+                    )
+                )
+    else:
+        # Autoscale can grow the namespace up to its maximum.
+        autoscale = namespace.options.autoscale
+        available, source = (
+            (autoscale.maximumCapacity, "autoscale maximum")
+            if autoscale
+            else (sku.capacity or 1, "capacity")
+        )
+        if available < plan.recommended_capacity:
+            plan.findings.append(
+                Violation(
+                    path,
+                    f"estimated {operations:.0f} operations/s and "
+                    f"{kilobytes:.0f} KB/s need {plan.recommended_capacity} "
+                    f"messaging unit(s), {source} is {available}",
+                )
+            )
+    if units > PREMIUM_CAPACITIES[-1]:
+        plan.findings.append(
+            Violation(
+                path,
+                f"load needs more than {PREMIUM_CAPACITIES[-1]} messaging "
+                "units; split the entities across namespaces",
+            )
+        )
+    return plan
+
+
+def _messaging_units(operations: float, kilobytes: float) -> int:
+    """
+    The smallest valid Premium capacity carrying the load at the target
+    utilisation, or the next power of two above the largest capacity.
+    """
+    needed = max(
+        operations
+        / (PREMIUM_OPERATIONS_PER_MESSAGING_UNIT * TARGET_UTILISATION),
+        kilobytes
+        / (
+            PREMIUM_KILOBYTES_PER_SECOND_PER_MESSAGING_UNIT * TARGET_UTILISATION
+        ),
+        1,
+    )
+    for capacity in PREMIUM_CAPACITIES:
+        if capacity >= needed:
+            return capacity
+    return 2 ** math.ceil(math.log2(needed))
+
+
+def _chunks(hints: psb.LoadHints) -> int:
+    return math.ceil(
+        hints.averageMessageSizeInKilobytes / OPERATION_CHUNK_IN_KILOBYTES
+    )
+
+
+def _sends(hints: psb.LoadHints, duplicate_detection: Optional[bool]) -> float:
+    overhead = DUPLICATE_DETECTION_OVERHEAD if duplicate_detection else 0
+    return hints.messagesPerSecond * _chunks(hints) * (1 + overhead)
+
+
+def _queue_load(path: str, queue: psb.Queue) -> EntityLoad:
+    hints = queue.loadHints
+    options = queue.options
+    overhead = SESSION_OVERHEAD if options.requiresSession else 0
+    # Receive and complete.
+    receives = hints.messagesPerSecond * _chunks(hints) * 2 * (1 + overhead)
+    return EntityLoad(
+        path=path,
+        kind="queue",
+        operations_per_second=round(
+            _sends(hints, options.requiresDuplicateDetection) + receives, 1
+        ),
+        kilobytes_per_second=round(
+            2 * hints.messagesPerSecond * hints.averageMessageSizeInKilobytes,
+            1,
+        ),
+    )
+
+
+def _topic_load(path: str, topic: psb.Topic) -> EntityLoad:
+    hints = topic.loadHints
+    subscriptions = list(topic.subscriptions or ())
+    fan_out = hints.fanOut if hints.fanOut is not None else len(subscriptions)
+    sessions = sum(
+        1
+        for subscription in subscriptions
+        if subscription.options.requiresSession
+    )
+    overhead = (
+        SESSION_OVERHEAD * sessions / len(subscriptions) if sessions else 0
+    )
+    deliveries = hints.messagesPerSecond * fan_out
+    # Every delivery is received and completed.
+    receives = deliveries * _chunks(hints) * 2 * (1 + overhead)
+    return EntityLoad(
+        path=path,
+        kind="topic",
+        operations_per_second=round(
+            _sends(hints, topic.options.requiresDuplicateDetection) + receives,
+            1,
+        ),
+        kilobytes_per_second=round(
+            (hints.messagesPerSecond + deliveries)
+            * hints.averageMessageSizeInKilobytes,
+            1,
+        ),
+    )
+
+
+def _partitioning_findings(
+    config: psb.Queue | psb.Topic, entity: EntityLoad, standard_budget: float
+) -> list[Violation]:
+    """
+    Partitioning recommendation for an entity carrying a large share of a
+    Basic or Standard namespace's credits.
+    """
+    if (
+        entity.operations_per_second <= standard_budget * PARTITIONING_SHARE
+        or config.options.enablePartitioning
+    ):
+        return []
+    return [
+        Violation(
+            entity.path,
+            f"estimated {entity.operations_per_second:.0f} operations/s "
+            f"use over {PARTITIONING_SHARE:.0%} of the namespace's credits; "
+            "set enablePartitioning",
+        )
+    ]
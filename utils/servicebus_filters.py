@@ -0,0 +1,199 @@
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+import configs.generated.servicebus_pkl as psb
+
+# SQL filter system properties and the correlation filter fields matching
+# them exactly.
+SYSTEM_PROPERTIES: dict[str, str] = {
+    "ContentType": "contentType",
+    "CorrelationId": "correlationId",
+    "Label": "label",
+    "MessageId": "messageId",
+    "ReplyTo": "replyTo",
+    "ReplyToSessionId": "replyToSessionId",
+    "SessionId": "sessionId",
+    "To": "to",
+}
+
+_KEYWORDS = frozenset(
+    {"AND", "OR", "NOT", "IS", "NULL", "LIKE", "IN", "EXISTS", "TRUE", "FALSE"}
+)
+
+_TOKENS = re.compile(
+    r"\s*(?:"
+    r"(?P<string>'(?:[^']|'')*')"
+    r"|(?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)?)"
+    r"|(?P<symbol>[=()])"
+    r")"
+)
+
+
+@dataclass
+class FilterRewrite:
+    """
+    A subscription rule whose SQL filter was replaced by an equivalent
+    correlation filter.
+
+    Args:
+        path (str): `namespace/topic/subscription/rule`.
+        sql_expression (str): The original SQL expression.
+        correlation_filter (psb.RuleCorrelationFilter): Its replacement.
+    """
+
+    path: str
+    sql_expression: str
+    correlation_filter: psb.RuleCorrelationFilter
+
+    def __str__(self) -> str:
+        fields = {
+            name: value
+            for name, value in vars(self.correlation_filter).items()
+            if value is not None
+        }
+        return (
+            f"{self.path}: SqlFilter {self.sql_expression!r} -> "
+            f"CorrelationFilter {fields}"
+        )
+
+
+def rewrite_sql_filter(
+    rule: psb.SubscriptionRule,
+) -> Optional[psb.RuleCorrelationFilter]:
+    """
+    Returns the correlation filter equivalent to a rule's SQL filter, None
+    if the rule has no SQL filter or it is not a plain conjunction of
+    equalities.
+
+    Args:
+        rule (psb.SubscriptionRule): The Pkl subscription rule, regular or
+            compact bindings.
+
+    Returns:
+        Optional[psb.RuleCorrelationFilter]: The correlation filter.
+    """
+    sql = rule.sqlFilter
+    if (
+        rule.filterType != "SqlFilter"
+        or rule.correlationFilter is not None
+        or sql is None
+        or sql.sqlExpression is None
+        or sql.requiresPreprocessing
+        or sql.compatibilityLevel not in (None, 20)
+    ):
+        return None
+    return parse_correlation_filter(sql.sqlExpression)
+
+
+def parse_correlation_filter(
+    sql_expression: str,
+) -> Optional[psb.RuleCorrelationFilter]:
+    """
+    Parses a SQL filter expression made only of `property = 'literal'`
+    terms joined by AND, optionally parenthesised, into the correlation
+    filter matching the same messages.
+
+    Bare and `user.` names are user properties, `sys.` names the system
+    properties in `SYSTEM_PROPERTIES`. Anything else, including OR, NOT,
+    inequalities, numeric literals (a correlation filter only compares
+    strings), empty literals and two terms on the same property, is not
+    rewritten.
+
+    Args:
+        sql_expression (str): The SQL filter expression.
+
+    Returns:
+        Optional[psb.RuleCorrelationFilter]: The correlation filter, None if
+            the expression cannot be expressed as one.
+    """
+    tokens = _tokenize(sql_expression)
+    if tokens is None:
+        return None
+    terms: list[tuple[str, str]] = []
+    position = _conjunction(tokens, 0, terms)
+    if position != len(tokens) or not terms:
+        return None
+
+    fields: dict[str, Optional[str]] = dict.fromkeys(SYSTEM_PROPERTIES.values())
+    properties: dict[str, str] = {}
+    for name, value in terms:
+        scope, _, prop = name.rpartition(".")
+        if scope.lower() == "sys":
+            field = SYSTEM_PROPERTIES.get(prop)
+            if field is None or fields[field] is not None:
+                return None
+            fields[field] = value
+        elif scope.lower() in ("", "user"):
+            if prop in properties:
+                return None
+            properties[prop] = value
+        else:
+            return None
+    return psb.RuleCorrelationFilter(
+        properties=properties or None,
+        requiresPreprocessing=None,
+        **fields,
+    )
+
+
+def _tokenize(expression: str) -> Optional[list[tuple[str, str]]]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKENS.match(expression, position)
+        if match is None or match.end() == position:
+            return None
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+def _conjunction(
+    tokens: list[tuple[str, str]], position: int, terms: list[tuple[str, str]]
+) -> Optional[int]:
+    """
+    conjunction := term (AND term)*
+    """
+    position = _term(tokens, position, terms)
+    while (
+        position is not None
+        and position < len(tokens)
+        and tokens[position][0] == "name"
+        and tokens[position][1].upper() == "AND"
+    ):
+        position = _term(tokens, position + 1, terms)
+    return position
+
+
+def _term(
+    tokens: list[tuple[str, str]], position: int, terms: list[tuple[str, str]]
+) -> Optional[int]:
+    """
+    term := '(' conjunction ')' | name '=' string | string '=' name
+    """
+    if position is None or position >= len(tokens):
+        return None
+    if tokens[position] == ("symbol", "("):
+        position = _conjunction(tokens, position + 1, terms)
+        if position is None or position >= len(tokens):
+            return None
+        return position + 1 if tokens[position] == ("symbol", ")") else None
+
+    triple = tokens[position : position + 3]
+    if len(triple) != 3 or triple[1] != ("symbol", "="):
+        return None
+    (left_kind, left), _, (right_kind, right) = triple
+    if left_kind == "string" and right_kind == "name":
+        left_kind, left, right_kind, right = right_kind, right, left_kind, left
+    if left_kind != "name" or right_kind != "string":
+        return None
+    if left.upper() in _KEYWORDS:
+        return None
+    value = right[1:-1].replace("''", "'")
+    if not value:
+        return None
+    terms.append((left, value))
+    return position + 3
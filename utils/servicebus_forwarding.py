@@ -0,0 +1,374 @@
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import configs.generated.servicebus_pkl as psb
+
+# Azure dead-letters a message forwarded more than this many times.
+MAX_FORWARDING_HOPS = 4
+# Entities receiving forwarded messages from at least this many entities.
+HOT_SINK_FAN_IN = 5
+
+# Edge kinds. Deliveries from a topic to its subscriptions are not hops.
+FORWARD = "forward"
+DEAD_LETTER = "dead-letter"
+DELIVERY = "delivery"
+_HOPS = (FORWARD, DEAD_LETTER)
+
+
+@dataclass(frozen=True)
+class ForwardingEdge:
+    """
+    A path messages take from one entity to another.
+
+    Args:
+        source (str): Path of the sending entity.
+        target (str): Path of the receiving entity.
+        kind (str): `forward` (forwardTo), `dead-letter`
+            (forwardDeadLetteredMessagesTo) or `delivery` (topic to
+            subscription).
+    """
+
+    source: str
+    target: str
+    kind: str
+
+
+@dataclass(frozen=True)
+class DanglingTarget:
+    """
+    A forwarding option naming no queue or topic of the entity's namespace.
+
+    Args:
+        source (str): Path of the forwarding entity.
+        option (str): `forwardTo` or `forwardDeadLetteredMessagesTo`.
+        target (str): The configured target name.
+    """
+
+    source: str
+    option: str
+    target: str
+
+
+class ForwardingGraph:
+    """
+    Graph index of the forwarding paths of a Service Bus topology.
+
+    Nodes are queues, topics and subscriptions, keyed by their path
+    (`namespace/queue`, `namespace/topic/subscription`). Edges are
+    `forwardTo` and `forwardDeadLetteredMessagesTo` hops and the deliveries
+    of a topic to its subscriptions.
+
+    Args:
+        namespaces (Iterable[psb.Namespace]): The Pkl namespace configs,
+            regular or compact bindings.
+
+    Attributes:
+        kinds (dict[str, str]): Node path to `queue`, `topic` or
+            `subscription`.
+        edges (list[ForwardingEdge]): Every edge.
+        dangling (list[DanglingTarget]): Forwarding options whose target
+            does not exist.
+    """
+
+    def __init__(self, namespaces: Iterable[psb.Namespace]):
+        self.kinds: dict[str, str] = {}
+        self.edges: list[ForwardingEdge] = []
+        self.dangling: list[DanglingTarget] = []
+        for namespace in namespaces:
+            self.__add_namespace(namespace)
+
+        self.__successors: dict[str, list[ForwardingEdge]] = defaultdict(list)
+        self.__predecessors: dict[str, list[ForwardingEdge]] = defaultdict(list)
+        for edge in self.edges:
+            self.__successors[edge.source].append(edge)
+            self.__predecessors[edge.target].append(edge)
+        self.__cycles = self.__find_cycles()
+        self.__depths = self.__compute_depths()
+
+    def __add_namespace(self, namespace: psb.Namespace) -> None:
+        ns = str(namespace.namePrefix)
+        pending: list[tuple[str, Optional[object]]] = []
+        for queue in namespace.queues or ():
+            path = f"{ns}/{queue.name}"
+            self.kinds[path] = "queue"
+            pending.append((path, queue.options))
+        for topic in namespace.topics or ():
+            path = f"{ns}/{topic.name}"
+            self.kinds[path] = "topic"
+            for subscription in topic.subscriptions or ():
+                sub_path = f"{path}/{subscription.name}"
+                self.kinds[sub_path] = "subscription"
+                self.edges.append(ForwardingEdge(path, sub_path, DELIVERY))
+                pending.append((sub_path, subscription.options))
+
+        # Targets are queue or topic names of the same namespace.
+        for path, options in pending:
+            if options is None:
+                continue
+            for option, kind in (
+                ("forwardTo", FORWARD),
+                ("forwardDeadLetteredMessagesTo", DEAD_LETTER),
+            ):
+                target = getattr(options, option)
+                if target is None:
+                    continue
+                target_path = f"{ns}/{target}"
+                if self.kinds.get(target_path) in ("queue", "topic"):
+                    self.edges.append(ForwardingEdge(path, target_path, kind))
+                else:
+                    self.dangling.append(DanglingTarget(path, option, target))
+
+    def __find_cycles(self) -> list[list[str]]:
+        """
+        Strongly connected components with a loop, by an iterative Tarjan
+        walk so long chains do not hit the recursion limit.
+        """
+        index: dict[str, int] = {}
+        low: dict[str, int] = {}
+        stack: list[str] = []
+        on_stack: set[str] = set()
+        cycles: list[list[str]] = []
+        counter = 0
+        for root in self.kinds:
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, position = work.pop()
+                if position == 0:
+                    index[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                successors = self.__successors[node]
+                if position < len(successors):
+                    work.append((node, position + 1))
+                    target = successors[position].target
+                    if target not in index:
+                        work.append((target, 0))
+                    elif target in on_stack:
+                        low[node] = min(low[node], index[target])
+                    continue
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    looping = len(component) > 1 or any(
+                        edge.target == node for edge in successors
+                    )
+                    if looping:
+                        cycles.append(sorted(component))
+        return cycles
+
+    def __compute_depths(self) -> dict[str, Optional[int]]:
+        """
+        The most forwarding hops a message entering each node can take,
+        None if it can reach a cycle.
+        """
+        cyclic = {node for cycle in self.__cycles for node in cycle}
+        depths: dict[str, Optional[int]] = {}
+        for root in self.kinds:
+            if root in depths:
+                continue
+            work = [(root, False)]
+            while work:
+                node, expanded = work.pop()
+                if node in depths:
+                    continue
+                if node in cyclic:
+                    depths[node] = None
+                    continue
+                successors = self.__successors[node]
+                if not expanded:
+                    work.append((node, True))
+                    work.extend(
+                        (edge.target, False)
+                        for edge in successors
+                        if edge.target not in depths
+                    )
+                    continue
+                depth: Optional[int] = 0
+                for edge in successors:
+                    below = depths[edge.target]
+                    if below is None:
+                        depth = None
+                        break
+                    depth = max(depth, below + (edge.kind in _HOPS))
+                depths[node] = depth
+        return depths
+
+    @property
+    def cycles(self) -> list[list[str]]:
+        """
+        Groups of entities forwarding messages in a loop.
+        """
+        return self.__cycles
+
+    def depth(self, path: str) -> Optional[int]:
+        """
+        The most forwarding hops a message entering `path` takes, None if
+        it can loop forever.
+
+        Args:
+            path (str): The node path.
+
+        Returns:
+            Optional[int]: The depth.
+        """
+        return self.__depths[path]
+
+    def fan_in(self, path: str) -> int:
+        """
+        The number of entities forwarding directly into `path`.
+        """
+        return len(
+            {
+                edge.source
+                for edge in self.__predecessors[path]
+                if edge.kind in _HOPS
+            }
+        )
+
+    def upstream(self, path: str) -> int:
+        """
+        The number of entities whose messages can reach `path`.
+        """
+        seen = {path}
+        work = [path]
+        while work:
+            for edge in self.__predecessors[work.pop()]:
+                if edge.source not in seen:
+                    seen.add(edge.source)
+                    work.append(edge.source)
+        return len(seen) - 1
+
+    def too_deep(self, max_hops: int = MAX_FORWARDING_HOPS) -> dict[str, int]:
+        """
+        Queues and topics from which a message can be forwarded more than
+        `max_hops` times.
+
+        Args:
+            max_hops (int): The hop limit.
+
+        Returns:
+            dict[str, int]: Path to depth.
+        """
+        return {
+            path: depth
+            for path, depth in self.__depths.items()
+            if self.kinds[path] != "subscription"
+            and depth is not None
+            and depth > max_hops
+        }
+
+    def hot_sinks(self, min_fan_in: int = HOT_SINK_FAN_IN) -> dict[str, int]:
+        """
+        Entities receiving forwarded messages from at least `min_fan_in`
+        entities, busiest first.
+
+        Args:
+            min_fan_in (int): The fan-in threshold.
+
+        Returns:
+            dict[str, int]: Path to fan-in.
+        """
+        fan_ins = {path: self.fan_in(path) for path in self.__predecessors}
+        return dict(
+            sorted(
+                (
+                    (path, fan_in)
+                    for path, fan_in in fan_ins.items()
+                    if fan_in >= min_fan_in
+                ),
+                key=lambda item: (-item[1], item[0]),
+            )
+        )
+
+    def to_json(self, min_fan_in: int = HOT_SINK_FAN_IN) -> str:
+        """
+        Renders the graph and its findings as JSON.
+        """
+        hot = self.hot_sinks(min_fan_in)
+        return json.dumps(
+            {
+                "max_hops": MAX_FORWARDING_HOPS,
+                "nodes": [
+                    {
+                        "path": path,
+                        "kind": kind,
+                        "depth": self.__depths[path],
+                        "fan_in": self.fan_in(path),
+                        **(
+                            {"upstream": self.upstream(path)}
+                            if path in hot
+                            else {}
+                        ),
+                    }
+                    for path, kind in self.kinds.items()
+                ],
+                "edges": [vars(edge) for edge in self.edges],
+                "cycles": self.__cycles,
+                "too_deep": self.too_deep(),
+                "dangling": [vars(target) for target in self.dangling],
+                "hot_sinks": hot,
+            },
+            indent=2,
+        )
+
+    def to_dot(self, min_fan_in: int = HOT_SINK_FAN_IN) -> str:
+        """
+        Renders the graph as Graphviz DOT, one cluster per namespace.
+        Entities in cycles are red, entities over the hop limit orange and
+        hot sinks bold; dead-letter forwards are dashed and topic
+        deliveries dotted.
+        """
+        cyclic = {node for cycle in self.__cycles for node in cycle}
+        too_deep = self.too_deep()
+        hot = self.hot_sinks(min_fan_in)
+        shapes = {"queue": "box", "topic": "folder", "subscription": "ellipse"}
+        styles = {
+            FORWARD: "",
+            DEAD_LETTER: ' [style=dashed, label="DLQ"]',
+            DELIVERY: " [style=dotted, arrowhead=none]",
+        }
+
+        clusters: dict[str, list[str]] = defaultdict(list)
+        for path, kind in self.kinds.items():
+            attributes = [f"shape={shapes[kind]}"]
+            label = path.split("/", 1)[1]
+            depth = self.__depths[path]
+            if depth:
+                label += f"\\n{depth} hop(s)"
+            if path in cyclic:
+                attributes.append("color=red")
+            elif path in too_deep:
+                attributes.append("color=orange")
+            if path in hot:
+                label += f"\\nfan-in {hot[path]}"
+                attributes.append("penwidth=3")
+            attributes.insert(0, f'label="{label}"')
+            clusters[path.split("/", 1)[0]].append(
+                f'    "{path}" [{", ".join(attributes)}];'
+            )
+
+        lines = ["digraph servicebus {", "  rankdir=LR;"]
+        for index, (namespace, nodes) in enumerate(clusters.items()):
+            lines.append(f"  subgraph cluster_{index} {{")
+            lines.append(f'    label="{namespace}";')
+            lines += nodes
+            lines.append("  }")
+        for edge in self.edges:
+            lines.append(
+                f'  "{edge.source}" -> "{edge.target}"{styles[edge.kind]};'
+            )
+        lines.append("}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,566 @@
+import dataclasses
+import json
+import shlex
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import configs.generated.servicebus_pkl as psb
+from utils.module_dataclasses import SERVICEBUS_DEPLOYMENT_MODES
+from utils.servicebus_template import MAX_TEMPLATE_RESOURCES
+
+SNAPSHOT_VERSION = 1
+
+# Child lists are entities of their own and are diffed separately.
+_CHILDREN = ("authorizations", "queues", "topics", "subscriptions", "rules")
+# Planning inputs that are never deployed. An authorization rule deploys its
+# rights; the flags they default from are not stored by compact bindings.
+_NOT_DEPLOYED = ("loadHints", "listen", "send", "manage")
+
+# Settings Azure cannot change on an existing entity; changing them replaces
+# the entity, and with it every child the component parents to it.
+REPLACE_ON_CHANGE: dict[str, tuple[str, ...]] = {
+    "namespace": (
+        "options.premiumMessagingPartitions",
+        "options.zoneRedundant",
+    ),
+    "queue": (
+        "options.enablePartitioning",
+        "options.requiresDuplicateDetection",
+        "options.requiresSession",
+    ),
+    "topic": (
+        "options.enablePartitioning",
+        "options.requiresDuplicateDetection",
+    ),
+    "subscription": ("options.requiresSession",),
+}
+
+_TYPES = {
+    "namespace-component": "caregility:sbs:Namespace",
+    "topic-component": "caregility:sbs:Topic",
+    "namespace": "azure-native:servicebus:Namespace",
+    "autoscale": "azure-native:monitor:AutoscaleSetting",
+    "queue": "azure-native:servicebus:Queue",
+    "topic": "azure-native:servicebus:Topic",
+    "subscription": "azure-native:servicebus:Subscription",
+    "rule": "azure-native:servicebus:Rule",
+    "namespace-authorization": (
+        "azure-native:servicebus:NamespaceAuthorizationRule"
+    ),
+    "queue-authorization": "azure-native:servicebus:QueueAuthorizationRule",
+    "topic-authorization": "azure-native:servicebus:TopicAuthorizationRule",
+    "deployment": "azure-native:resources:Deployment",
+}
+
+
+@dataclass
+class ComponentUrn:
+    """
+    The URN of a deployed `ServiceBus` component, from which the URNs of the
+    resources it creates are derived.
+
+    Args:
+        urn (str): e.g. `urn:pulumi:dev::uber-demo::azure-native:resources:
+            ResourceGroup$caregility:sbs:ServiceBus::funcapp`, as listed by
+            `pulumi stack --show-urns`.
+    """
+
+    urn: str
+
+    def __post_init__(self):
+        parts = self.urn.split("::")
+        if len(parts) != 4 or not parts[2].endswith(
+            "caregility:sbs:ServiceBus"
+        ):
+            raise ValueError(f"Not a ServiceBus component URN: {self.urn}")
+        self.stack, self.project, self.qualified_type, _ = parts
+
+    def child(self, parent_types: list[str], type_: str, name: str) -> str:
+        """
+        Builds the URN of a resource parented (transitively) to the
+        component.
+
+        Args:
+            parent_types (list[str]): Types between the component and the
+                resource, outermost first.
+            type_ (str): The resource type.
+            name (str): The resource name.
+
+        Returns:
+            str: The resource URN.
+        """
+        qualified = "$".join([self.qualified_type, *parent_types, type_])
+        return f"{self.stack}::{self.project}::{qualified}::{name}"
+
+
+@dataclass
+class EntityChange:
+    """
+    A Service Bus entity that differs between two config snapshots.
+
+    Args:
+        kind (str): Entity kind, e.g. `queue` or `topic-authorization`.
+        path (str): Slash separated names leading to the entity.
+        urn (str): The URN `ServiceBus` registers the entity under; in
+            template mode the URN of the deployment applying it.
+        action (str): One of `create`, `update`, `replace` or `delete`, or
+            in template mode `orphan`: removed from the config, but left
+            in Azure because template deployments are incremental.
+        fields (list[str]): Dotted names of the changed settings.
+    """
+
+    kind: str
+    path: str
+    urn: str
+    action: str
+    fields: list[str] = field(default_factory=list)
+
+
+@dataclass
+class TargetPlan:
+    """
+    The minimal set of `pulumi up --target` URNs covering a config change.
+
+    Args:
+        changes (list[EntityChange]): Every changed entity.
+        targets (list[str]): URNs to pass as `--target`.
+        target_dependents (bool): Whether `--target-dependents` is needed
+            because an entity is replaced or deleted together with its
+            children.
+    """
+
+    changes: list[EntityChange]
+    targets: list[str]
+    target_dependents: bool
+
+    def command(self, stack: Optional[str] = None) -> Optional[str]:
+        """
+        Renders the `pulumi up` command line, None if nothing changed.
+
+        Args:
+            stack (Optional[str]): Stack to pass as `--stack`.
+
+        Returns:
+            Optional[str]: The command line.
+        """
+        if not self.targets:
+            return None
+        args = ["pulumi", "up"]
+        if stack:
+            args += ["--stack", stack]
+        for urn in self.targets:
+            args += ["--target", urn]
+        if self.target_dependents:
+            args.append("--target-dependents")
+        return shlex.join(args)
+
+    @property
+    def orphans(self) -> list[EntityChange]:
+        """
+        Entities a template mode update leaves behind in Azure; they have to
+        be deleted by hand.
+        """
+        return [change for change in self.changes if change.action == "orphan"]
+
+
+@dataclass
+class _Entity:
+    kind: str
+    path: str
+    urn: str
+    parent: Optional[str]
+    settings: dict[str, Any]
+
+
+def snapshot(namespaces: Iterable[psb.Namespace]) -> dict[str, Any]:
+    """
+    Converts evaluated namespace configs, regular or compact bindings, into a
+    JSON serialisable snapshot.
+
+    Args:
+        namespaces (Iterable[psb.Namespace]): The Pkl namespace configs.
+
+    Returns:
+        dict[str, Any]: The snapshot.
+    """
+    # The JSON round trip turns the compact bindings' tuples into lists.
+    return json.loads(
+        json.dumps(
+            {
+                "version": SNAPSHOT_VERSION,
+                "namespaces": [dataclasses.asdict(ns) for ns in namespaces],
+            }
+        )
+    )
+
+
+def save_snapshot(path: str, namespaces: Iterable[psb.Namespace]) -> None:
+    """
+    Writes the snapshot of `namespaces` to `path`.
+    """
+    Path(path).write_text(json.dumps(snapshot(namespaces), indent=1))
+
+
+def load_snapshot(path: str) -> dict[str, Any]:
+    """
+    Reads a snapshot written by `save_snapshot`.
+
+    Raises:
+        ValueError: If the snapshot has an unsupported version.
+    """
+    data = json.loads(Path(path).read_text())
+    if data.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot version {data.get('version')} in {path}"
+        )
+    return data
+
+
+def plan_targets(
+    previous: dict[str, Any],
+    current: dict[str, Any],
+    component_urn: str,
+    deployment_mode: str = "resources",
+    max_resources: int = MAX_TEMPLATE_RESOURCES,
+) -> TargetPlan:
+    """
+    Diffs two config snapshots and maps the changed entities to the URNs
+    `ServiceBus` creates them under.
+
+    Created and updated entities are targeted directly, including every
+    child of a created entity. An entity that is deleted, or whose change
+    Azure can only apply by replacing it, is targeted with
+    `--target-dependents` so that the children parented to it follow.
+
+    In template mode the entities are applied by the namespace's
+    `resources.Deployment` resources, so the deployments holding a changed
+    entity are targeted instead, together with the deployments an entity
+    moves between when an earlier one grows or shrinks. Only a deleted
+    namespace needs `--target-dependents`. Deployments are incremental, so
+    removed entities stay in Azure and are reported as `orphan` changes.
+
+    Args:
+        previous (dict[str, Any]): Snapshot of the deployed config.
+        current (dict[str, Any]): Snapshot of the new config.
+        component_urn (str): URN of the deployed `ServiceBus` component.
+        deployment_mode (str, optional): The component's
+            `ServiceBusArgs.deployment_mode`. Defaults to "resources".
+        max_resources (int, optional): Maximum resources per template in
+            template mode. Defaults to MAX_TEMPLATE_RESOURCES.
+
+    Returns:
+        TargetPlan: The targets.
+
+    Raises:
+        ValueError: If deployment_mode is unknown.
+    """
+    if deployment_mode not in SERVICEBUS_DEPLOYMENT_MODES:
+        raise ValueError(
+            f"Invalid deployment_mode: {deployment_mode}. "
+            f"Expected one of {SERVICEBUS_DEPLOYMENT_MODES}"
+        )
+    urn = ComponentUrn(component_urn)
+    if deployment_mode == "template":
+        before = _template_entities(previous["namespaces"], urn, max_resources)
+        after = _template_entities(current["namespaces"], urn, max_resources)
+    else:
+        before = _entities(previous["namespaces"], urn)
+        after = _entities(current["namespaces"], urn)
+
+    changes: list[EntityChange] = []
+    for key, entity in after.items():
+        old = before.get(key)
+        if old is None:
+            changes.append(
+                EntityChange(entity.kind, entity.path, entity.urn, "create")
+            )
+            continue
+        fields = _changed_fields(old.settings, entity.settings)
+        if fields:
+            replaced = set(fields) & set(REPLACE_ON_CHANGE.get(entity.kind, ()))
+            changes.append(
+                EntityChange(
+                    entity.kind,
+                    entity.path,
+                    entity.urn,
+                    "replace" if replaced else "update",
+                    fields,
+                )
+            )
+    for key, entity in before.items():
+        if key not in after:
+            # Pulumi deletes the namespace component and its deployments,
+            # not what they deployed.
+            orphaned = (
+                deployment_mode == "template"
+                and entity.kind != "namespace-component"
+            )
+            changes.append(
+                EntityChange(
+                    entity.kind,
+                    entity.path,
+                    entity.urn,
+                    "orphan" if orphaned else "delete",
+                )
+            )
+
+    # Children of a replaced or deleted entity follow it through
+    # --target-dependents. In template mode only namespace components have
+    # children: the deployments.
+    cascading = {
+        c.urn
+        for c in changes
+        if c.action in ("replace", "delete")
+        and (deployment_mode == "resources" or c.kind == "namespace-component")
+    }
+    parents = {
+        entity.urn: entity.parent
+        for entity in [*before.values(), *after.values()]
+    }
+    targets = [change.urn for change in changes]
+    if deployment_mode == "template":
+        # An unchanged entity pushed into another template changes both
+        # deployments; a deployment left empty is deleted.
+        for key, entity in after.items():
+            old = before.get(key)
+            if old is not None and old.urn != entity.urn:
+                targets += [old.urn, entity.urn]
+    targets = [
+        target
+        for target in targets
+        if not _has_ancestor(parents, target, cascading)
+    ]
+    return TargetPlan(
+        changes=changes,
+        targets=list(dict.fromkeys(targets)),
+        target_dependents=bool(cascading),
+    )
+
+
+def _has_ancestor(
+    parents: dict[str, Optional[str]], urn: str, ancestors: set[str]
+) -> bool:
+    parent = parents.get(urn)
+    while parent is not None:
+        if parent in ancestors:
+            return True
+        parent = parents.get(parent)
+    return False
+
+
+def _changed_fields(
+    old: dict[str, Any], new: dict[str, Any], prefix: str = ""
+) -> list[str]:
+    changed = []
+    for name in sorted(old.keys() | new.keys()):
+        a, b = old.get(name), new.get(name)
+        if isinstance(a, dict) and isinstance(b, dict):
+            changed += _changed_fields(a, b, f"{prefix}{name}.")
+        elif a != b:
+            changed.append(f"{prefix}{name}")
+    return changed
+
+
+def _settings(config: dict[str, Any]) -> dict[str, Any]:
+    return {
+        k: v
+        for k, v in config.items()
+        if k not in _CHILDREN and k not in _NOT_DEPLOYED
+    }
+
+
+def _entities(
+    namespaces: list[dict[str, Any]], urn: ComponentUrn
+) -> dict[tuple[str, str], _Entity]:
+    """
+    Flattens a snapshot into its entities keyed by (kind, path), with the
+    URNs matching the scoped resource names, child components and parents
+    used by `ServiceBus`.
+    """
+    entities: dict[tuple[str, str], _Entity] = {}
+
+    def add(
+        kind: str,
+        path: str,
+        parent: Optional[_Entity],
+        parent_types: list[str],
+        name: str,
+        config: dict[str, Any],
+    ) -> tuple[_Entity, list[str]]:
+        entity = _Entity(
+            kind=kind,
+            path=path,
+            urn=urn.child(parent_types, _TYPES[kind], name),
+            parent=parent.urn if parent else None,
+            settings=_settings(config),
+        )
+        entities[(kind, path)] = entity
+        return entity, [*parent_types, _TYPES[kind]]
+
+    def add_authorizations(
+        config: dict[str, Any],
+        kind: str,
+        parent: _Entity,
+        parent_types: list[str],
+        scope: str,
+    ) -> None:
+        for auth in config.get("authorizations") or ():
+            add(
+                f"{kind}-authorization",
+                f"{scope}/{auth['name']}",
+                parent,
+                parent_types,
+                f"{scope}/{auth['name']}-auth",
+                auth,
+            )
+
+    for ns in namespaces:
+        name = ns["namePrefix"]
+        # Components carry no settings: they are only created or deleted.
+        ns_component, component_types = add(
+            "namespace-component", name, None, [], name, {}
+        )
+        # The autoscale setting is its own resource; the namespace ignores
+        # the capacity it manages.
+        options = dict(ns.get("options") or {})
+        autoscale = options.pop("autoscale", None)
+        namespace, ns_types = add(
+            "namespace",
+            name,
+            ns_component,
+            component_types,
+            name,
+            {**ns, "options": options},
+        )
+        if autoscale:
+            add(
+                "autoscale",
+                name,
+                ns_component,
+                component_types,
+                f"{name}/autoscale",
+                autoscale,
+            )
+        add_authorizations(ns, "namespace", namespace, ns_types, name)
+        for q in ns.get("queues") or ():
+            path = f"{name}/{q['name']}"
+            queue, queue_types = add(
+                "queue", path, namespace, ns_types, f"{path}-queue", q
+            )
+            add_authorizations(q, "queue", queue, queue_types, path)
+        for t in ns.get("topics") or ():
+            path = f"{name}/{t['name']}"
+            topic_component, topic_component_types = add(
+                "topic-component",
+                path,
+                ns_component,
+                component_types,
+                path,
+                {},
+            )
+            topic, topic_types = add(
+                "topic",
+                path,
+                topic_component,
+                topic_component_types,
+                f"{path}-topic",
+                t,
+            )
+            add_authorizations(t, "topic", topic, topic_types, path)
+            for s in t.get("subscriptions") or ():
+                sub_path = f"{path}/{s['name']}"
+                sub, sub_types = add(
+                    "subscription",
+                    sub_path,
+                    topic,
+                    topic_types,
+                    f"{sub_path}-sub",
+                    s,
+                )
+                for r in s.get("rules") or ():
+                    rule_path = f"{sub_path}/{r['rule_name']}"
+                    add(
+                        "rule",
+                        rule_path,
+                        sub,
+                        sub_types,
+                        f"{rule_path}-rule",
+                        r,
+                    )
+    return entities
+
+
+def _template_entities(
+    namespaces: list[dict[str, Any]], urn: ComponentUrn, max_resources: int
+) -> dict[tuple[str, str], _Entity]:
+    """
+    Flattens a snapshot into the entities `ServiceBus` deploys in template
+    mode, keyed by (kind, path): the namespace components, and every entity
+    `compile_namespace` puts into a template with the URN of the
+    `<namespace>/deployment-<index>` resource applying it.
+    """
+    entities: dict[tuple[str, str], _Entity] = {}
+    component_type = _TYPES["namespace-component"]
+    for ns in namespaces:
+        name = ns["namePrefix"]
+        component = _Entity(
+            kind="namespace-component",
+            path=name,
+            urn=urn.child([], component_type, name),
+            parent=None,
+            settings={},
+        )
+        entities[("namespace-component", name)] = component
+        for position, (kind, path, config) in enumerate(_template_order(ns)):
+            entities[(kind, path)] = _Entity(
+                kind=kind,
+                path=path,
+                urn=urn.child(
+                    [component_type],
+                    _TYPES["deployment"],
+                    f"{name}/deployment-{position // max_resources}",
+                ),
+                parent=component.urn,
+                settings=_settings(config),
+            )
+    return entities
+
+
+def _template_order(
+    ns: dict[str, Any],
+) -> list[tuple[str, str, dict[str, Any]]]:
+    """
+    The (kind, path, config) of the entities of a namespace snapshot, in the
+    order `compile_namespace` emits them into templates.
+    """
+    name = ns["namePrefix"]
+
+    def authorizations(
+        config: dict[str, Any], kind: str, scope: str
+    ) -> list[tuple[str, str, dict[str, Any]]]:
+        return [
+            (f"{kind}-authorization", f"{scope}/{auth['name']}", auth)
+            for auth in config.get("authorizations") or ()
+        ]
+
+    options = dict(ns.get("options") or {})
+    autoscale = options.pop("autoscale", None)
+    order = [("namespace", name, {**ns, "options": options})]
+    if autoscale:
+        order.append(("autoscale", name, autoscale))
+    order += authorizations(ns, "namespace", name)
+    for t in ns.get("topics") or ():
+        path = f"{name}/{t['name']}"
+        order.append(("topic", path, t))
+        order += authorizations(t, "topic", path)
+        for s in t.get("subscriptions") or ():
+            sub_path = f"{path}/{s['name']}"
+            order.append(("subscription", sub_path, s))
+            for r in s.get("rules") or ():
+                order.append(("rule", f"{sub_path}/{r['rule_name']}", r))
+    for q in ns.get("queues") or ():
+        path = f"{name}/{q['name']}"
+        order.append(("queue", path, q))
+        order += authorizations(q, "queue", path)
+    return order
@@ -0,0 +1,350 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import configs.generated.servicebus_pkl as psb
+from utils.arg_mapping import QUEUE_ARGS, SUBSCRIPTION_ARGS, TOPIC_ARGS
+from utils.servicebus_autoscale import (
+    METRIC_NAMESPACE,
+    SCALE_TYPE,
+    TIME_GRAIN,
+    scale_rules,
+)
+
+ARM_TEMPLATE_SCHEMA = (
+    "https://schema.management.azure.com/schemas/2019-04-01/"
+    "deploymentTemplate.json#"
+)
+SERVICEBUS_API_VERSION = "2024-01-01"
+AUTOSCALE_API_VERSION = "2022-10-01"
+# ARM rejects templates with more than 800 resources.
+MAX_TEMPLATE_RESOURCES = 800
+
+_NAMESPACE = "Microsoft.ServiceBus/namespaces"
+_AUTOSCALE = "Microsoft.Insights/autoscalesettings"
+
+
+@dataclass
+class ArmAuthorization:
+    """
+    An authorization rule deployed by a template.
+
+    Args:
+        scope (str): `Namespace`, `Queue` or `Topic`.
+        namespace (str): The namespace name.
+        entity (Optional[str]): The queue or topic name, None for
+            namespace rules.
+        name (str): The authorization rule name.
+    """
+
+    scope: str
+    namespace: str
+    entity: Optional[str]
+    name: str
+
+
+@dataclass
+class ArmTemplate:
+    """
+    One ARM template deployment of a namespace's topology.
+
+    Args:
+        template (dict[str, Any]): The ARM template.
+        authorizations (list[ArmAuthorization]): The authorization rules it
+            deploys.
+    """
+
+    template: dict[str, Any]
+    authorizations: list[ArmAuthorization] = field(default_factory=list)
+
+
+@dataclass
+class _ArmResource:
+    type: str
+    names: tuple[str, ...]
+    body: dict[str, Any]
+    parent: Optional[tuple[str, tuple[str, ...]]] = None
+    authorization: Optional[ArmAuthorization] = None
+    api_version: str = SERVICEBUS_API_VERSION
+
+    @property
+    def key(self) -> tuple[str, tuple[str, ...]]:
+        return self.type, self.names
+
+
+def compile_namespace(
+    namespace: psb.Namespace,
+    location: str,
+    tags: dict[str, str],
+    max_resources: int = MAX_TEMPLATE_RESOURCES,
+) -> list[ArmTemplate]:
+    """
+    Compiles a Pkl namespace config into ARM templates creating the same
+    namespace, autoscale setting, queues, topics, subscriptions, rules and
+    authorization rules as the `ServiceBus` resource mode, with the same
+    settings.
+
+    Resources are emitted parents first and cut into templates of at most
+    `max_resources` resources. The templates must be deployed in order;
+    within a template ARM creates independent resources in parallel.
+
+    Args:
+        namespace (psb.Namespace): The Pkl namespace config.
+        location (str): The namespace location.
+        tags (dict[str, str]): Tags of the namespace.
+        max_resources (int): Maximum resources per template.
+
+    Returns:
+        list[ArmTemplate]: The templates, in deployment order.
+    """
+    arm_resources = _arm_resources(namespace, location, tags)
+    templates: list[ArmTemplate] = []
+    for start in range(0, len(arm_resources), max_resources):
+        chunk = arm_resources[start : start + max_resources]
+        in_chunk = {resource.key for resource in chunk}
+        template_resources = []
+        for resource in chunk:
+            body = {
+                "type": resource.type,
+                "apiVersion": resource.api_version,
+                "name": "/".join(resource.names),
+                **resource.body,
+            }
+            # Parents deployed by an earlier template already exist.
+            if resource.parent in in_chunk:
+                parent_type, parent_names = resource.parent
+                body["dependsOn"] = [_resource_id(parent_type, parent_names)]
+            template_resources.append(body)
+        templates.append(
+            ArmTemplate(
+                template={
+                    "$schema": ARM_TEMPLATE_SCHEMA,
+                    "contentVersion": "1.0.0.0",
+                    "resources": template_resources,
+                },
+                authorizations=[
+                    resource.authorization
+                    for resource in chunk
+                    if resource.authorization
+                ],
+            )
+        )
+    return templates
+
+
+def _arm_resources(
+    namespace: psb.Namespace, location: str, tags: dict[str, str]
+) -> list[_ArmResource]:
+    ns = namespace.namePrefix
+    options = namespace.options
+    sku = _properties(
+        name=options.sku.name,
+        tier=options.sku.tier,
+        capacity=options.autoscale.defaultCapacity
+        if options.autoscale
+        else options.sku.capacity,
+    )
+    root = _ArmResource(
+        type=_NAMESPACE,
+        names=(ns,),
+        body={
+            "location": location,
+            "tags": tags,
+            "sku": sku,
+            "properties": _properties(
+                alternateName=options.alternateName,
+                premiumMessagingPartitions=options.premiumMessagingPartitions,
+                publicNetworkAccess=options.publicNetworkAccess,
+                zoneRedundant=options.zoneRedundant,
+            ),
+        },
+    )
+    arm_resources = [root]
+    if options.autoscale:
+        arm_resources.append(
+            _autoscale(options.autoscale, root, location, tags)
+        )
+    arm_resources += _authorizations(
+        namespace.authorizations, "Namespace", root, ns, None
+    )
+
+    for topic in namespace.topics or ():
+        opts = topic.options
+        arm_topic = _ArmResource(
+            type=f"{_NAMESPACE}/topics",
+            names=(ns, topic.name),
+            parent=root.key,
+            body={"properties": _properties(**TOPIC_ARGS.properties(opts))},
+        )
+        arm_resources.append(arm_topic)
+        arm_resources += _authorizations(
+            topic.authorizations, "Topic", arm_topic, ns, topic.name
+        )
+        for subscription in topic.subscriptions or ():
+            opts = subscription.options
+            arm_sub = _ArmResource(
+                type=f"{_NAMESPACE}/topics/subscriptions",
+                names=(ns, topic.name, subscription.name),
+                parent=arm_topic.key,
+                body={
+                    "properties": _properties(
+                        **SUBSCRIPTION_ARGS.properties(opts)
+                    )
+                },
+            )
+            arm_resources.append(arm_sub)
+            for rule in subscription.rules or ():
+                arm_resources.append(
+                    _ArmResource(
+                        type=f"{_NAMESPACE}/topics/subscriptions/rules",
+                        names=(*arm_sub.names, rule.rule_name),
+                        parent=arm_sub.key,
+                        body={"properties": _rule_properties(rule)},
+                    )
+                )
+
+    for queue in namespace.queues or ():
+        opts = queue.options
+        arm_queue = _ArmResource(
+            type=f"{_NAMESPACE}/queues",
+            names=(ns, queue.name),
+            parent=root.key,
+            body={"properties": _properties(**QUEUE_ARGS.properties(opts))},
+        )
+        arm_resources.append(arm_queue)
+        arm_resources += _authorizations(
+            queue.authorizations, "Queue", arm_queue, ns, queue.name
+        )
+    return arm_resources
+
+
+def _autoscale(
+    autoscale: psb.Autoscale,
+    namespace: _ArmResource,
+    location: str,
+    tags: dict[str, str],
+) -> _ArmResource:
+    namespace_id = _resource_id(namespace.type, namespace.names)
+    rules = [
+        {
+            "metricTrigger": {
+                "metricName": rule.metric_name,
+                "metricNamespace": METRIC_NAMESPACE,
+                "metricResourceUri": namespace_id,
+                "operator": rule.operator,
+                "statistic": "Average",
+                "threshold": rule.threshold,
+                "timeAggregation": "Average",
+                "timeGrain": TIME_GRAIN,
+                "timeWindow": rule.time_window,
+            },
+            "scaleAction": {
+                "cooldown": rule.cooldown,
+                "direction": rule.direction,
+                "type": SCALE_TYPE,
+                "value": "1",
+            },
+        }
+        for rule in scale_rules(autoscale)
+    ]
+    return _ArmResource(
+        type=_AUTOSCALE,
+        names=(f"{namespace.names[0]}-autoscale",),
+        parent=namespace.key,
+        api_version=AUTOSCALE_API_VERSION,
+        body={
+            "location": location,
+            "tags": tags,
+            "properties": {
+                "enabled": True,
+                "targetResourceUri": namespace_id,
+                "profiles": [
+                    {
+                        "name": "messaging-units",
+                        "capacity": {
+                            "default": str(autoscale.defaultCapacity),
+                            "maximum": str(autoscale.maximumCapacity),
+                            "minimum": str(autoscale.minimumCapacity),
+                        },
+                        "rules": rules,
+                    }
+                ],
+            },
+        },
+    )
+
+
+def _authorizations(
+    authorizations: Optional[list[psb.AuthorizationRule]],
+    scope: str,
+    parent: _ArmResource,
+    namespace: str,
+    entity: Optional[str],
+) -> list[_ArmResource]:
+    return [
+        _ArmResource(
+            type=f"{parent.type}/authorizationRules",
+            names=(*parent.names, auth.name),
+            parent=parent.key,
+            body={"properties": {"rights": list(auth.rights)}},
+            authorization=ArmAuthorization(
+                scope=scope, namespace=namespace, entity=entity, name=auth.name
+            ),
+        )
+        for auth in authorizations or ()
+    ]
+
+
+def _rule_properties(rule: psb.SubscriptionRule) -> dict[str, Any]:
+    properties = _properties(filterType=rule.filterType)
+    if rule.action:
+        properties["action"] = _properties(
+            compatibilityLevel=rule.action.compatibilityLevel,
+            requiresPreprocessing=rule.action.requiresPreprocessing,
+            sqlExpression=rule.action.sqlExpression,
+        )
+    if rule.correlationFilter:
+        cf = rule.correlationFilter
+        properties["correlationFilter"] = _properties(
+            contentType=cf.contentType,
+            correlationId=cf.correlationId,
+            label=cf.label,
+            messageId=cf.messageId,
+            properties=dict(cf.properties) if cf.properties else None,
+            replyTo=cf.replyTo,
+            replyToSessionId=cf.replyToSessionId,
+            requiresPreprocessing=cf.requiresPreprocessing,
+            sessionId=cf.sessionId,
+            to=cf.to,
+        )
+    if rule.sqlFilter:
+        properties["sqlFilter"] = _properties(
+            compatibilityLevel=rule.sqlFilter.compatibilityLevel,
+            requiresPreprocessing=rule.sqlFilter.requiresPreprocessing,
+            sqlExpression=rule.sqlFilter.sqlExpression,
+        )
+    return properties
+
+
+def _properties(**properties: Any) -> dict[str, Any]:
+    """
+    Drops unset properties and escapes string values ARM would evaluate as
+    template expressions (`[...]`).
+    """
+    return {
+        name: _literal(value)
+        for name, value in properties.items()
+        if value is not None
+    }
+
+
+def _literal(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith("["):
+        return f"[{value}"
+    if isinstance(value, dict):
+        return {k: _literal(v) for k, v in value.items()}
+    return value
+
+
+def _resource_id(type_: str, names: tuple[str, ...]) -> str:
+    args = ", ".join(f"'{name}'" for name in names)
+    return f"[resourceId('{type_}', {args})]"
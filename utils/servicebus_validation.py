@@ -0,0 +1,661 @@
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import configs.generated.servicebus_pkl as psb
+from utils.servicebus_forwarding import MAX_FORWARDING_HOPS, ForwardingGraph
+
+# `LowerCaseConstraint`; Pkl's `matches` must match the whole string.
+_LOWER_CASE = re.compile(r"[a-z]+[\-a-z]*")
+
+SKU_NAMES = ("Basic", "Standard", "Premium")
+PREMIUM_CAPACITIES = (1, 2, 4, 8, 16)
+MAX_SIZES_IN_MEGABYTES = {
+    "Basic": (1024, 2048, 3072, 4096, 5120),
+    "Standard": (1024, 2048, 3072, 4096, 5120),
+    "Premium": (1024, 2048, 3072, 4096, 5120, 10240, 20480, 40960, 81920),
+}
+PREMIUM_MAX_MESSAGE_SIZE_IN_KILOBYTES = (1024, 102400)
+
+
+@dataclass(frozen=True)
+class NameRule:
+    """
+    Mirror of a `*Name` typealias of `servicebus-schema.pkl`.
+
+    Args:
+        min_length (int): Minimum name length.
+        max_length (int): Maximum name length.
+        forbidden (tuple[str, ...]): Substrings the name may not contain.
+    """
+
+    min_length: int
+    max_length: int
+    forbidden: tuple[str, ...]
+
+
+NAME_RULES: dict[str, NameRule] = {
+    "namespace": NameRule(6, 36, ("namespace",)),
+    "topic": NameRule(1, 260, ("topic",)),
+    "subscription": NameRule(1, 50, ("sub", "subscription")),
+    "queue": NameRule(1, 260, ("queue",)),
+    "authorization": NameRule(1, 50, ("auth", "authorization")),
+}
+
+
+# (scope, namespace, entity, rule) of an authorization rule; entity is None
+# for namespace rules.
+SecretKey = tuple[str, str, Optional[str], str]
+
+
+def authorization_secret_name(
+    scope: str, namespace: str, entity: Optional[str], rule: str
+) -> str:
+    """
+    The path scoped `servicebus_secrets` name of an authorization rule's
+    connection strings, before the `Primary` / `Secondary` suffix, e.g.
+    `FlashyOrdersOrdersReaderQueueConnectionString`. Only letters and
+    digits are kept, as Key Vault secret and app setting names allow.
+
+    Args:
+        scope (str): `Namespace`, `Queue` or `Topic`.
+        namespace (str): The namespace name.
+        entity (Optional[str]): The queue or topic name, None for
+            namespace rules.
+        rule (str): The authorization rule name.
+
+    Returns:
+        str: The secret name.
+    """
+    words = [
+        word
+        for name in (namespace, entity, rule)
+        if name
+        for word in re.split(r"[^0-9A-Za-z]+", name)
+        if word
+    ]
+    return "".join(word[0].upper() + word[1:] for word in words) + (
+        f"{scope}ConnectionString"
+    )
+
+
+def authorization_secret_names(
+    namespaces: Iterable[psb.Namespace],
+) -> dict[SecretKey, str]:
+    """
+    The `servicebus_secrets` names of every authorization rule of a
+    topology, before the `Primary` / `Secondary` suffix.
+
+    A rule keeps the name existing stacks use, `<Rule>{scope}ConnectionString`
+    (e.g. `RootNamespaceConnectionString`), unless another rule of the
+    topology has the same one; those rules get their
+    `authorization_secret_name` instead.
+
+    Args:
+        namespaces (Iterable[psb.Namespace]): The Pkl namespace configs.
+
+    Returns:
+        dict[SecretKey, str]: The secret names by (scope, namespace,
+        entity, rule).
+    """
+    keys: list[SecretKey] = []
+    for namespace in namespaces:
+        ns = namespace.namePrefix
+        keys += [
+            ("Namespace", ns, None, auth.name)
+            for auth in namespace.authorizations or ()
+        ]
+        for scope, entities in (
+            ("Queue", namespace.queues),
+            ("Topic", namespace.topics),
+        ):
+            keys += [
+                (scope, ns, entity.name, auth.name)
+                for entity in entities or ()
+                for auth in entity.authorizations or ()
+            ]
+    return _secret_names(keys)
+
+
+def _secret_names(keys: Iterable[SecretKey]) -> dict[SecretKey, str]:
+    keys = list(keys)
+    legacy = Counter(_legacy_secret_name(key) for key in keys)
+    return {
+        key: _legacy_secret_name(key)
+        if legacy[_legacy_secret_name(key)] == 1
+        else authorization_secret_name(*key)
+        for key in keys
+    }
+
+
+def _legacy_secret_name(key: SecretKey) -> str:
+    scope, _, _, rule = key
+    return f"{rule.capitalize()}{scope}ConnectionString"
+
+
+@dataclass(frozen=True)
+class Violation:
+    """
+    A single constraint violation.
+
+    Args:
+        path (str): Slash separated names leading to the offending entity,
+            e.g. `orders-ns/events/reader`.
+        message (str): What is wrong.
+    """
+
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+@dataclass
+class _Entity:
+    path: str
+    name: Any
+    config: Any
+    namespace: psb.Namespace
+    scope: str = ""
+
+
+class _Topology:
+    """
+    Column view of a topology: one list of entities per kind, built in a
+    single walk so every check runs over a flat column.
+    """
+
+    def __init__(self, namespaces: Iterable[psb.Namespace]):
+        self.columns: dict[str, list[_Entity]] = defaultdict(list)
+        for namespace in namespaces:
+            self.__add_namespace(namespace)
+
+    def __add_namespace(self, namespace: psb.Namespace) -> None:
+        path = str(namespace.namePrefix)
+        self.columns["namespace"].append(
+            _Entity(path, namespace.namePrefix, namespace, namespace)
+        )
+        self.__add_authorizations(
+            namespace.authorizations, path, namespace, "Namespace"
+        )
+        for queue in namespace.queues or ():
+            queue_path = f"{path}/{queue.name}"
+            self.columns["queue"].append(
+                _Entity(queue_path, queue.name, queue, namespace)
+            )
+            self.__add_authorizations(
+                queue.authorizations, queue_path, namespace, "Queue"
+            )
+        for topic in namespace.topics or ():
+            topic_path = f"{path}/{topic.name}"
+            self.columns["topic"].append(
+                _Entity(topic_path, topic.name, topic, namespace)
+            )
+            self.__add_authorizations(
+                topic.authorizations, topic_path, namespace, "Topic"
+            )
+            for subscription in topic.subscriptions or ():
+                sub_path = f"{topic_path}/{subscription.name}"
+                self.columns["subscription"].append(
+                    _Entity(
+                        sub_path,
+                        subscription.name,
+                        subscription,
+                        namespace,
+                        scope=topic_path,
+                    )
+                )
+                for rule in subscription.rules or ():
+                    self.columns["rule"].append(
+                        _Entity(
+                            f"{sub_path}/{rule.rule_name}",
+                            rule.rule_name,
+                            rule,
+                            namespace,
+                            scope=sub_path,
+                        )
+                    )
+
+    def __add_authorizations(
+        self,
+        authorizations: Optional[Iterable[psb.AuthorizationRule]],
+        path: str,
+        namespace: psb.Namespace,
+        parent_kind: str,
+    ) -> None:
+        for auth in authorizations or ():
+            self.columns["authorization"].append(
+                _Entity(
+                    f"{path}/{auth.name}",
+                    auth.name,
+                    auth,
+                    namespace,
+                    scope=f"{parent_kind}:{path}",
+                )
+            )
+
+
+def validate_servicebus(
+    namespaces: Iterable[psb.Namespace],
+) -> list[Violation]:
+    """
+    Checks an evaluated Service Bus topology against the naming constraints
+    of `servicebus-schema.pkl` and the Azure limits ARM would otherwise
+    reject mid-deployment. Every violation is collected; nothing raises.
+
+    Works on the regular and the compact bindings alike.
+
+    Args:
+        namespaces (Iterable[psb.Namespace]): The Pkl namespace configs.
+
+    Returns:
+        list[Violation]: Every violation found, empty if the topology is
+        valid.
+    """
+    topology = _Topology(namespaces)
+    violations: list[Violation] = []
+    for check in (
+        _check_names,
+        _check_duplicates,
+        _check_secret_names,
+        _check_filters,
+        _check_skus,
+        _check_autoscale,
+        _check_entity_limits,
+        _check_forwarding,
+    ):
+        violations.extend(check(topology.columns))
+    return violations
+
+
+def check_servicebus(namespaces: Iterable[psb.Namespace]) -> None:
+    """
+    Raises if `validate_servicebus` finds any violation.
+
+    Args:
+        namespaces (Iterable[psb.Namespace]): The Pkl namespace configs.
+
+    Raises:
+        ValueError: Listing every violation.
+    """
+    violations = validate_servicebus(namespaces)
+    if violations:
+        raise ValueError(
+            f"Service Bus config has {len(violations)} violation(s):\n"
+            + "\n".join(f"  {violation}" for violation in violations)
+        )
+
+
+def _check_names(columns: dict[str, list[_Entity]]) -> list[Violation]:
+    violations = []
+    for kind, rule in NAME_RULES.items():
+        for entity in columns[kind]:
+            name = entity.name
+            if not isinstance(name, str):
+                violations.append(Violation(entity.path, f"{kind} has no name"))
+                continue
+            if not _LOWER_CASE.fullmatch(name):
+                violations.append(
+                    Violation(
+                        entity.path,
+                        f"{kind} name '{name}' must be lowercase letters "
+                        "and hyphens, starting with a letter",
+                    )
+                )
+            if not rule.min_length <= len(name) <= rule.max_length:
+                violations.append(
+                    Violation(
+                        entity.path,
+                        f"{kind} name '{name}' must be {rule.min_length} to "
+                        f"{rule.max_length} characters long",
+                    )
+                )
+            for forbidden in rule.forbidden:
+                if forbidden in name:
+                    violations.append(
+                        Violation(
+                            entity.path,
+                            f"{kind} name '{name}' may not contain "
+                            f"'{forbidden}'",
+                        )
+                    )
+                    break
+    return violations
+
+
+def _check_duplicates(columns: dict[str, list[_Entity]]) -> list[Violation]:
+    violations = []
+    # Azure: namespace names are global, queues and topics share the
+    # namespace's entity names, subscriptions are per topic, rules per
+    # subscription and authorization rules per parent entity. `ServiceBus`
+    # scopes its resource names the same way, so these also rule out
+    # duplicate Pulumi URNs.
+    scopes = {
+        "namespace": lambda e: "",
+        "queue": lambda e: e.namespace.namePrefix,
+        "topic": lambda e: e.namespace.namePrefix,
+        "subscription": lambda e: e.scope,
+        "rule": lambda e: e.scope,
+        "authorization": lambda e: e.scope,
+    }
+    entity_names = Counter(
+        (scopes[kind](e), e.name)
+        for kind in ("queue", "topic")
+        for e in columns[kind]
+    )
+    for kind, scope in scopes.items():
+        scoped = (
+            entity_names
+            if kind in ("queue", "topic")
+            else Counter((scope(e), e.name) for e in columns[kind])
+        )
+        for entity in columns[kind]:
+            if scoped[(scope(entity), entity.name)] > 1:
+                violations.append(
+                    Violation(entity.path, f"duplicate {kind} name")
+                )
+    return violations
+
+
+def _check_secret_names(
+    columns: dict[str, list[_Entity]],
+) -> list[Violation]:
+    # The path scoped names of colliding rules can collide again, e.g.
+    # `orders-ns/a-b` and `orders-ns-a/b`. Key Vault ignores case.
+    paths = {}
+    for entity in columns["authorization"]:
+        kind, parent = entity.scope.split(":", 1)
+        namespace, _, name = parent.partition("/")
+        paths[(kind, namespace, name or None, entity.name)] = entity.path
+    names = _secret_names(paths)
+    counts = Counter(name.lower() for name in names.values())
+    return [
+        Violation(
+            paths[key],
+            f"connection string secret name {name} is not unique",
+        )
+        for key, name in names.items()
+        if counts[name.lower()] > 1
+    ]
+
+
+def _check_filters(columns: dict[str, list[_Entity]]) -> list[Violation]:
+    violations = []
+    for entity in columns["rule"]:
+        rule = entity.config
+        if rule.filterType == "SqlFilter":
+            if not rule.sqlFilter or not rule.sqlFilter.sqlExpression:
+                violations.append(
+                    Violation(
+                        entity.path,
+                        "filterType SqlFilter requires sqlFilter.sqlExpression",
+                    )
+                )
+            if rule.correlationFilter:
+                violations.append(
+                    Violation(
+                        entity.path,
+                        "filterType SqlFilter cannot set correlationFilter",
+                    )
+                )
+        elif rule.filterType == "CorrelationFilter":
+            if not rule.correlationFilter:
+                violations.append(
+                    Violation(
+                        entity.path,
+                        "filterType CorrelationFilter requires "
+                        "correlationFilter",
+                    )
+                )
+            if rule.sqlFilter:
+                violations.append(
+                    Violation(
+                        entity.path,
+                        "filterType CorrelationFilter cannot set sqlFilter",
+                    )
+                )
+        else:
+            violations.append(
+                Violation(
+                    entity.path,
+                    "filterType must be SqlFilter or CorrelationFilter",
+                )
+            )
+    return violations
+
+
+def _sku_name(namespace: psb.Namespace) -> Optional[str]:
+    sku = namespace.options.sku if namespace.options else None
+    return sku.name if sku else None
+
+
+def _check_skus(columns: dict[str, list[_Entity]]) -> list[Violation]:
+    violations = []
+    for entity in columns["namespace"]:
+        sku = entity.config.options.sku if entity.config.options else None
+        if sku is None or sku.name not in SKU_NAMES:
+            violations.append(
+                Violation(
+                    entity.path, f"sku name must be one of {list(SKU_NAMES)}"
+                )
+            )
+            continue
+        if sku.tier != sku.name:
+            violations.append(
+                Violation(
+                    entity.path,
+                    f"sku tier '{sku.tier}' must match sku name '{sku.name}'",
+                )
+            )
+        if sku.name == "Premium":
+            # Autoscale provides the capacity when none is set.
+            if sku.capacity not in PREMIUM_CAPACITIES and not (
+                sku.capacity is None and entity.config.options.autoscale
+            ):
+                violations.append(
+                    Violation(
+                        entity.path,
+                        "Premium sku capacity must be one of "
+                        f"{list(PREMIUM_CAPACITIES)}",
+                    )
+                )
+        elif sku.capacity is not None:
+            violations.append(
+                Violation(
+                    entity.path,
+                    f"sku capacity only applies to Premium, not {sku.name}",
+                )
+            )
+        if sku.name == "Basic" and entity.config.topics:
+            violations.append(
+                Violation(entity.path, "Basic sku does not support topics")
+            )
+    return violations
+
+
+def _check_autoscale(columns: dict[str, list[_Entity]]) -> list[Violation]:
+    violations = []
+    for entity in columns["namespace"]:
+        options = entity.config.options
+        if options is None or options.sku is None:
+            continue
+        autoscale = options.autoscale
+        partitions = options.premiumMessagingPartitions
+        premium = options.sku.name == "Premium"
+        if autoscale and not premium:
+            violations.append(
+                Violation(entity.path, "autoscale requires the Premium sku")
+            )
+        if partitions is not None and not premium:
+            violations.append(
+                Violation(
+                    entity.path,
+                    "premiumMessagingPartitions requires the Premium sku",
+                )
+            )
+        if autoscale:
+            capacities = (
+                autoscale.minimumCapacity,
+                autoscale.defaultCapacity,
+                autoscale.maximumCapacity,
+            )
+            if not all(c in PREMIUM_CAPACITIES for c in capacities):
+                violations.append(
+                    Violation(
+                        entity.path,
+                        "autoscale capacities must be one of "
+                        f"{list(PREMIUM_CAPACITIES)}",
+                    )
+                )
+            elif sorted(capacities) != list(capacities):
+                violations.append(
+                    Violation(
+                        entity.path,
+                        "autoscale capacities must satisfy minimumCapacity "
+                        "<= defaultCapacity <= maximumCapacity",
+                    )
+                )
+            for metric, scale_out, scale_in in (
+                (
+                    "Cpu",
+                    autoscale.scaleOutCpuPercent,
+                    autoscale.scaleInCpuPercent,
+                ),
+                (
+                    "Memory",
+                    autoscale.scaleOutMemoryPercent,
+                    autoscale.scaleInMemoryPercent,
+                ),
+            ):
+                if (
+                    scale_out is not None
+                    and scale_in is not None
+                    and scale_in >= scale_out
+                ):
+                    violations.append(
+                        Violation(
+                            entity.path,
+                            f"scaleIn{metric}Percent must be below "
+                            f"scaleOut{metric}Percent, or the namespace "
+                            "scales in and out in a loop",
+                        )
+                    )
+        if partitions and premium:
+            # Every partition needs the same share of the messaging units.
+            smallest = (
+                autoscale.minimumCapacity if autoscale else options.sku.capacity
+            )
+            if smallest is not None and smallest % partitions:
+                violations.append(
+                    Violation(
+                        entity.path,
+                        f"messaging units ({smallest}) must be a multiple of "
+                        f"premiumMessagingPartitions ({partitions})",
+                    )
+                )
+    return violations
+
+
+def _check_entity_limits(
+    columns: dict[str, list[_Entity]],
+) -> list[Violation]:
+    violations = []
+    entities = [
+        (kind, entity)
+        for kind in ("queue", "topic", "subscription")
+        for entity in columns[kind]
+    ]
+    for kind, entity in entities:
+        options = entity.config.options
+        sku = _sku_name(entity.namespace)
+        if options is None or sku not in SKU_NAMES:
+            continue
+
+        def violation(message: str) -> None:
+            violations.append(Violation(entity.path, message))
+
+        if sku == "Basic":
+            if getattr(options, "requiresSession", None):
+                violation("Basic sku does not support sessions")
+            if getattr(options, "requiresDuplicateDetection", None):
+                violation("Basic sku does not support duplicate detection")
+            if getattr(options, "forwardTo", None) or getattr(
+                options, "forwardDeadLetteredMessagesTo", None
+            ):
+                violation("Basic sku does not support auto-forwarding")
+        if sku == "Premium":
+            if getattr(options, "enableExpress", None):
+                violation("Premium sku does not support express entities")
+            if getattr(options, "enablePartitioning", None):
+                violation(
+                    "Premium sku partitions at the namespace, not the "
+                    f"{kind}; unset enablePartitioning"
+                )
+        max_message_size = getattr(options, "maxMessageSizeInKilobytes", None)
+        if max_message_size is not None:
+            low, high = PREMIUM_MAX_MESSAGE_SIZE_IN_KILOBYTES
+            if sku != "Premium":
+                violation("maxMessageSizeInKilobytes requires Premium sku")
+            elif not low <= max_message_size <= high:
+                violation(f"maxMessageSizeInKilobytes must be {low} to {high}")
+        max_size = getattr(options, "maxSizeInMegabytes", None)
+        if max_size is not None and max_size not in MAX_SIZES_IN_MEGABYTES[sku]:
+            violation(
+                f"maxSizeInMegabytes must be one of "
+                f"{list(MAX_SIZES_IN_MEGABYTES[sku])} on {sku} sku"
+            )
+        max_delivery_count = getattr(options, "maxDeliveryCount", None)
+        if max_delivery_count is not None and max_delivery_count < 1:
+            violation("maxDeliveryCount must be at least 1")
+    return violations
+
+
+def _check_forwarding(columns: dict[str, list[_Entity]]) -> list[Violation]:
+    violations = []
+    targets: dict[str, set[str]] = defaultdict(set)
+    for kind in ("queue", "topic"):
+        for entity in columns[kind]:
+            targets[entity.namespace.namePrefix].add(entity.name)
+    for kind in ("queue", "subscription"):
+        for entity in columns[kind]:
+            options = entity.config.options
+            if options is None:
+                continue
+            for option in ("forwardTo", "forwardDeadLetteredMessagesTo"):
+                target = getattr(options, option)
+                if target is None:
+                    continue
+                if kind == "queue" and target == entity.name:
+                    violations.append(
+                        Violation(entity.path, f"{option} targets itself")
+                    )
+                elif target not in targets[entity.namespace.namePrefix]:
+                    violations.append(
+                        Violation(
+                            entity.path,
+                            f"{option} target '{target}' is not a queue or "
+                            "topic of this namespace",
+                        )
+                    )
+
+    # Self-forwarding queues are reported above.
+    graph = ForwardingGraph(entity.config for entity in columns["namespace"])
+    for cycle in graph.cycles:
+        if len(cycle) > 1:
+            violations.append(
+                Violation(
+                    cycle[0],
+                    f"forwarding cycle through {', '.join(cycle)}",
+                )
+            )
+    for path, depth in graph.too_deep().items():
+        violations.append(
+            Violation(
+                path,
+                f"messages can be forwarded {depth} times, Azure "
+                f"dead-letters them after {MAX_FORWARDING_HOPS} hops",
+            )
+        )
+    return violations
@@ -0,0 +1,204 @@
+import base64
+import hashlib
+import hmac
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import quote
+
+# Storage service version the tokens are signed for; its string-to-sign
+# layout applies from 2020-12-06 on.
+SAS_VERSION = "2022-11-02"
+# Tokens are re-signed once per bucket and stay valid for at least
+# SAS_LIFETIME after it.
+SAS_TIME_BUCKET = timedelta(hours=24)
+SAS_LIFETIME = timedelta(hours=24)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def sas_window(
+    now: Optional[datetime] = None,
+    bucket: timedelta = SAS_TIME_BUCKET,
+    lifetime: timedelta = SAS_LIFETIME,
+) -> tuple[str, str]:
+    """
+    The start and expiry of a SAS token, snapped to time buckets so every
+    run within one bucket signs the same token and previews show no diff.
+
+    The start is the beginning of the current bucket, the expiry `bucket +
+    lifetime` later, so a token is valid for at least `lifetime` after it
+    was signed.
+
+    Args:
+        now (Optional[datetime], optional): The current time. Defaults to
+            the UTC clock.
+        bucket (timedelta, optional): Bucket size, a whole number of
+            seconds. Defaults to SAS_TIME_BUCKET.
+        lifetime (timedelta, optional): Minimum validity. Defaults to
+            SAS_LIFETIME.
+
+    Returns:
+        tuple[str, str]: Start and expiry as ISO 8601 UTC strings.
+
+    Raises:
+        ValueError: If bucket is not a positive whole number of seconds.
+    """
+    seconds = bucket.total_seconds()
+    if seconds < 1 or seconds != int(seconds):
+        raise ValueError(
+            f"SAS time bucket must be a positive whole number of seconds, "
+            f"got {bucket}"
+        )
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    elapsed = int((now - _EPOCH).total_seconds())
+    start = _EPOCH + timedelta(seconds=elapsed - elapsed % int(seconds))
+    expiry = start + bucket + lifetime
+    return start.strftime(_TIME_FORMAT), expiry.strftime(_TIME_FORMAT)
+
+
+def blob_string_to_sign(
+    account_name: str,
+    path: str,
+    resource: str,
+    permissions: str,
+    start: Optional[str],
+    expiry: str,
+    protocol: Optional[str] = "https",
+    identifier: Optional[str] = None,
+    ip_range: Optional[str] = None,
+    version: str = SAS_VERSION,
+) -> str:
+    """
+    The string-to-sign of a Blob service SAS, version 2020-12-06 or later.
+
+    Args:
+        account_name (str): The storage account name.
+        path (str): `container` or `container/blob`.
+        resource (str): `c` (container) or `b` (blob).
+        permissions (str): Signed permissions, e.g. `rl`.
+        start (Optional[str]): ISO 8601 start time.
+        expiry (str): ISO 8601 expiry time.
+        protocol (Optional[str], optional): `https` or `https,http`.
+            Defaults to "https".
+        identifier (Optional[str], optional): Stored access policy id.
+        ip_range (Optional[str], optional): Allowed IP address or range.
+        version (str, optional): Signed storage service version.
+
+    Returns:
+        str: The newline separated fields.
+    """
+    return "\n".join(
+        [
+            permissions,
+            start or "",
+            expiry,
+            f"/blob/{account_name}/{path}",
+            identifier or "",
+            ip_range or "",
+            protocol or "",
+            version,
+            resource,
+            "",  # snapshot time
+            "",  # encryption scope
+            "",  # response cache-control
+            "",  # response content-disposition
+            "",  # response content-encoding
+            "",  # response content-language
+            "",  # response content-type
+        ]
+    )
+
+
+def sign(account_key: str, string_to_sign: str) -> str:
+    """
+    HMAC-SHA256 signature of a string-to-sign with a base64 account key.
+
+    Args:
+        account_key (str): The storage account key.
+        string_to_sign (str): The string-to-sign.
+
+    Returns:
+        str: The base64 signature.
+    """
+    digest = hmac.new(
+        base64.b64decode(account_key),
+        string_to_sign.encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def blob_service_sas(
+    account_name: str,
+    account_key: str,
+    path: str,
+    permissions: str,
+    start: Optional[str],
+    expiry: str,
+    resource: str = "c",
+    protocol: Optional[str] = "https",
+    identifier: Optional[str] = None,
+    ip_range: Optional[str] = None,
+    version: str = SAS_VERSION,
+) -> str:
+    """
+    Signs a Blob service SAS token locally, as
+    `list_storage_account_service_sas` would without the invoke.
+
+    Args:
+        account_name (str): The storage account name.
+        account_key (str): The storage account key.
+        path (str): `container` or `container/blob`.
+        permissions (str): Signed permissions, e.g. `rl`.
+        start (Optional[str]): ISO 8601 start time.
+        expiry (str): ISO 8601 expiry time.
+        resource (str, optional): `c` (container) or `b` (blob). Defaults
+            to "c".
+        protocol (Optional[str], optional): `https` or `https,http`.
+            Defaults to "https".
+        identifier (Optional[str], optional): Stored access policy id.
+        ip_range (Optional[str], optional): Allowed IP address or range.
+        version (str, optional): Signed storage service version.
+
+    Returns:
+        str: The token, a query string without the leading `?`.
+
+    Raises:
+        ValueError: If resource is neither `c` nor `b`.
+    """
+    if resource not in ("c", "b"):
+        raise ValueError(f"Unsupported signed resource '{resource}'")
+    signature = sign(
+        account_key,
+        blob_string_to_sign(
+            account_name=account_name,
+            path=path,
+            resource=resource,
+            permissions=permissions,
+            start=start,
+            expiry=expiry,
+            protocol=protocol,
+            identifier=identifier,
+            ip_range=ip_range,
+            version=version,
+        ),
+    )
+    fields = [
+        ("sv", version),
+        ("st", start),
+        ("se", expiry),
+        ("sr", resource),
+        ("sp", permissions),
+        ("sip", ip_range),
+        ("spr", protocol),
+        ("si", identifier),
+        ("sig", signature),
+    ]
+    return "&".join(
+        f"{name}={quote(value, safe='')}"
+        for name, value in fields
+        if value is not None
+    )
@@ -0,0 +1,84 @@
+import hashlib
+from typing import Iterable, Optional
+
+# Function app connection name prefix of a shard's account.
+SHARD_CONNECTION_PREFIX = "StorageShard"
+# Storage account names are 3 to 24 lowercase letters and digits.
+MAX_ACCOUNT_NAME_LENGTH = 24
+
+
+def shard_for(name: str, shard_count: int) -> int:
+    """
+    The shard of a container or queue by rendezvous (highest random weight)
+    hashing: every shard scores the name and the highest score wins. When
+    shards are added, a name only moves if a new shard outscores all old
+    ones, so about `1 / shard_count` of the names move and none move
+    between old shards.
+
+    Args:
+        name (str): The container or queue name.
+        shard_count (int): The number of shards.
+
+    Returns:
+        int: The shard index, 0 to shard_count - 1.
+
+    Raises:
+        ValueError: If shard_count is below 1.
+    """
+    if shard_count < 1:
+        raise ValueError(f"shard_count must be at least 1, got {shard_count}")
+    if shard_count == 1:
+        return 0
+    return max(
+        range(shard_count),
+        key=lambda shard: hashlib.sha256(
+            f"{shard}:{name}".encode("utf-8")
+        ).digest(),
+    )
+
+
+def assign_shards(
+    names: Iterable[str],
+    shard_count: int,
+    pins: Optional[dict[str, int]] = None,
+) -> dict[str, int]:
+    """
+    The shard of every name, see `shard_for`, unless it is pinned.
+
+    Args:
+        names (Iterable[str]): Container or queue names.
+        shard_count (int): The number of shards.
+        pins (Optional[dict[str, int]], optional): Shards of names that must
+            not move, e.g. the assignment before `shard_count` changed.
+
+    Returns:
+        dict[str, int]: Name to shard index.
+    """
+    pins = pins or {}
+    return {
+        name: pins[name] if name in pins else shard_for(name, shard_count)
+        for name in names
+    }
+
+
+def shard_name(name: str, shard: int) -> str:
+    """
+    The name of a shard's resource: shard 0 keeps `name`, so an unsharded
+    deployment is unchanged by sharding, the others get their index
+    appended.
+
+    Args:
+        name (str): The unsharded name.
+        shard (int): The shard index.
+
+    Returns:
+        str: The shard's name.
+    """
+    return name if shard == 0 else f"{name}{shard}"
+
+
+def connection_name(shard: int) -> str:
+    """
+    The function app connection name of a shard's account.
+    """
+    return f"{SHARD_CONNECTION_PREFIX}{shard}"
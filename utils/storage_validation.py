@@ -0,0 +1,98 @@
+from typing import Any, Optional
+
+# Storage account rules of `StorageAccount` and `BlobServiceProperties`
+# argument combinations Azure rejects or silently ignores.
+PREMIUM_SKUS = ("Premium_LRS", "Premium_ZRS", "PremiumV2_LRS", "PremiumV2_ZRS")
+HNS_KINDS = ("StorageV2", "BlockBlobStorage")
+LARGE_FILE_SHARE_KINDS = ("StorageV2",)
+
+
+def _field(value: Any, name: str) -> Any:
+    """
+    A field of an args dict or a pulumi args object, enums unwrapped.
+    """
+    if value is None:
+        return None
+    found = value.get(name) if isinstance(value, dict) else getattr(value, name)
+    return getattr(found, "value", found)
+
+
+def _enabled(value: Any) -> bool:
+    return bool(_field(value, "enabled")) if value is not None else False
+
+
+def check_storage_account(
+    account_args: dict,
+    blob_properties_args: Optional[dict] = None,
+    container_count: int = 0,
+    queue_count: int = 0,
+) -> list[str]:
+    """
+    Problems with a storage account and the services placed on it.
+
+    Args:
+        account_args (dict): `storage.StorageAccount` arguments.
+        blob_properties_args (Optional[dict], optional):
+            `storage.BlobServiceProperties` arguments, if any.
+        container_count (int, optional): Blob containers on the account.
+        queue_count (int, optional): Queues on the account.
+
+    Returns:
+        list[str]: One message per problem, empty if the combination is
+            legal.
+    """
+    kind = _field(account_args, "kind")
+    sku = _field(_field(account_args, "sku"), "name")
+    access_tier = _field(account_args, "access_tier")
+    hns = bool(_field(account_args, "is_hns_enabled"))
+    large_file_shares = _field(account_args, "large_file_shares_state")
+    premium = sku in PREMIUM_SKUS
+    problems = []
+
+    if kind in ("BlockBlobStorage", "FileStorage") and not premium:
+        problems.append(
+            f"{kind} accounts need a premium SKU {PREMIUM_SKUS}, got {sku}"
+        )
+    if premium and access_tier not in (None, "Premium"):
+        problems.append(
+            f"premium accounts have no {access_tier} access tier, leave it "
+            "unset"
+        )
+    if premium and queue_count:
+        problems.append(
+            f"premium {kind} accounts have no queue service, got "
+            f"{queue_count} queues"
+        )
+    if kind == "FileStorage":
+        if container_count or blob_properties_args is not None:
+            problems.append(
+                "FileStorage accounts have no blob service, got "
+                f"{container_count} containers"
+                + (" and blob properties" if blob_properties_args else "")
+            )
+        if large_file_shares is not None:
+            problems.append(
+                "FileStorage shares are large by default, unset "
+                "large_file_shares_state"
+            )
+    if hns:
+        if kind not in HNS_KINDS:
+            problems.append(
+                f"hierarchical namespace needs a {HNS_KINDS} account, got "
+                f"{kind}"
+            )
+        if _field(blob_properties_args, "is_versioning_enabled"):
+            problems.append(
+                "blob versioning is not supported with hierarchical namespace"
+            )
+        if _enabled(_field(blob_properties_args, "change_feed")):
+            problems.append(
+                "blob change feed is not supported with hierarchical namespace"
+            )
+    if large_file_shares == "Enabled" and kind not in LARGE_FILE_SHARE_KINDS:
+        problems.append(
+            f"large file shares need a {LARGE_FILE_SHARE_KINDS} account, got "
+            f"{kind}"
+        )
+
+    return problems
@@ -1,34 +1,160 @@
 import modulepath_fixer  # noqa: F401
-from typing import Any, Literal
-from configs.generated.servicebus_pkl import servicebus as psb
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
 
+import msgpack
 
-def load_pkl_config(
-    resource_type: Literal["servicebus"],
-    pkl_config_file: str,
-) -> Any:
+import configs.generated.cosmos_pkl_decoder as pcs_decoder
+import configs.generated.eventgrid_pkl_decoder as peg_decoder
+import configs.generated.servicebus_pkl_compact as psb_compact
+import configs.generated.servicebus_pkl_decoder as psb_decoder
+from utils.pkl_cache import PklCache
+from utils.pkl_pool import PklEvaluatorPool, default_pool
+
+
+@dataclass
+class PklResourceType:
     """
-    Loads and returns platform configs for the given resource_type.
-    Supported types: 'servicebus'.
+    A resource type `load_pkl_config` can load.
+
+    Args:
+        decode (Callable[[Any], Any]): Builds the module bindings from the
+            evaluator's decoded msgpack output, e.g. a compiled decoder.
+        attr (str): The module attribute holding the platform configs.
+    """
+
+    decode: Callable[[Any], Any]
+    attr: str
+
+
+resource_map: dict[str, PklResourceType] = {}
+
+
+def register_resource_type(
+    resource_type: str, decode: Callable[[Any], Any], attr: str
+) -> None:
+    """
+    Registers a resource type with `load_pkl_config`/`load_pkl_configs`.
+
+    Args:
+        resource_type (str): The name callers load the type by.
+        decode (Callable[[Any], Any]): Builds the module bindings from the
+            evaluator's decoded msgpack output.
+        attr (str): The module attribute holding the platform configs.
+    """
+    resource_map[resource_type] = PklResourceType(decode=decode, attr=attr)
+
+
+register_resource_type(
+    "servicebus", decode=psb_decoder.decode, attr="namespaces"
+)
+# Frozen, slotted bindings sharing identical sub-objects; see
+# `scripts/python/gen_pkl_decoder.py --compact`.
+register_resource_type(
+    "servicebus-compact", decode=psb_compact.decode, attr="namespaces"
+)
+register_resource_type(
+    "eventgrid", decode=peg_decoder.decode, attr="systemTopics"
+)
+register_resource_type("cosmos", decode=pcs_decoder.decode, attr="databases")
+
+
+def load_pkl_configs(
+    resource_type: str,
+    pkl_config_files: list[str],
+    use_cache: bool = True,
+    cache: Optional[PklCache] = None,
+    pool: Optional[PklEvaluatorPool] = None,
+) -> list[Any]:
     """
+    Loads and returns platform configs for many Pkl files of the given
+    resource_type, in input order.
 
-    # Map resource_type to their loader and platform class
-    resource_map = {
-        "servicebus": {
-            "loader": psb.load_pkl,
-            "module": psb,
-            "attr": "namespaces",
-        },
-    }
+    Evaluated configs are served from a content-addressed on-disk cache when
+    neither the config file, the modules it references nor the evaluator
+    changed. Set `use_cache=False` or `PKL_CACHE_DISABLE=1` to bypass it.
+    The remaining files are evaluated concurrently on a pool of long-lived
+    evaluator processes.
 
+    Args:
+        resource_type (str): A type registered with `register_resource_type`.
+        pkl_config_files (list[str]): Paths to the Pkl config files.
+        use_cache (bool): Whether to use the evaluation cache.
+        cache (Optional[PklCache]): The evaluation cache. Defaults to a cache
+            in `PKL_CACHE_DIR`.
+        pool (Optional[PklEvaluatorPool]): The evaluator pool. Defaults to
+            the process wide pool.
+
+    Returns:
+        list[Any]: The platform configs of every file.
+    """
     if resource_type not in resource_map:
         raise ValueError(f"Unsupported resource type: {resource_type}")
 
     resource = resource_map[resource_type]
-    # psb.load_pkl(pkl_config_file)
-    pkl_config = resource["loader"](pkl_config_file)
-    # Instantiate the module class and return the relevant attribute
-    # psb(pkl_config.namespaces)
-    module_instance = resource["module"](getattr(pkl_config, resource["attr"]))
-    # module_instance.namespaces
-    return getattr(module_instance, resource["attr"])
+    cache = cache or PklCache()
+    use_cache = use_cache and cache.enabled
+
+    keys = [cache.key(file) for file in pkl_config_files]
+    raws: list[Any] = [None] * len(pkl_config_files)
+    # Seconds spent on each file alone: the cache read and unpacking for a
+    # hit, the lookup, evaluation and cache write for a miss, plus decoding.
+    seconds = [0.0] * len(pkl_config_files)
+    misses: list[int] = []
+    for index, key in enumerate(keys):
+        started = time.perf_counter()
+        data = cache.get(key) if use_cache else None
+        if data is None:
+            misses.append(index)
+        else:
+            raws[index] = msgpack.unpackb(data, strict_map_key=False)
+        seconds[index] += time.perf_counter() - started
+
+    if misses:
+        evaluated = (pool or default_pool()).map_timed(
+            [pkl_config_files[index] for index in misses]
+        )
+        for index, (raw, evaluation) in zip(misses, evaluated):
+            started = time.perf_counter()
+            raws[index] = raw
+            if use_cache:
+                cache.put(keys[index], msgpack.packb(raw))
+            seconds[index] += evaluation + time.perf_counter() - started
+
+    missed = set(misses)
+    configs = []
+    for index, raw in enumerate(raws):
+        started = time.perf_counter()
+        pkl_config = resource.decode(raw)
+        seconds[index] += time.perf_counter() - started
+        cache.record(
+            pkl_config_files[index],
+            keys[index],
+            index not in missed,
+            seconds[index],
+        )
+        # pkl_config.namespaces
+        configs.append(getattr(pkl_config, resource.attr))
+    return configs
+
+
+def load_pkl_config(
+    resource_type: str,
+    pkl_config_file: str,
+    use_cache: bool = True,
+    cache: Optional[PklCache] = None,
+) -> Any:
+    """
+    Loads and returns platform configs for the given resource_type.
+    Supported types: any registered in `resource_map`, 'servicebus',
+    'servicebus-compact', 'eventgrid' and 'cosmos' by default.
+
+    See `load_pkl_configs` for caching and evaluation.
+    """
+    return load_pkl_configs(
+        resource_type=resource_type,
+        pkl_config_files=[pkl_config_file],
+        use_cache=use_cache,
+        cache=cache,
+    )[0]